@@ -1,19 +1,33 @@
-<<<<<<< HEAD
-import os
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
-import joblib
-import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-=======
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, validator, Field
-import joblib
-import pandas as pd
-import os
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field, ValidationError, root_validator, validator
+
+from scripts import metrics
+from scripts.calendar_features import (
+    REQUEST_CALENDAR_FIELDS,
+    request_calendar_fields,
+)
+from scripts.forecasting import SarimaForecaster
+from scripts.inference import (
+    InferenceExecutor,
+    InferenceQueueFullError,
+    InferenceTimeoutError,
+)
+from scripts.micro_batching import MICRO_BATCH_ENABLED, MicroBatcher
+from scripts.model_registry import DEFAULT_ALIAS, ModelNotFoundError, ModelRegistry
+from scripts.prediction_cache import PREDICTION_CACHE_SIZE, PredictionCache
+from scripts.transform_pipeline import load_transform_pipeline
+
+# Özellik adı olmadan yapılan (NumPy) tahminlerde sklearn uyarısını kapat
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
 
 app = FastAPI()
 
@@ -26,19 +40,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Model dosyaları
-MODEL_DIR = "./models/"
-TRAINED_MODEL_FILE = os.path.join(MODEL_DIR, "trained_model.pkl")
 
-# Eğitimli modeli yükle
-<<<<<<< HEAD
-trained_model = (
-    joblib.load(TRAINED_MODEL_FILE) if os.path.exists(TRAINED_MODEL_FILE) else None
-)
+def _route_path(request, status_code=None):
+    """
+    Metrik etiketleri için eşleşen rotanın şablon yolunu döndürür (ör. '/models/aliases/{alias}').
+    Eşleşmeyen (404) yollar etiket sayısı şişmesin diye tek etikette toplanır.
+    """
+    route = request.scope.get("route")
+    if route is not None:
+        return route.path
+    if status_code == 404:
+        return "unmatched"
+    return request.url.path
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Her istek için sayım, hata türü ve uçtan uca gecikme metriklerini kaydeder.
+    """
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        path = _route_path(request)
+        metrics.REQUEST_ERRORS.inc(
+            method=request.method, path=path, error_type=type(e).__name__
+        )
+        metrics.REQUEST_COUNT.inc(method=request.method, path=path, status=500)
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - start, method=request.method, path=path
+        )
+        raise
+
+    path = _route_path(request, response.status_code)
+    metrics.REQUEST_COUNT.inc(
+        method=request.method, path=path, status=response.status_code
+    )
+    if response.status_code >= 400:
+        metrics.REQUEST_ERRORS.inc(
+            method=request.method,
+            path=path,
+            error_type=f"http_{response.status_code}",
+        )
+    metrics.REQUEST_LATENCY.observe(
+        time.perf_counter() - start, method=request.method, path=path
+    )
+    return response
+
+
+# Toplu tahminde tek istekte kabul edilen en fazla satır sayısı
+MAX_BATCH_SIZE = 10000
 
-=======
-trained_model = joblib.load(TRAINED_MODEL_FILE) if os.path.exists(TRAINED_MODEL_FILE) else None
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
 
 # Giriş için gelişmiş veri modeli
 class PredictionRequest(BaseModel):
@@ -57,29 +110,203 @@ class PredictionRequest(BaseModel):
     forecast_solar_day_ahead: float = Field(..., ge=0, le=1000)
     forecast_wind_onshore_day_ahead: float = Field(..., ge=0, le=1000)
     total_load_forecast: float = Field(..., ge=0, le=2000)
-    hour: int = Field(..., ge=0, le=23)
-    day_of_week: int = Field(..., ge=0, le=6)
-    month: int = Field(..., ge=1, le=12)
-    is_weekend: int = Field(..., ge=0, le=1)
-    season: int = Field(..., ge=0, le=3)
+    # Takvim alanları `timestamp` gönderilirse ondan türetilir; açıkça gönderilen
+    # alanlar türetilen değerlerin önüne geçer
+    timestamp: Optional[datetime] = None
+    hour: Optional[int] = Field(None, ge=0, le=23)
+    day_of_week: Optional[int] = Field(None, ge=0, le=6)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    is_weekend: Optional[int] = Field(None, ge=0, le=1)
+    season: Optional[int] = Field(None, ge=0, le=3)
+    is_holiday: Optional[int] = Field(None, ge=0, le=1)
 
     # Özel doğrulama
-<<<<<<< HEAD
     @validator("is_weekend")
     def validate_weekend(cls, v):
-        if v not in [0, 1]:
+        if v not in [0, 1, None]:
             raise ValueError("is_weekend sadece 0 veya 1 olabilir")
         return v
 
+    @root_validator(skip_on_failure=True)
+    def derive_calendar_fields(cls, values):
+        missing = [field for field in REQUEST_CALENDAR_FIELDS if values[field] is None]
+        if not missing:
+            return values
+        if values["timestamp"] is not None:
+            derived = request_calendar_fields(values["timestamp"])
+            for field in missing:
+                values[field] = derived[field]
+            return values
+
+        required = [field for field in missing if field != "is_holiday"]
+        if required:
+            raise ValueError(
+                f"'timestamp' gönderilmediğinde şu alanlar zorunludur: {', '.join(required)}"
+            )
+        values["is_holiday"] = 0
+        return values
+
+
+# Modele giren istek alanları (zaman damgası yalnızca takvim alanlarını türetir)
+REQUEST_FEATURE_FIELDS = [
+    field for field in PredictionRequest.__fields__ if field != "timestamp"
+]
+
+
+# Eğitimdeki ön işleme (RARE encoding -> kodlama -> ölçekleme) başlangıçta bir kez
+# yüklenir; dosya yoksa ham istek alanları doğrudan modele hizalanır
+transform_pipeline = load_transform_pipeline()
+
+# Model kayıt defteri: modeller ilk istekte yüklenir, dosya değişince yeniden yüklenir.
+# Özellik hizalama planı her model sürümü yüklenirken bir kez derlenir.
+model_registry = ModelRegistry(
+    field_names=(
+        transform_pipeline.feature_names
+        if transform_pipeline is not None
+        else REQUEST_FEATURE_FIELDS
+    )
+)
+
+
+def get_loaded_model(name=None):
+    """
+    İstenen modelin yüklü anlık görüntüsünü döndürür; bulunamazsa HTTP hatası fırlatır.
+    """
+    try:
+        loaded = model_registry.get(name)
+    except ModelNotFoundError:
+        if name is None:
+            detail = (
+                f"Varsayılan model bulunamadı: '{DEFAULT_ALIAS}' -> "
+                f"{model_registry.resolve(None)}"
+            )
+        else:
+            detail = f"Model bulunamadı: {name}"
+        raise HTTPException(status_code=404, detail=detail)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Eğitilmiş model yüklenemedi: {e}")
+    if loaded.aligner is None:
+        raise HTTPException(
+            status_code=500,
+            detail=f"'{loaded.name}' modeli özellik adlarını (feature_names_in_) içermiyor.",
+        )
+    return loaded
+
+
+# Model tahminleri olay döngüsünü bloklamamak için sınırlı bir havuzda çalıştırılır
+# (INFERENCE_BACKEND, INFERENCE_WORKERS, INFERENCE_MAX_QUEUE, INFERENCE_TIMEOUT)
+inference_executor = InferenceExecutor()
+
+
+# Eşzamanlı tek satırlık istekler kısa bir pencerede toplanıp birlikte skorlanır
+# (MICRO_BATCH_ENABLED, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS)
+micro_batcher = MicroBatcher(inference_executor) if MICRO_BATCH_ENABLED else None
+
+
+# Aynı (ya da yuvarlanınca aynı) istekler için tahmin önbelleği
+# (PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_QUANTUM)
+prediction_cache = (
+    PredictionCache(
+        REQUEST_FEATURE_FIELDS,
+        float_fields=[
+            name
+            for name, annotation in PredictionRequest.__annotations__.items()
+            if annotation is float
+        ],
+    )
+    if PREDICTION_CACHE_SIZE > 0
+    else None
+)
+
+
+@app.on_event("shutdown")
+def shutdown_inference_executor():
+    inference_executor.shutdown()
+
+
+async def _await_inference(awaitable):
+    """
+    Çıkarım hatalarını HTTP yanıtlarına çevirir; kuyruk doluysa 503, süre aşılırsa 504.
+    """
+    try:
+        return await awaitable
+    except InferenceQueueFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except InferenceTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def prepare_features(loaded, requests, stage_labels):
+    """
+    Doğrulanmış istekleri modelin özellik matrisine çevirir. Dönüşüm pipeline'ı varsa
+    tüm satırlar önce tek bir vektörel dönüşümden geçirilir.
+    """
+    if transform_pipeline is None:
+        with metrics.STAGE_LATENCY.time(stage="alignment", **stage_labels):
+            return loaded.aligner.transform_many(requests)
+
+    with metrics.STAGE_LATENCY.time(stage="transform", **stage_labels):
+        features = transform_pipeline.transform_records(
+            [vars(request) for request in requests]
+        )
+    with metrics.STAGE_LATENCY.time(stage="alignment", **stage_labels):
+        return loaded.aligner.transform_array(features)
+
+
+def prepare_batch_features(loaded, items, stage_labels):
+    """
+    Toplu satırları tek dönüşümle matrise çevirir. Dönüşüm bir satır yüzünden
+    başarısız olursa (ör. eğitimde görülmemiş kategori kodu) satırlar tek tek
+    yeniden dönüştürülür; hatalı satırlar toplu isteği düşürmeden ayıklanır.
+
+    Returns:
+    - (özellik matrisi ya da None, dönüşen öğeler, satır bazlı hatalar)
+    """
+    try:
+        return (
+            prepare_features(loaded, [item[1] for item in items], stage_labels),
+            items,
+            [],
+        )
+    except ValueError:
+        pass
+
+    kept, errors = [], []
+    for item in items:
+        try:
+            prepare_features(loaded, [item[1]], stage_labels)
+            kept.append(item)
+        except ValueError as e:
+            errors.append({"index": item[0], "detail": str(e)})
+    if not kept:
+        return None, kept, errors
+    return (
+        prepare_features(loaded, [item[1] for item in kept], stage_labels),
+        kept,
+        errors,
+    )
+
+
+async def run_inference(loaded, matrix):
+    """
+    Bir özellik matrisini tek çağrıyla çıkarım havuzunda tahmin eder.
+    """
+    return await _await_inference(inference_executor.predict(loaded, matrix))
+
+
+async def run_single_inference(loaded, row):
+    """
+    Tek satırı tahmin eder; mikro-toplama açıksa satır eşzamanlı isteklerle birleştirilir.
+    """
+    if micro_batcher is None:
+        return (await run_inference(loaded, row))[0]
+    return await _await_inference(micro_batcher.predict(loaded, row))
 
-=======
-    @validator('is_weekend')
-    def validate_weekend(cls, v):
-        if v not in [0, 1]:
-            raise ValueError('is_weekend sadece 0 veya 1 olabilir')
-        return v
 
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
 @app.get("/")
 def home():
     """
@@ -87,33 +314,311 @@ def home():
     """
     return {"message": "Enerji Tahmin API'sine Hoş Geldiniz!"}
 
-<<<<<<< HEAD
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-@app.post("/predict")
-def predict(request: PredictionRequest):
+@app.get("/models")
+def list_models():
+    """
+    Kayıt defterindeki modelleri ve takma adları listeler.
+    """
+    model_registry.refresh()
+    return model_registry.list_models()
+
+
+@app.put("/models/aliases/{alias}")
+def set_model_alias(alias: str, model: str = Query(...)):
     """
-    Enerji yükü tahmin rotası.
+    Takma adı başka bir modele yönlendirir (ör. 'default'). Sonraki istekler
+    yeniden başlatma gerekmeden yeni modele geçer.
     """
     try:
-        if not trained_model:
-            raise HTTPException(status_code=500, detail="Eğitilmiş model yüklenemedi.")
+        model_registry.set_alias(alias, model)
+    except ModelNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model bulunamadı: {model}")
+    return {"alias": alias, "model": model}
 
-        # Girdileri bir pandas DataFrame'e dönüştür
-        input_data = pd.DataFrame([request.dict()])
 
-        # Modelin eğitildiği özellikleri hizala
-        trained_features = trained_model.feature_names_in_
-        aligned_input = input_data.reindex(columns=trained_features, fill_value=0)
+# SARIMA tahmin yolu ilk istekte bir kez hesaplanır ve sonraki istekler dilimlenir
+# (FORECAST_MAX_HORIZON)
+sarima_forecaster = SarimaForecaster()
 
-        # Tahmini yap
-        prediction = trained_model.predict(aligned_input)[0]
 
-        return {"prediction": float(prediction)}
-    except Exception as e:
-<<<<<<< HEAD
-        raise HTTPException(status_code=400, detail=str(e))
-=======
+@app.get("/forecast")
+def forecast(
+    horizon: int = Query(24, ge=1),
+    include_ci: bool = Query(False),
+    alpha: float = Query(0.05, gt=0, lt=1),
+):
+    """
+    SARIMA modeliyle sonraki `horizon` saatin toplam yük tahmini. `include_ci` açıksa
+    (1 - alpha) güven aralığı da döner.
+    """
+    if horizon > sarima_forecaster.max_horizon:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tahmin ufku en fazla {sarima_forecaster.max_horizon} olabilir.",
+        )
+    try:
+        return sarima_forecaster.forecast(horizon, alpha if include_ci else None)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Prometheus metin biçiminde metrikler: istek/hata sayıları, istek gecikmesi ve
+    model adı/sürümüne göre aşama (validation, alignment, predict, serialization) süreleri.
+    """
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/stats")
+def stats():
+    """
+    Servis içi istatistikler (mikro-toplama toplu iş boyutları, kuyruk bekleme süreleri,
+    tahmin önbelleği isabet/ıska sayıları ve dönüşüm pipeline'ı sürümü).
+    """
+    return {
+        "inference": {
+            "backend": inference_executor.backend,
+            "max_workers": inference_executor.max_workers,
+            "max_queue": inference_executor.max_queue,
+            "pending": inference_executor.pending,
+        },
+        "micro_batching": micro_batcher.stats() if micro_batcher else None,
+        "prediction_cache": prediction_cache.stats() if prediction_cache else None,
+        "transform_pipeline": (
+            {
+                "version": transform_pipeline.version,
+                "n_features": transform_pipeline.n_features,
+            }
+            if transform_pipeline is not None
+            else None
+        ),
+    }
+
+
+def _parse_prediction_request(payload):
+    """
+    İstek gövdesini PredictionRequest olarak doğrular. Hata biçimi FastAPI'nin kendi
+    doğrulama yanıtıyla (422) aynıdır.
+    """
+    if not isinstance(payload, dict):
+        raise RequestValidationError(
+            [
+                {
+                    "type": "dict_type",
+                    "loc": ("body",),
+                    "msg": "Input should be a valid dictionary",
+                    "input": payload,
+                }
+            ]
+        )
+    try:
+        return PredictionRequest(**payload)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [
+                {
+                    "type": error["type"],
+                    "loc": ("body", *error["loc"]),
+                    "msg": error["msg"],
+                    "input": error.get("input"),
+                }
+                for error in e.errors()
+            ]
+        )
+
+
+@app.post(
+    "/predict",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": PredictionRequest.schema()}},
+            "required": True,
+        }
+    },
+)
+async def predict(http_request: Request, model: Optional[str] = Query(None)):
+    """
+    Enerji yükü tahmin rotası. `model` sorgu parametresiyle model adı ya da takma ad
+    seçilebilir; verilmezse 'default' takma adı kullanılır.
+
+    Gövde, doğrulama süresi ölçülebilsin diye rota içinde doğrulanır.
+    """
+    loaded = await run_in_threadpool(get_loaded_model, model)
+    stage_labels = {"model": loaded.name, "model_version": loaded.version}
+
+    try:
+        payload = await http_request.json()
+    except ValueError:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body",),
+                    "msg": "JSON decode error",
+                    "input": {},
+                }
+            ]
+        )
+    with metrics.STAGE_LATENCY.time(stage="validation", **stage_labels):
+        request = _parse_prediction_request(payload)
+
+    # Önbellekte aynı istek için tahmin varsa doğrudan döndür
+    cache_key = prediction_cache.make_key(loaded, request) if prediction_cache else None
+    prediction = prediction_cache.get(cache_key) if prediction_cache else None
+    cached = prediction is not None
+
+    if not cached:
+        if transform_pipeline is None:
+            # Girdileri modelin eğitildiği özelliklere göre hizala (pandas kullanmadan).
+            # Satır tamponu bu iş parçacığına ait olduğundan havuza kopyası gönderilir.
+            with metrics.STAGE_LATENCY.time(stage="alignment", **stage_labels):
+                aligned_input = loaded.aligner.transform_request(request).copy()
+        else:
+            try:
+                aligned_input = prepare_features(loaded, [request], stage_labels)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        # Tahmini çıkarım havuzunda (gerekirse diğer isteklerle toplanarak) yap
+        with metrics.STAGE_LATENCY.time(stage="predict", **stage_labels):
+            prediction = float(await run_single_inference(loaded, aligned_input))
+        if prediction_cache:
+            prediction_cache.put(cache_key, prediction)
+
+    with metrics.STAGE_LATENCY.time(stage="serialization", **stage_labels):
+        return JSONResponse(
+            {
+                "prediction": prediction,
+                "model": loaded.name,
+                "model_version": loaded.version,
+                "cached": cached,
+            }
+        )
+
+
+# Toplu tahmin için veri modeli
+class BatchPredictionRequest(BaseModel):
+    """
+    Satır listesi (`instances`) ya da sütun bazlı (`columns`) toplu tahmin girdisi.
+    İkisinden yalnızca biri gönderilmelidir.
+    """
+
+    instances: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+
+
+def _batch_rows(batch):
+    """
+    Toplu isteği satır sözlüklerinden oluşan bir listeye dönüştürür.
+    """
+    if (batch.instances is None) == (batch.columns is None):
+        raise ValueError(
+            "'instances' veya 'columns' alanlarından yalnızca biri gönderilmelidir."
+        )
+
+    if batch.instances is not None:
+        rows = batch.instances
+    else:
+        lengths = {len(values) for values in batch.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(
+                "'columns' altındaki tüm listeler aynı uzunlukta olmalıdır."
+            )
+        n_rows = lengths.pop() if lengths else 0
+        names = list(batch.columns)
+        value_lists = [batch.columns[name] for name in names]
+        rows = (
+            [dict(zip(names, values)) for values in zip(*value_lists)] if n_rows else []
+        )
+
+    if len(rows) > MAX_BATCH_SIZE:
+        raise ValueError(f"Toplu istek en fazla {MAX_BATCH_SIZE} satır içerebilir.")
+    return rows
+
+
+def _validate_rows(rows):
+    """
+    Satırları toplu olarak doğrular; geçerli satırları ve satır bazlı hataları döndürür.
+    """
+    valid_indices, valid_requests, errors = [], [], []
+    for index, row in enumerate(rows):
+        try:
+            valid_requests.append(PredictionRequest(**row))
+            valid_indices.append(index)
+        except ValidationError as e:
+            details = [
+                {"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()
+            ]
+            errors.append({"index": index, "detail": details})
+        except TypeError as e:
+            errors.append({"index": index, "detail": str(e)})
+    return valid_indices, valid_requests, errors
+
+
+@app.post("/predict/batch")
+async def predict_batch(
+    batch: BatchPredictionRequest, model: Optional[str] = Query(None)
+):
+    """
+    Toplu enerji yükü tahmin rotası. Tüm geçerli satırlar tek bir `predict` çağrısıyla
+    tahmin edilir; hatalı satırlar tüm isteği düşürmeden `errors` içinde döner.
+    """
+    loaded = await run_in_threadpool(get_loaded_model, model)
+    stage_labels = {"model": loaded.name, "model_version": loaded.version}
+
+    try:
+        rows = _batch_rows(batch)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+
+    # Büyük toplu isteklerde doğrulama olay döngüsünü bloklamasın
+    with metrics.STAGE_LATENCY.time(stage="validation", **stage_labels):
+        valid_indices, valid_requests, errors = await run_in_threadpool(
+            _validate_rows, rows
+        )
+    predictions = [None] * len(rows)
+
+    # Önbellekte bulunan satırları doldur, yalnızca kalanları modele gönder
+    to_predict = []
+    for index, valid_request in zip(valid_indices, valid_requests):
+        cache_key = (
+            prediction_cache.make_key(loaded, valid_request)
+            if prediction_cache
+            else None
+        )
+        prediction = prediction_cache.get(cache_key) if prediction_cache else None
+        if prediction is None:
+            to_predict.append((index, valid_request, cache_key))
+        else:
+            predictions[index] = prediction
+
+    if to_predict:
+        matrix, to_predict, transform_errors = prepare_batch_features(
+            loaded, to_predict, stage_labels
+        )
+        errors = sorted(errors + transform_errors, key=lambda error: error["index"])
+
+    if to_predict:
+        with metrics.STAGE_LATENCY.time(stage="predict", **stage_labels):
+            batch_predictions = await run_inference(loaded, matrix)
+        for (index, _, cache_key), prediction in zip(to_predict, batch_predictions):
+            predictions[index] = float(prediction)
+            if prediction_cache:
+                prediction_cache.put(cache_key, predictions[index])
+
+    with metrics.STAGE_LATENCY.time(stage="serialization", **stage_labels):
+        return JSONResponse(
+            {
+                "predictions": predictions,
+                "errors": errors,
+                "n_success": len(rows) - len(errors),
+                "n_failed": len(errors),
+                "model": loaded.name,
+                "model_version": loaded.version,
+            }
+        )
@@ -0,0 +1,223 @@
+import functools
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+NS_PER_HOUR = 3600 * 10**9
+NS_PER_DAY = 24 * NS_PER_HOUR
+NAT_VALUE = np.iinfo(np.int64).min
+
+# Takvim özellikleri bu saat dilimindeki yerel saate göre hesaplanır; veri setindeki
+# zaman damgaları İspanya yerel saatindedir (+01:00/+02:00), gün ve tatil sınırları da
+# yereldir
+CALENDAR_TIMEZONE = os.environ.get("CALENDAR_TIMEZONE", "Europe/Madrid")
+
+# Ay (1-12) -> mevsim; tek bir dizi indekslemesiyle
+SEASON_BY_MONTH = np.array(
+    [
+        "Winter",
+        "Winter",
+        "Spring",
+        "Spring",
+        "Spring",
+        "Summer",
+        "Summer",
+        "Summer",
+        "Fall",
+        "Fall",
+        "Fall",
+        "Winter",
+    ],
+    dtype=object,
+)
+
+# API'deki tam sayı mevsim kodlarının sabit tablosu (Fall=0, Spring=1, Summer=2,
+# Winter=3). Dönüşüm pipeline'ı kodları aynı tabloyla çözer (`CATEGORY_CODES`) ve
+# eğitimde öğrenilen mevsimler tabloda yoksa yüklenmez
+SEASON_LABELS = sorted(set(SEASON_BY_MONTH))
+SEASON_CODE_BY_MONTH = np.array(
+    [SEASON_LABELS.index(season) for season in SEASON_BY_MONTH], dtype=np.int64
+)
+
+# Sabit tarihli ulusal resmi tatiller (İspanya): (ay, gün)
+FIXED_HOLIDAYS = [
+    (1, 1),  # Yılbaşı
+    (1, 6),  # Epifani
+    (5, 1),  # İşçi Bayramı
+    (8, 15),  # Meryem'in Göğe Kabulü
+    (10, 12),  # Ulusal Gün
+    (11, 1),  # Azizler Günü
+    (12, 6),  # Anayasa Günü
+    (12, 8),  # Lekesiz Gebelik
+    (12, 25),  # Noel
+]
+
+# Takvim özelliklerinin veri setindeki sırası
+CALENDAR_COLUMNS = [
+    "hour",
+    "day_of_week",
+    "month",
+    "year",
+    "is_weekend",
+    "season",
+    "is_holiday",
+]
+
+# API isteğinde zaman damgasından türetilebilen alanlar
+REQUEST_CALENDAR_FIELDS = [
+    "hour",
+    "day_of_week",
+    "month",
+    "is_weekend",
+    "season",
+    "is_holiday",
+]
+
+
+def _easter(year):
+    """
+    Gregoryen takvimde Paskalya Pazarı (anonim Gregoryen algoritması).
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@functools.lru_cache(maxsize=32)
+def holiday_index(first_year, last_year):
+    """
+    [first_year, last_year] aralığındaki resmi tatillerin 1970-01-01'den itibaren gün
+    numaralarını sıralı int64 dizisi olarak döndürür. Aralık başına bir kez hesaplanır.
+    """
+    epoch = date(1970, 1, 1)
+    days = []
+    for year in range(int(first_year), int(last_year) + 1):
+        holidays = [date(year, month, day) for month, day in FIXED_HOLIDAYS]
+        holidays.append(_easter(year) - timedelta(days=2))  # Kutsal Cuma
+        days.extend((holiday - epoch).days for holiday in holidays)
+    index = np.array(sorted(days), dtype=np.int64)
+    index.setflags(write=False)
+    return index
+
+
+def _to_nanoseconds(times, timezone=None):
+    """
+    Zaman değerlerini (Series, DatetimeIndex, dizi ya da metin) int64 nanosaniyeye
+    çevirir; zaman dilimi olmayan değerler UTC kabul edilir. `timezone` verilirse
+    sonuç o dilimdeki yerel duvar saatidir (yaz saati dahil).
+    """
+    times = pd.to_datetime(times, utc=True)
+    if isinstance(times, pd.Timestamp):
+        times = pd.DatetimeIndex([times])
+    if timezone is not None:
+        times = pd.DatetimeIndex(times).tz_convert(timezone).tz_localize(None)
+    return np.asarray(times.to_numpy(dtype="datetime64[ns]")).view(np.int64)
+
+
+def _civil_from_days(days):
+    """
+    1970-01-01'den itibaren gün sayısından (yıl, ay) hesaplar (H. Hinnant'ın
+    `civil_from_days` algoritmasının vektörel hali).
+    """
+    z = days + 719468
+    era = np.floor_divide(z, 146097)
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    return year, month
+
+
+def calendar_features(times, timezone=CALENDAR_TIMEZONE):
+    """
+    Saat, haftanın günü, ay, yıl, hafta sonu, mevsim ve resmi tatil özelliklerini
+    int64 nanosaniye gösteriminden tek geçişte hesaplar.
+
+    Özellikler `timezone` yerel saatine göredir (ör. 23:30 UTC Cuma, Madrid'de
+    Cumartesi 00:30'dur); sonuçlar yerel saate çevrilmiş zamanların `.dt`
+    erişimcileriyle aynıdır.
+    Eksik zamanlarda sayısal özellikler NaN, mevsim None, bayraklar False olur.
+
+    Returns:
+    - {özellik adı: NumPy dizisi}, anahtarlar `CALENDAR_COLUMNS` sırasında
+    """
+    ns = _to_nanoseconds(times, timezone)
+    missing = ns == NAT_VALUE
+    days = np.floor_divide(ns, NS_PER_DAY)
+    hour = np.floor_divide(ns, NS_PER_HOUR) % 24
+    day_of_week = (days + 3) % 7  # 1970-01-01 Perşembe; Pazartesi=0
+    year, month = _civil_from_days(days)
+
+    if missing.all():
+        is_holiday = np.zeros(len(ns), dtype=bool)
+    else:
+        valid_years = year[~missing]
+        is_holiday = np.isin(days, holiday_index(valid_years.min(), valid_years.max()))
+
+    features = {
+        "hour": hour,
+        "day_of_week": day_of_week,
+        "month": month,
+        "year": year,
+    }
+    for name, values in features.items():
+        if missing.any():
+            values = np.where(missing, np.nan, values)
+        else:
+            values = values.astype(np.int32)
+        features[name] = values
+
+    features["is_weekend"] = (day_of_week >= 5) & ~missing
+    features["season"] = SEASON_BY_MONTH[np.where(missing, 0, month - 1)]
+    if missing.any():
+        features["season"][missing] = None
+    features["is_holiday"] = is_holiday & ~missing
+    return features
+
+
+def add_calendar_features(df, column="time"):
+    """
+    `column` sütununu UTC datetime'a çevirir ve takvim özelliklerini DataFrame'e ekler.
+    """
+    df[column] = pd.to_datetime(df[column], utc=True)
+    for name, values in calendar_features(df[column]).items():
+        df[name] = values
+    return df
+
+
+@functools.lru_cache(maxsize=4096)
+def _request_fields_for_hour(hour_ns):
+    features = calendar_features(np.array([hour_ns], dtype="datetime64[ns]"))
+    return {
+        "hour": int(features["hour"][0]),
+        "day_of_week": int(features["day_of_week"][0]),
+        "month": int(features["month"][0]),
+        "is_weekend": int(features["is_weekend"][0]),
+        "season": int(SEASON_CODE_BY_MONTH[features["month"][0] - 1]),
+        "is_holiday": int(features["is_holiday"][0]),
+    }
+
+
+def request_calendar_fields(timestamp):
+    """
+    Tek bir zaman damgasından API istek alanlarını (`REQUEST_CALENDAR_FIELDS`)
+    türetir (zaman dilimsiz değerler UTC kabul edilir, alanlar `CALENDAR_TIMEZONE`
+    yerel saatine göredir). Mevsim, `SEASON_LABELS` tablosundaki kodu olarak döner.
+    Sonuçlar UTC saati başına önbelleklenir.
+    """
+    ns = int(_to_nanoseconds(timestamp)[0])
+    if ns == NAT_VALUE:
+        raise ValueError("Geçersiz zaman damgası.")
+    return dict(_request_fields_for_hour(ns - ns % NS_PER_HOUR))
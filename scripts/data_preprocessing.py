@@ -1,211 +1,253 @@
-<<<<<<< HEAD
+import argparse
 import os
 
-import joblib
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder, OneHotEncoder, StandardScaler
-=======
-import pandas as pd
-import os
-from sklearn.preprocessing import LabelEncoder, OneHotEncoder, StandardScaler
-import joblib
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+
+from scripts.feature_engineering import STREAM_CHUNK_SIZE
+from scripts.storage import (
+    DatasetWriter,
+    iter_dataset,
+    list_partitions,
+    load_dataset,
+    load_dataset_stats,
+    partitions_dir,
+    save_dataset,
+)
+from scripts.streaming import RunningMoments, ValueCounts
+from scripts.transform_pipeline import (
+    ENCODERS_DIR,
+    TRANSFORM_PIPELINE_SUFFIX,
+    fit_transform_pipeline,
+)
 
 # Dosya yolları
 PROCESSED_DATA_DIR = "./data/processed/"
-ENERGY_DATA_FILE = PROCESSED_DATA_DIR + "processed_energy_data.csv"
-WEATHER_DATA_FILE = PROCESSED_DATA_DIR + "processed_weather_data.csv"
-ENCODERS_DIR = "./encoders/"
+ENERGY_DATASET = "processed_energy_data"
+WEATHER_DATASET = "processed_weather_data"
+
+# Özellik olarak kullanılmayan, ayrı ölçeklenen hedef sütunlar
+ENERGY_TARGETS = ["total load actual", "price actual"]
+
+# One-Hot çıktısını seyrek tut (ortam değişkeniyle açılır: SPARSE_ENCODING=1)
+SPARSE_ENCODING = os.environ.get("SPARSE_ENCODING", "0") == "1"
 
 # Klasör oluşturma
 os.makedirs(ENCODERS_DIR, exist_ok=True)
 
-<<<<<<< HEAD
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-# RARE Encoding
-def rare_encoder(data, column, threshold=0.01, replace_with="RARE"):
+# Kategorik ve sayısal sütunları analiz etme
+def analyze_columns(data):
+    categorical_cols = data.select_dtypes(
+        include=["object", "category"]
+    ).columns.tolist()
+    # Tüm tam sayı/ondalık genişlikleri (Parquet'ten gelen int32 dahil); bool hariç
+    numerical_cols = data.select_dtypes(include=["number"]).columns.tolist()
+    return categorical_cols, numerical_cols
+
+
+def preprocess_dataset(
+    data, name, target_columns=(), sparse=SPARSE_ENCODING, clip_bounds=None
+):
     """
-    RARE encoding: Kategorik değişkenlerde az frekanslı kategorileri "RARE" grubuna toplar.
+    Veri setinin dönüşüm pipeline'ını (RARE encoding -> kodlama -> ölçekleme) öğrenir,
+    `ENCODERS_DIR` altına tek dosya olarak kaydeder ve dönüştürülmüş veriyi döndürür.
+    `clip_bounds` verilirse aykırı değer sınırları da pipeline'a eklenir.
     """
-    freq = data[column].value_counts(normalize=True)
-    rare_categories = freq[freq < threshold].index.tolist()
-<<<<<<< HEAD
-    data[column] = data[column].apply(
-        lambda x: replace_with if x in rare_categories else x
+    categorical_cols, numerical_cols = analyze_columns(data)
+
+    print(f"\n{name} veri seti için dönüşüm pipeline'ı öğreniliyor...")
+    pipeline = fit_transform_pipeline(
+        data,
+        categorical_cols,
+        numerical_cols,
+        target_columns=target_columns,
+        threshold=0.01,
+        sparse=sparse,
+        clip_bounds=clip_bounds,
     )
-    print(
-        f"'{column}' sütununda {len(rare_categories)} kategori '{replace_with}' olarak yeniden adlandırıldı."
-    )
-    return data
+    pipeline.save(os.path.join(ENCODERS_DIR, f"{name}{TRANSFORM_PIPELINE_SUFFIX}"))
+    return pipeline.transform_dataset(data)
 
 
-=======
-    data[column] = data[column].apply(lambda x: replace_with if x in rare_categories else x)
-    print(f"'{column}' sütununda {len(rare_categories)} kategori '{replace_with}' olarak yeniden adlandırıldı.")
-    return data
+def _outlier_bounds(dataset_name):
+    # feature_engineering'in kaydettiği aykırı değer sınırları (yoksa None)
+    stats = load_dataset_stats(PROCESSED_DATA_DIR, dataset_name)
+    return stats["bounds"] if stats else None
 
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-# RARE Encoding Uygulama
-def apply_rare_encoding(data, categorical_columns, threshold=0.01, replace_with="RARE"):
-    """
-    Tüm kategorik sütunlara RARE Encoding uygular. Belirli sütunlar (ör. 'time') hariç tutulur.
-    """
-<<<<<<< HEAD
-    exclude_columns = ["time"]  # Hariç tutulacak sütunlar
-    for col in categorical_columns:
-        if col not in exclude_columns:
-            data = rare_encoder(
-                data, col, threshold=threshold, replace_with=replace_with
-            )
-    return data
 
+def _saved_moments(stats, columns):
+    # feature_engineering'in kaydettiği ölçekleyici istatistikleri tüm sütunları
+    # kapsıyorsa ana dosyanın özeti olarak kullanılır
+    if not stats or not all(c in stats.get("mean", {}) for c in columns):
+        return None
+    return RunningMoments.from_stats(
+        stats["n_rows"],
+        [stats["mean"][c] for c in columns],
+        [stats["std"][c] for c in columns],
+    )
 
-# Kategorik ve sayısal sütunları analiz etme
-def analyze_columns(data):
-    categorical_cols = data.select_dtypes(
-        include=["object", "category"]
-    ).columns.tolist()
-    numerical_cols = data.select_dtypes(include=["int64", "float64"]).columns.tolist()
-    return categorical_cols, numerical_cols
 
+def scan_processed_data(dataset_name, chunksize=STREAM_CHUNK_SIZE):
+    """
+    Akış modunun ilk geçişi: pipeline'ı öğrenmek için gereken istatistikleri veri
+    setini parça parça okuyarak toplar.
 
-=======
-    exclude_columns = ['time']  # Hariç tutulacak sütunlar
-    for col in categorical_columns:
-        if col not in exclude_columns:
-            data = rare_encoder(data, col, threshold=threshold, replace_with=replace_with)
-    return data
+    - Sayısal ve hedef sütunların ortalama/standart sapması `feature_engineering`
+      tarafından kaydedilen özetten alınır; yalnızca sonradan eklenen zaman
+      bölümleri okunarak güncellenir. Özet yoksa tüm veriden hesaplanır.
+    - Sayısal olmayan girdi sütunlarının değer sayıları (RARE sıklıkları, kategoriler
+      ve dolgu değerleri için) tüm veriden sayılır.
 
-# Kategorik ve sayısal sütunları analiz etme
-def analyze_columns(data):
-    categorical_cols = data.select_dtypes(include=["object", "category"]).columns.tolist()
-    numerical_cols = data.select_dtypes(include=["int64", "float64"]).columns.tolist()
-    return categorical_cols, numerical_cols
+    Returns:
+    - (şablon çerçeve, kategorik sütunlar, sayısal sütunlar, moments, value_counts)
+    """
+    template = next(
+        iter_dataset(PROCESSED_DATA_DIR, dataset_name, chunksize=1, partitions=False)
+    )
+    categorical_cols, numerical_cols = analyze_columns(template)
+    counted_cols = [
+        c
+        for c in template.columns
+        if c not in numerical_cols
+        and not pd.api.types.is_datetime64_any_dtype(template[c])
+    ]
+
+    stats = load_dataset_stats(PROCESSED_DATA_DIR, dataset_name)
+    moments = _saved_moments(stats, numerical_cols)
+    read_base_moments = moments is None
+    if read_base_moments:
+        moments = RunningMoments(len(numerical_cols))
+    value_counts = ValueCounts(counted_cols)
+
+    for chunk in iter_dataset(
+        PROCESSED_DATA_DIR, dataset_name, chunksize=chunksize, partitions=False
+    ):
+        value_counts.update(chunk)
+        if read_base_moments:
+            moments.update(chunk[numerical_cols].to_numpy(dtype="float64"))
+
+    part_dir = partitions_dir(PROCESSED_DATA_DIR, dataset_name)
+    for partition in list_partitions(PROCESSED_DATA_DIR, dataset_name):
+        for chunk in iter_dataset(part_dir, partition, chunksize=chunksize):
+            value_counts.update(chunk)
+            moments.update(chunk[numerical_cols].to_numpy(dtype="float64"))
+
+    print(
+        f"{dataset_name}: {moments.count} satır tarandı "
+        f"(ölçekleyici özeti {'veriden' if read_base_moments else 'kayıttan'})."
+    )
+    summary = {
+        column: (moments.count, mean, std)
+        for column, mean, std in zip(numerical_cols, moments.mean, moments.std)
+    }
+    return template, categorical_cols, numerical_cols, summary, value_counts
 
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-# Encoding işlemleri
-def encode_columns(data, categorical_cols):
+
+def _fit_frame(template, value_counts):
     """
-    Kategorik sütunlara uygun encoding uygular (LabelEncoder, OneHotEncoder).
+    Pipeline'ın sütun tiplerini ve kategorilerini öğreneceği küçük çerçeve: her
+    sayılmış sütunun tüm farklı değerleri (eksik dahil) birer kez yer alır.
     """
-    encoders = {}
-<<<<<<< HEAD
-    exclude_columns = ["time"]  # Encoding dışında tutulacak sütunlar
-=======
-    exclude_columns = ['time']  # Encoding dışında tutulacak sütunlar
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-
-    for col in categorical_cols:
-        if col in exclude_columns:
-            continue  # 'time' sütununu atla
-
-        unique_values = data[col].nunique()
-        if unique_values == 2:  # İkili kategoriler için Label Encoding
-            le = LabelEncoder()
-            data[col] = le.fit_transform(data[col])
-            encoders[col] = le
-            joblib.dump(le, os.path.join(ENCODERS_DIR, f"{col}_label_encoder.pkl"))
-        else:  # Çok kategorili değişkenler için One-Hot Encoding
-<<<<<<< HEAD
-            ohe = OneHotEncoder(
-                sparse_output=False, handle_unknown="ignore"
-            )  # 'sparse_output' kullanıldı
-            ohe_features = ohe.fit_transform(data[[col]])
-            ohe_feature_names = [f"{col}_{category}" for category in ohe.categories_[0]]
-            ohe_df = pd.DataFrame(
-                ohe_features, columns=ohe_feature_names, index=data.index
-            )
-=======
-            ohe = OneHotEncoder(sparse_output=False, handle_unknown="ignore")  # 'sparse_output' kullanıldı
-            ohe_features = ohe.fit_transform(data[[col]])
-            ohe_feature_names = [f"{col}_{category}" for category in ohe.categories_[0]]
-            ohe_df = pd.DataFrame(ohe_features, columns=ohe_feature_names, index=data.index)
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-            data = pd.concat([data, ohe_df], axis=1)
-            data.drop(columns=[col], inplace=True)
-            encoders[col] = ohe
-            joblib.dump(ohe, os.path.join(ENCODERS_DIR, f"{col}_onehot_encoder.pkl"))
-    return data
-
-<<<<<<< HEAD
-
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-# Sayısal verilerin ölçeklenmesi
-def scale_numeric_columns(data, numerical_cols):
+    values = {c: value_counts.distinct(c) for c in value_counts.columns}
+    n_rows = max([len(v) for v in values.values()] + [1])
+    frame = template.iloc[[0] * n_rows].reset_index(drop=True)
+    for column, distinct in values.items():
+        distinct = distinct or [template[column].iloc[0]]
+        padded = distinct + [distinct[0]] * (n_rows - len(distinct))
+        frame[column] = pd.Series(padded, dtype=template[column].dtype)
+    return frame
+
+
+def preprocess_dataset_streaming(
+    dataset_name, name, output_name, target_columns=(), chunksize=STREAM_CHUNK_SIZE
+):
     """
-    Sayısal sütunları ölçeklendirme.
+    Bellekten büyük veri seti için `preprocess_dataset` karşılığı.
+
+    Pipeline `scan_processed_data` özetinden öğrenilir (ölçekleyici kaydedilmiş
+    ortalama/standart sapmadan kurulur); ikinci geçişte her parça dönüştürülüp
+    `DatasetWriter` ile son veri setine artımlı yazılır. One-Hot çıktısı yoğundur.
     """
-    scaler = StandardScaler()
-    data[numerical_cols] = scaler.fit_transform(data[numerical_cols])
-    joblib.dump(scaler, os.path.join(ENCODERS_DIR, "numeric_scaler.pkl"))
-    print("Sayısal sütunlar ölçeklendi ve scaler kaydedildi.")
-    return data
+    print(
+        f"\n{name} veri seti akış modunda işleniyor ({chunksize} satırlık parçalar)..."
+    )
+    template, categorical_cols, numerical_cols, moments, value_counts = (
+        scan_processed_data(dataset_name, chunksize)
+    )
+    pipeline = fit_transform_pipeline(
+        _fit_frame(template, value_counts),
+        categorical_cols,
+        numerical_cols,
+        target_columns=target_columns,
+        threshold=0.01,
+        sparse=False,
+        clip_bounds=_outlier_bounds(dataset_name),
+        moments=moments,
+        value_counts=value_counts,
+    )
+    pipeline.save(os.path.join(ENCODERS_DIR, f"{name}{TRANSFORM_PIPELINE_SUFFIX}"))
+
+    with DatasetWriter(PROCESSED_DATA_DIR, output_name) as writer:
+        for chunk in iter_dataset(
+            PROCESSED_DATA_DIR, dataset_name, chunksize=chunksize
+        ):
+            writer.write(pipeline.transform_dataset(chunk))
+    print(f"İşlenmiş veri kaydedildi: {writer.path} ({writer.n_rows} satır)")
+    return writer.path
 
-<<<<<<< HEAD
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
 # Veri dönüşümü
 def preprocess_data():
     # Veriyi yükle
-    energy_data = pd.read_csv(ENERGY_DATA_FILE)
-    weather_data = pd.read_csv(WEATHER_DATA_FILE)
-
-    # Kategorik ve sayısal sütunları belirle
-    energy_categorical_cols, energy_numerical_cols = analyze_columns(energy_data)
-    weather_categorical_cols, weather_numerical_cols = analyze_columns(weather_data)
-
-    # 1. RARE Encoding Uygula
-    print("\nEnergy Dataset için RARE Encoding uygulanıyor...")
-<<<<<<< HEAD
-    energy_data = apply_rare_encoding(
-        energy_data, energy_categorical_cols, threshold=0.01
+    energy_data = load_dataset(PROCESSED_DATA_DIR, ENERGY_DATASET)
+    weather_data = load_dataset(PROCESSED_DATA_DIR, WEATHER_DATASET)
+
+    energy_data = preprocess_dataset(
+        energy_data,
+        "energy",
+        target_columns=ENERGY_TARGETS,
+        clip_bounds=_outlier_bounds(ENERGY_DATASET),
     )
-    print("\nWeather Dataset için RARE Encoding uygulanıyor...")
-    weather_data = apply_rare_encoding(
-        weather_data, weather_categorical_cols, threshold=0.01
+    weather_data = preprocess_dataset(
+        weather_data, "weather", clip_bounds=_outlier_bounds(WEATHER_DATASET)
     )
-=======
-    energy_data = apply_rare_encoding(energy_data, energy_categorical_cols, threshold=0.01)
-    print("\nWeather Dataset için RARE Encoding uygulanıyor...")
-    weather_data = apply_rare_encoding(weather_data, weather_categorical_cols, threshold=0.01)
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-
-    # 2. Encoding işlemleri
-    print("\nEnergy Dataset için dönüşümler uygulanıyor...")
-    energy_data = encode_columns(energy_data, energy_categorical_cols)
-    energy_data = scale_numeric_columns(energy_data, energy_numerical_cols)
-
-    print("\nWeather Dataset için dönüşümler uygulanıyor...")
-    weather_data = encode_columns(weather_data, weather_categorical_cols)
-    weather_data = scale_numeric_columns(weather_data, weather_numerical_cols)
 
     # İşlenmiş verileri kaydet
-<<<<<<< HEAD
-    energy_data.to_csv(
-        os.path.join(PROCESSED_DATA_DIR, "final_energy_data.csv"), index=False
-    )
-    weather_data.to_csv(
-        os.path.join(PROCESSED_DATA_DIR, "final_weather_data.csv"), index=False
-    )
+    save_dataset(energy_data, PROCESSED_DATA_DIR, "final_energy_data")
+    save_dataset(weather_data, PROCESSED_DATA_DIR, "final_weather_data")
     print("İşlenmiş veriler kaydedildi.")
 
 
 def main():
-    preprocess_data()
-
-
-=======
-    energy_data.to_csv(os.path.join(PROCESSED_DATA_DIR, "final_energy_data.csv"), index=False)
-    weather_data.to_csv(os.path.join(PROCESSED_DATA_DIR, "final_weather_data.csv"), index=False)
-    print("İşlenmiş veriler kaydedildi.")
+    parser = argparse.ArgumentParser(description="İşlenmiş veriyi modele hazırla.")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Veri setlerini parça parça işle (bellekten büyük veri için).",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=STREAM_CHUNK_SIZE,
+        help="Akış modunda parça başına satır sayısı.",
+    )
+    args = parser.parse_args()
+
+    if args.stream:
+        preprocess_dataset_streaming(
+            ENERGY_DATASET,
+            "energy",
+            "final_energy_data",
+            target_columns=ENERGY_TARGETS,
+            chunksize=args.chunksize,
+        )
+        preprocess_dataset_streaming(
+            WEATHER_DATASET, "weather", "final_weather_data", chunksize=args.chunksize
+        )
+        return
 
-def main():
     preprocess_data()
 
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+
 if __name__ == "__main__":
     main()
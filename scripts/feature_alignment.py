@@ -0,0 +1,147 @@
+import re
+import threading
+
+import numpy as np
+
+
+def normalize_feature_name(name):
+    """
+    Özellik adını karşılaştırma için normalize eder.
+    Örn. 'generation fossil brown coal/lignite' -> 'generation_fossil_brown_coal_lignite'
+    """
+    return re.sub(r"[^0-9a-z]+", "_", str(name).lower()).strip("_")
+
+
+class FeatureAligner:
+    """
+    Girdi alanlarını modelin eğitildiği sütunlara eşleyen, model yüklenirken bir kez
+    derlenen hizalama planı.
+
+    API'deki snake_case alan adları ('generation_fossil_gas') ile eğitim sütunları
+    ('generation fossil gas') normalize edilmiş ad üzerinden eşleşir. Tahmin sırasında
+    pandas nesnesi oluşturulmaz; değerler önceden ayrılmış float64 satır tamponuna
+    doğrudan yazılır.
+    """
+
+    def __init__(self, feature_names, field_names=(), fill_value=0.0):
+        self.feature_names = [str(name) for name in feature_names]
+        self.n_features = len(self.feature_names)
+        self.fill_value = float(fill_value)
+
+        # Hem orijinal hem de normalize edilmiş adlardan sütun indeksine eşleme
+        self._column_index = {}
+        for i, name in enumerate(self.feature_names):
+            self._column_index.setdefault(normalize_feature_name(name), i)
+        for i, name in enumerate(self.feature_names):
+            self._column_index[name] = i
+
+        # Sabit alan listesi için derlenmiş (alan adı, sütun indeksi) planı
+        self.field_names = tuple(field_names)
+        plan = [(field, self._resolve(field)) for field in self.field_names]
+        self._plan = [(field, column) for field, column in plan if column is not None]
+        self._plan_fields = tuple(field for field, _ in self._plan)
+        self._plan_columns = np.array(
+            [column for _, column in self._plan], dtype=np.intp
+        )
+        self._plan_positions = np.array(
+            [i for i, (_, column) in enumerate(plan) if column is not None],
+            dtype=np.intp,
+        )
+
+        self.unmatched_fields = [field for field, column in plan if column is None]
+        matched = set(self._plan_columns.tolist())
+        self.missing_features = [
+            name for i, name in enumerate(self.feature_names) if i not in matched
+        ]
+
+        # Her iş parçacığı için ayrı satır tamponu (FastAPI senkron rotaları threadpool'da çalışır)
+        self._local = threading.local()
+
+    @classmethod
+    def from_model(cls, model, field_names=(), fill_value=0.0):
+        """
+        Eğitilmiş modelin `feature_names_in_` bilgisinden hizalama planı oluşturur.
+        """
+        if not hasattr(model, "feature_names_in_"):
+            raise ValueError("Model 'feature_names_in_' özelliğine sahip değil.")
+        return cls(model.feature_names_in_, field_names, fill_value=fill_value)
+
+    def _resolve(self, name):
+        column = self._column_index.get(name)
+        if column is None:
+            column = self._column_index.get(normalize_feature_name(name))
+        return column
+
+    def _row_buffer(self):
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.empty((1, self.n_features), dtype=np.float64)
+            self._local.row = row
+        row.fill(self.fill_value)
+        return row
+
+    def transform_request(self, request):
+        """
+        Tek bir doğrulanmış isteği (alanları öznitelik olan nesne) satır tamponuna yazar.
+        Dönen dizi iş parçacığına ait tampondur; bir sonraki çağrıda üzerine yazılır.
+        """
+        row = self._row_buffer()
+        for field, column in self._plan:
+            row[0, column] = getattr(request, field)
+        return row
+
+    def transform_mapping(self, values):
+        """
+        Sözlük biçimindeki tek bir girdiyi satır tamponuna yazar.
+        Anahtarlar eğitim sütun adı ya da snake_case karşılığı olabilir.
+        """
+        row = self._row_buffer()
+        for name, value in values.items():
+            column = self._resolve(name)
+            if column is not None:
+                row[0, column] = value
+        return row
+
+    def transform_many(self, requests):
+        """
+        Doğrulanmış istek listesinden (n_satır, n_özellik) float64 matris oluşturur.
+        """
+        matrix = np.full(
+            (len(requests), self.n_features), self.fill_value, dtype=np.float64
+        )
+        if requests and self._plan:
+            values = np.array(
+                [
+                    [getattr(request, field) for field in self._plan_fields]
+                    for request in requests
+                ],
+                dtype=np.float64,
+            )
+            matrix[:, self._plan_columns] = values
+        return matrix
+
+    def transform_frame(self, frame):
+        """
+        Bir DataFrame'in sütunlarını modelin özellik sırasına göre NumPy matrisine dizer.
+        Eşleşmeyen sütunlar yok sayılır, eksik özellikler `fill_value` ile doldurulur.
+        """
+        matrix = np.full(
+            (len(frame), self.n_features), self.fill_value, dtype=np.float64
+        )
+        for name in frame.columns:
+            column = self._resolve(name)
+            if column is not None:
+                matrix[:, column] = frame[name].to_numpy(dtype=np.float64)
+        return matrix
+
+    def transform_array(self, values):
+        """
+        Sütunları `field_names` sırasında olan (n_satır, n_alan) matrisi (ör. dönüşüm
+        pipeline'ının çıktısı) modelin özellik sırasına dizer.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        matrix = np.full(
+            (values.shape[0], self.n_features), self.fill_value, dtype=np.float64
+        )
+        matrix[:, self._plan_columns] = values[:, self._plan_positions]
+        return matrix
@@ -1,32 +1,22 @@
-<<<<<<< HEAD
+import argparse
 import os
 import warnings
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
-=======
-import warnings
-import pandas as pd
-import numpy as np
-import os
-from datetime import datetime
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+
+from scripts.calendar_features import add_calendar_features
+from scripts.storage import DatasetWriter, save_dataset, save_dataset_stats
+from scripts.streaming import RESERVOIR_SIZE, ReservoirQuantiles, RunningMoments
 
 # Tüm uyarıları kapat
 warnings.filterwarnings("ignore")
 
-<<<<<<< HEAD
 pd.set_option("display.max_columns", None)
 pd.set_option("display.max_rows", None)
 pd.set_option("display.float_format", lambda x: "%.3f" % x)
 pd.set_option("display.width", 500)
-=======
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
-pd.set_option('display.float_format', lambda x: '%.3f' % x)
-pd.set_option('display.width', 500)
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
 
 # Dosya yolları
 RAW_DATA_DIR = "./data/raw/"
@@ -34,10 +24,10 @@ PROCESSED_DATA_DIR = "./data/processed/"
 ENERGY_DATA_FILE = os.path.join(RAW_DATA_DIR, "energy_dataset.csv")
 WEATHER_DATA_FILE = os.path.join(RAW_DATA_DIR, "weather_features.csv")
 
-<<<<<<< HEAD
+# Akış modunda ham CSV'den bir seferde okunacak satır sayısı
+STREAM_CHUNK_SIZE = 100000
+
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
 def load_data():
     """
     Verileri yükler ve DataFrame olarak döndürür.
@@ -63,71 +53,41 @@ def handle_missing_values(df, threshold=0.5):
     print(f"Orijinal veri boyutu: {df.shape}")
 
     # Tamamen eksik sütunları kaldır
-<<<<<<< HEAD
     df = df.dropna(axis=1, how="all")
-=======
-    df = df.dropna(axis=1, how='all')
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
 
     # Eksik satırları kaldır (eğer oran çok düşükse)
     df = df.dropna(axis=0, thresh=int(df.shape[1] * threshold))
 
     # Eksik değerleri uygun bir şekilde doldur
-<<<<<<< HEAD
-    df.fillna(method="ffill", inplace=True)  # İleri doldurma (forward fill)
-    df.fillna(method="bfill", inplace=True)  # Geri doldurma (backward fill)
-=======
-    df.fillna(method='ffill', inplace=True)  # İleri doldurma (forward fill)
-    df.fillna(method='bfill', inplace=True)  # Geri doldurma (backward fill)
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+    df = df.ffill()  # İleri doldurma (forward fill)
+    df = df.bfill()  # Geri doldurma (backward fill)
 
     print(f"İşlem sonrası veri boyutu: {df.shape}")
     return df
 
-<<<<<<< HEAD
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-def create_new_features(df):
+def create_new_features(df, verbose=True):
     """
     Yeni özellikler türetir.
 
     Args:
     - df: Veri çerçevesi
+    - verbose: İlerleme mesajı yazdır (akış modunda parça başına kapatılır)
 
     Returns:
     - Özellikleri genişletilmiş DataFrame
     """
-    print("Yeni özellikler türetiliyor...")
+    if verbose:
+        print("Yeni özellikler türetiliyor...")
 
-    # Tarih bilgisi içeren sütunu datetime formatına çevir
-<<<<<<< HEAD
+    # Tarih sütunundan saat, gün, ay, yıl, hafta sonu, mevsim ve resmi tatil
+    # özellikleri tek geçişte türetilir (bkz. scripts/calendar_features.py)
     if "time" in df.columns:
-        df["time"] = pd.to_datetime(df["time"], utc=True)
-        df["hour"] = df["time"].dt.hour  # Saat bilgisi
-        df["day_of_week"] = df["time"].dt.dayofweek  # Haftanın günü
-        df["month"] = df["time"].dt.month  # Ay bilgisi
-        df["year"] = df["time"].dt.year  # Yıl bilgisi
-        df["is_weekend"] = df["time"].dt.dayofweek >= 5  # Hafta sonu mu?
-        df["season"] = df["month"].apply(assign_season)  # Mevsim bilgisi
+        df = add_calendar_features(df, "time")
 
     # Enerji üretim yüzdeleri
     if "total load actual" in df.columns:
         generation_cols = [col for col in df.columns if "generation" in col]
-=======
-    if 'time' in df.columns:
-        df['time'] = pd.to_datetime(df['time'], utc=True)
-        df['hour'] = df['time'].dt.hour  # Saat bilgisi
-        df['day_of_week'] = df['time'].dt.dayofweek  # Haftanın günü
-        df['month'] = df['time'].dt.month  # Ay bilgisi
-        df['year'] = df['time'].dt.year  # Yıl bilgisi
-        df['is_weekend'] = df['time'].dt.dayofweek >= 5  # Hafta sonu mu?
-        df['season'] = df['month'].apply(assign_season)  # Mevsim bilgisi
-
-    # Enerji üretim yüzdeleri
-    if 'total load actual' in df.columns:
-        generation_cols = [col for col in df.columns if 'generation' in col]
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
         total_generation = df[generation_cols].sum(axis=1)
         for col in generation_cols:
             df[f"{col}_percentage"] = (df[col] / total_generation).fillna(0) * 100
@@ -135,98 +95,277 @@ def create_new_features(df):
     return df
 
 
-def assign_season(month):
+def _numeric_columns(df):
+    return df.select_dtypes(include=["float64", "int64"]).columns.tolist()
+
+
+def compute_outlier_bounds(df):
     """
-    Ay bilgisine göre mevsim belirler.
+    Tüm sayısal sütunların IQR sınırlarını (Q1/Q3 ± 1.5 IQR) tek bir çeyrek
+    hesabıyla bulur.
+
+    Returns:
+    - {sütun: (alt_sınır, üst_sınır)}
     """
-    if month in [12, 1, 2]:
-        return "Winter"
-    elif month in [3, 4, 5]:
-        return "Spring"
-    elif month in [6, 7, 8]:
-        return "Summer"
-    elif month in [9, 10, 11]:
-        return "Fall"
+    numeric_cols = _numeric_columns(df)
+    q1, q3 = df[numeric_cols].quantile([0.25, 0.75]).to_numpy()
+    iqr = q3 - q1
+    return {
+        column: (float(lower), float(upper))
+        for column, lower, upper in zip(numeric_cols, q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    }
 
 
-def detect_and_handle_outliers(df):
+def clip_outliers(df, bounds):
     """
-    Aykırı değerleri tespit eder ve işleme alır.
+    Sütunları verilen sınırlara kırpar (float64'e çevirir) ve sınır dışında kalan
+    değerleri sayar. Kırpma ve sayım tüm sütunlar için tek 2B dizi üzerinde yapılır.
+
+    Returns:
+    - (kırpılmış DataFrame, {sütun: aykırı değer sayısı})
     """
-    print("Aykırı değerler tespit ediliyor...")
-<<<<<<< HEAD
-    numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns
-=======
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-
-    for col in numeric_cols:
-        q1 = df[col].quantile(0.25)
-        q3 = df[col].quantile(0.75)
-        iqr = q3 - q1
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
-
-        # Aykırı değerleri sınırlarla değiştirme
-        df[col] = np.where(df[col] < lower_bound, lower_bound, df[col])
-        df[col] = np.where(df[col] > upper_bound, upper_bound, df[col])
+    columns = [column for column in bounds if column in df.columns]
+    if not columns:
+        return df, {}
+    lower, upper = np.array([bounds[column] for column in columns]).T
+    values = df[columns].to_numpy(dtype=np.float64)
+    counts = ((values < lower) | (values > upper)).sum(axis=0)
+    df[columns] = np.clip(values, lower, upper)
+    return df, dict(zip(columns, counts.tolist()))
+
+
+def _outlier_summary_frame(outlier_counts):
+    summary = pd.DataFrame(
+        list(outlier_counts.items()), columns=["Column", "Outlier Count"]
+    )
+    return summary.sort_values(by="Outlier Count", ascending=False)
+
+
+def handle_outliers(df, bounds=None):
+    """
+    Aykırı değer özetini ve kırpılmış veriyi tek geçişte üretir.
 
+    Args:
+    - df: Veri çerçevesi
+    - bounds: Önceden kaydedilmiş sınırlar; verilmezse veriden hesaplanır
+
+    Returns:
+    - (kırpılmış DataFrame, özet DataFrame, sınırlar)
+    """
+    print("Aykırı değerler tespit ediliyor...")
+    if bounds is None:
+        bounds = compute_outlier_bounds(df)
+    df, outlier_counts = clip_outliers(df, bounds)
     print("Aykırı değer işlemleri tamamlandı.")
-    return df
+    return df, _outlier_summary_frame(outlier_counts), bounds
 
-<<<<<<< HEAD
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-def outlier_summary(df):
+def detect_and_handle_outliers(df):
     """
-    Aykırı değerlerin sütun bazında sayısını hesaplar.
+    Aykırı değerleri tespit eder ve sınırlara kırpar.
     """
-<<<<<<< HEAD
-    numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns
-=======
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-    outlier_counts = {}
+    return handle_outliers(df)[0]
 
-    for col in numeric_cols:
-        q1 = df[col].quantile(0.25)
-        q3 = df[col].quantile(0.75)
-        iqr = q3 - q1
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
 
-        # Aykırı değerlerin sayısını hesapla
-        outliers = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
-        outlier_counts[col] = outliers
+def outlier_summary(df):
+    """
+    Aykırı değerlerin sütun bazında sayısını hesaplar (veriyi değiştirmez).
+    """
+    return handle_outliers(df.copy())[1]
 
-    # Sonuçları bir DataFrame olarak döndür
-<<<<<<< HEAD
-    outlier_summary_df = pd.DataFrame(
-        list(outlier_counts.items()), columns=["Column", "Outlier Count"]
-    )
-    return outlier_summary_df.sort_values(by="Outlier Count", ascending=False)
-=======
-    outlier_summary_df = pd.DataFrame(list(outlier_counts.items()), columns=['Column', 'Outlier Count'])
-    return outlier_summary_df.sort_values(by='Outlier Count', ascending=False)
 
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+def _moment_columns(df):
+    # data_preprocessing'in ölçeklediği sütunlar: tüm sayısal tipler (bool hariç)
+    return df.select_dtypes(include=["number"]).columns.tolist()
 
 
-def save_processed_data(df, file_name):
+def _scaler_stats(columns, mean, std):
     """
-    İşlenmiş veriyi kaydeder. Gerekirse 'processed' dizinini oluşturur.
+    Ölçekleyici istatistikleri (ddof=0) istatistik dosyasındaki biçimde.
     """
-    # Eğer klasör mevcut değilse oluştur
-    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+    return {
+        "mean": dict(zip(columns, np.asarray(mean, dtype=np.float64).tolist())),
+        "std": dict(zip(columns, np.asarray(std, dtype=np.float64).tolist())),
+    }
+
+
+def _frame_scaler_stats(df):
+    columns = _moment_columns(df)
+    return _scaler_stats(columns, df[columns].mean(), df[columns].std(ddof=0))
 
-    # İşlenmiş veriyi kaydet
-    processed_file_path = os.path.join(PROCESSED_DATA_DIR, file_name)
-    df.to_csv(processed_file_path, index=False)
+
+def save_outlier_stats(name, bounds, outlier_counts, n_rows, **extra):
+    """
+    Aykırı değer sınırlarını işlenmiş veri setinin yanına kaydeder; yeni veri
+    (artımlı yükleme, API) sınırlar yeniden hesaplanmadan kırpılabilir.
+    """
+    stats = {
+        "n_rows": int(n_rows),
+        "bounds": bounds,
+        "outlier_counts": {column: int(n) for column, n in outlier_counts.items()},
+        **extra,
+    }
+    stats_file = save_dataset_stats(stats, PROCESSED_DATA_DIR, name)
+    print(f"Aykırı değer sınırları kaydedildi: {stats_file}")
+    return stats
+
+
+def save_processed_data(df, name):
+    """
+    İşlenmiş veriyi sütunlu biçimde (varsayılan Parquet) kaydeder. Gerekirse
+    'processed' dizinini oluşturur.
+    """
+    processed_file_path = save_dataset(df, PROCESSED_DATA_DIR, name)
     print(f"İşlenmiş veri kaydedildi: {processed_file_path}")
 
 
+def _iter_clean_chunks(
+    file_path, chunksize, drop_columns=(), n_columns=None, threshold=0.5, fill=None
+):
+    """
+    Ham CSV'yi parça parça okur; her parçaya `handle_missing_values` ve
+    `create_new_features` adımlarının akış karşılığını uygular.
+
+    İleri doldurma parçalar arasında önceki parçanın son satırı taşınarak sürdürülür.
+    İleri doldurmadan sonra kalan eksikler yalnızca sütun başındakilerdir; bunlar
+    (geri doldurmadaki gibi) `fill` ile verilen ilk geçerli değerlerle doldurulur.
+    """
+    carry = None
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        chunk = chunk.drop(columns=list(drop_columns))
+        n_cols = n_columns if n_columns is not None else chunk.shape[1]
+        chunk = chunk.dropna(axis=0, thresh=int(n_cols * threshold))
+        if chunk.empty:
+            continue
+        if carry is not None:
+            chunk = pd.concat([carry, chunk]).ffill().iloc[1:]
+        else:
+            chunk = chunk.ffill()
+        carry = chunk.iloc[[-1]]
+        if fill is not None:
+            chunk = chunk.fillna(fill)
+        yield create_new_features(chunk, verbose=False)
+
+
+def scan_raw_data(file_path, chunksize=STREAM_CHUNK_SIZE, threshold=0.5):
+    """
+    Akış modunun tarama aşaması; ham CSV'yi iki kez okur:
+
+    1. okuma: tamamen boş sütunlar ve sütunların ilk geçerli değerleri (eksik satır
+       eşiği ve baştaki eksiklerin doldurulması bunlara bağlıdır).
+    2. okuma: temizlenmiş parçaların rezervuar örneğinden aykırı değer sınırları
+       (Q1/Q3 ± 1.5 IQR).
+    """
+    non_null = None
+    first_valid = {}
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        counts = chunk.notna().sum()
+        non_null = counts if non_null is None else non_null.add(counts, fill_value=0)
+        for column in chunk.columns:
+            if column not in first_valid:
+                index = chunk[column].first_valid_index()
+                if index is not None:
+                    first_valid[column] = chunk.at[index, column]
+    drop_columns = non_null[non_null == 0].index.tolist()
+    n_columns = len(non_null) - len(drop_columns)
+
+    # Eksik değer işlemi ve özellik türetme sonrası sayısal sütunlar rezervuara eklenir
+    sampler = None
+    for chunk in _iter_clean_chunks(
+        file_path, chunksize, drop_columns, n_columns, threshold, first_valid
+    ):
+        if sampler is None:
+            numeric_cols = _numeric_columns(chunk)
+            sampler = ReservoirQuantiles(len(numeric_cols), size=RESERVOIR_SIZE)
+        sampler.update(chunk[numeric_cols].to_numpy(dtype=np.float64))
+
+    q1, q3 = sampler.quantile([0.25, 0.75])
+    iqr = q3 - q1
+    bounds = {
+        column: (float(lower), float(upper))
+        for column, lower, upper in zip(numeric_cols, q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    }
+    print(f"Tarama tamamlandı: {sampler.n_seen} satır, {len(drop_columns)} boş sütun.")
+    return {
+        "drop_columns": drop_columns,
+        "n_columns": n_columns,
+        "first_valid": first_valid,
+        "bounds": bounds,
+    }
+
+
+def process_raw_in_chunks(file_path, name, chunksize=STREAM_CHUNK_SIZE, threshold=0.5):
+    """
+    Bellekten büyük ham veriyi parça parça işler; ham CSV toplam üç kez okunur.
+
+    1-2. okuma (`scan_raw_data`): boş sütunlar, ilk geçerli değerler ve akış çeyrek
+       tahmincisiyle aykırı değer sınırları.
+    3. okuma: her parça temizlenir, sınırlara kırpılır ve sütunlu dosyaya artımlı
+       yazılır. Kırpılmış sayısal sütunların ortalama/standart sapması (ölçekleyici
+       istatistikleri) aynı okumada Chan birleştirmesiyle hesaplanır ve aykırı değer
+       sayılarıyla birlikte veri setinin yanına kaydedilir;
+       `data_preprocessing.py --stream` ölçekleyicileri bu özetten kurar.
+    """
+    print(f"\n=== {name}: akış modunda işleniyor ({chunksize} satırlık parçalar) ===")
+    scan = scan_raw_data(file_path, chunksize=chunksize, threshold=threshold)
+    bounds = scan["bounds"]
+
+    moments = None
+    outlier_counts = {}
+    with DatasetWriter(PROCESSED_DATA_DIR, name) as writer:
+        for chunk in _iter_clean_chunks(
+            file_path,
+            chunksize,
+            scan["drop_columns"],
+            scan["n_columns"],
+            threshold,
+            scan["first_valid"],
+        ):
+            chunk, counts = clip_outliers(chunk, bounds)
+            for column, count in counts.items():
+                outlier_counts[column] = outlier_counts.get(column, 0) + count
+
+            if moments is None:
+                moment_cols = _moment_columns(chunk)
+                moments = RunningMoments(len(moment_cols))
+            moments.update(chunk[moment_cols].to_numpy(dtype=np.float64))
+            writer.write(chunk)
+
+    print(f"\n=== {name} Aykırı Değer Özeti ===")
+    print(_outlier_summary_frame(outlier_counts).to_string(index=False))
+
+    print(f"İşlenmiş veri kaydedildi: {writer.path} ({writer.n_rows} satır)")
+    return save_outlier_stats(
+        name,
+        bounds,
+        outlier_counts,
+        writer.n_rows,
+        **_scaler_stats(moment_cols, moments.mean, moments.std),
+    )
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Ham veriden özellik türet.")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Ham CSV'leri parça parça işle (bellekten büyük veri için).",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=STREAM_CHUNK_SIZE,
+        help="Akış modunda parça başına satır sayısı.",
+    )
+    args = parser.parse_args()
+
+    if args.stream:
+        process_raw_in_chunks(ENERGY_DATA_FILE, "processed_energy_data", args.chunksize)
+        process_raw_in_chunks(
+            WEATHER_DATA_FILE, "processed_weather_data", args.chunksize
+        )
+        return
+
     # Veriyi yükle
     energy_data, weather_data = load_data()
 
@@ -235,33 +374,39 @@ def main():
     energy_data = handle_missing_values(energy_data)
     energy_data = create_new_features(energy_data)
 
-    # Aykırı değerleri kontrol etmeden önce bir özet görüntüleyelim
+    # Aykırı değer özeti ve kırpma tek geçişte; sınırlar yeni veri için kaydedilir
+    energy_data, energy_outliers, energy_bounds = handle_outliers(energy_data)
     print("\n=== Energy Dataset Aykırı Değer Özeti ===")
-    energy_outliers = outlier_summary(energy_data)
     print(energy_outliers.to_string(index=False))  # Temiz çıktı
-
-    # Aykırı değer işlemleri
-    energy_data = detect_and_handle_outliers(energy_data)
-    save_processed_data(energy_data, "processed_energy_data.csv")
+    save_processed_data(energy_data, "processed_energy_data")
+    save_outlier_stats(
+        "processed_energy_data",
+        energy_bounds,
+        dict(energy_outliers.itertuples(index=False)),
+        len(energy_data),
+        **_frame_scaler_stats(energy_data),
+    )
 
     # Weather Dataset işlemleri
     print("\n=== Weather Dataset İşlemleri ===")
     weather_data = handle_missing_values(weather_data)
     weather_data = create_new_features(weather_data)
 
-    # Aykırı değerleri kontrol etmeden önce bir özet görüntüleyelim
+    weather_data, weather_outliers, weather_bounds = handle_outliers(weather_data)
     print("\n=== Weather Dataset Aykırı Değer Özeti ===")
-    weather_outliers = outlier_summary(weather_data)
     print(weather_outliers.to_string(index=False))  # Temiz çıktı
-
-    # Aykırı değer işlemleri
-    weather_data = detect_and_handle_outliers(weather_data)
-    save_processed_data(weather_data, "processed_weather_data.csv")
+    save_processed_data(weather_data, "processed_weather_data")
+    save_outlier_stats(
+        "processed_weather_data",
+        weather_bounds,
+        dict(weather_outliers.itertuples(index=False)),
+        len(weather_data),
+        **_frame_scaler_stats(weather_data),
+    )
 
     # Sadeleştirilmiş tabloyu göster
     print("\n=== İşlenmiş Veri Çerçeveleri (Sadeleştirilmiş Görünüm) ===")
     selected_energy_cols = [
-<<<<<<< HEAD
         "time",
         "generation biomass",
         "generation fossil gas",
@@ -276,38 +421,21 @@ def main():
         "wind_speed",
         "weather_main",
         "weather_description",
-=======
-        'time', 'generation biomass', 'generation fossil gas',
-        'generation nuclear', 'total load actual', 'price actual'
-    ]
-    selected_weather_cols = [
-        'dt_iso', 'temp', 'humidity', 'wind_speed',
-        'weather_main', 'weather_description'
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
     ]
 
     simplified_energy_data = energy_data[selected_energy_cols].head()
     simplified_weather_data = weather_data[selected_weather_cols].head()
 
     combined_df = pd.concat(
-<<<<<<< HEAD
         [
             simplified_energy_data.reset_index(drop=True),
             simplified_weather_data.reset_index(drop=True),
         ],
         axis=1,
-=======
-        [simplified_energy_data.reset_index(drop=True),
-         simplified_weather_data.reset_index(drop=True)], axis=1
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
     )
 
     print(combined_df.to_string(index=False))
 
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+from scipy.stats import norm
+
+# Dosya yolları
+MODEL_DIR = "./models/"
+SARIMA_MODEL_FILE = os.path.join(MODEL_DIR, "sarima_model.pkl")
+
+# Önceden hesaplanacak en uzun tahmin ufku (saat)
+FORECAST_MAX_HORIZON = int(os.environ.get("FORECAST_MAX_HORIZON", 168))
+
+# Model dosyası değişikliklerinin en fazla hangi sıklıkla kontrol edileceği (saniye)
+FORECAST_CHECK_INTERVAL = 2.0
+
+
+class ForecastPath:
+    """
+    Belirli bir model sürümü için önceden hesaplanmış tahmin yolu.
+    """
+
+    def __init__(self, version, timestamps, mean, se):
+        self.version = version
+        self.timestamps = timestamps
+        self.mean = mean
+        self.se = se
+        self.computed_at = time.time()
+
+
+class SarimaForecaster:
+    """
+    time_series.py'nin kaydettiği SARIMA sonuçlarını bir kez yükler, sonraki
+    `max_horizon` saatin tahmin yolunu ve standart hatalarını önceden hesaplar ve
+    istekleri bu önbellekten dilimleyerek yanıtlar.
+
+    Güven aralıkları standart hatadan herhangi bir `alpha` için yeniden
+    `get_forecast` çağırmadan hesaplanır. Model dosyası değişince yol yeniden hesaplanır.
+    """
+
+    def __init__(
+        self,
+        model_file=SARIMA_MODEL_FILE,
+        max_horizon=FORECAST_MAX_HORIZON,
+        check_interval=FORECAST_CHECK_INTERVAL,
+    ):
+        self.model_file = model_file
+        self.max_horizon = max_horizon
+        self.check_interval = check_interval
+        self._path = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+
+    def _file_version(self):
+        stat = os.stat(self.model_file)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _compute(self, version):
+        results = joblib.load(self.model_file)
+        forecast = results.get_forecast(steps=self.max_horizon)
+        mean = np.asarray(forecast.predicted_mean, dtype=np.float64)
+        se = np.asarray(forecast.se_mean, dtype=np.float64)
+        timestamps = [str(ts) for ts in forecast.predicted_mean.index]
+        print(
+            f"SARIMA tahmin yolu hesaplandı: {self.max_horizon} adım (sürüm {version})"
+        )
+        return ForecastPath(version, timestamps, mean, se)
+
+    def get_path(self):
+        """
+        Güncel tahmin yolunu döndürür; model dosyası değiştiyse yeniden hesaplar.
+        """
+        now = time.monotonic()
+        path = self._path
+        if path is not None and now - self._last_checked < self.check_interval:
+            return path
+
+        if not os.path.exists(self.model_file):
+            if path is not None:
+                return path
+            raise FileNotFoundError(
+                f"SARIMA model dosyası bulunamadı: {self.model_file}"
+            )
+
+        with self._lock:
+            self._last_checked = now
+            version = self._file_version()
+            if self._path is None or self._path.version != version:
+                try:
+                    self._path = self._compute(version)
+                except Exception as e:
+                    # Yarım yazılmış ya da bozuk dosya: varsa eski yolu sunmaya devam et
+                    if self._path is None:
+                        raise
+                    print(f"SARIMA modeli yüklenemedi ({self.model_file}): {e}")
+            return self._path
+
+    def forecast(self, horizon, alpha=None):
+        """
+        Sonraki `horizon` saatin tahminini döndürür. `alpha` verilirse
+        (1 - alpha) güven aralığı da eklenir.
+        """
+        if horizon < 1 or horizon > self.max_horizon:
+            raise ValueError(
+                f"Tahmin ufku 1 ile {self.max_horizon} arasında olmalıdır."
+            )
+
+        path = self.get_path()
+        result = {
+            "horizon": horizon,
+            "model_version": path.version,
+            "timestamps": path.timestamps[:horizon],
+            "forecast": path.mean[:horizon].tolist(),
+        }
+        if alpha is not None:
+            z = norm.ppf(1 - alpha / 2)
+            margin = z * path.se[:horizon]
+            result["alpha"] = alpha
+            result["lower"] = (path.mean[:horizon] - margin).tolist()
+            result["upper"] = (path.mean[:horizon] + margin).tolist()
+        return result
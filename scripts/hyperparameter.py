@@ -1,25 +1,16 @@
-<<<<<<< HEAD
 import os
+import sys
 import warnings
 
 import joblib
-import numpy as np
-import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error
-from sklearn.model_selection import cross_val_score, train_test_split
+from sklearn.model_selection import cross_val_score
 from xgboost import XGBRegressor
-=======
-import pandas as pd
-import os
-import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from xgboost import XGBRegressor
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import mean_squared_error
-import joblib
-import warnings
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+
+from scripts.storage import load_training_data
+from scripts.time_series_cv import RollingOriginCV, chronological_split
+from scripts.tuning import successive_halving_search, warm_start_forest_search
 
 # Uyarıları kapatma
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -27,128 +18,37 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 
 # Dosya yolları
 PROCESSED_DATA_DIR = "./data/processed/"
-ENERGY_DATA_FILE = PROCESSED_DATA_DIR + "final_energy_data.csv"
+ENERGY_DATASET = "final_energy_data"
 BEST_MODEL_DIR = "./models/"
 
+# RandomForest arama modu: "warm_start" (ormanı büyüterek tüm ağaç sayılarını tek
+# eğitimde puanlar) ya da "grid" (her ağaç sayısını sıfırdan eğiten GridSearchCV)
+RF_SEARCH_MODE = os.environ.get("RF_SEARCH_MODE", "warm_start")
+
 # Klasör oluşturma
 os.makedirs(BEST_MODEL_DIR, exist_ok=True)
 
 
-def load_data(file_path):
+def load_data(dataset_name):
     """
-    İşlenmiş enerji verisini yükle.
+    İşlenmiş enerji verisini yükle. Yalnızca özellik ve hedef sütunları okunur;
+    özellikler süreçler arasında paylaşılan, belleğe eşlenmiş float32 bloktur.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Veri dosyası bulunamadı: {file_path}")
-    energy_data = pd.read_csv(file_path)
-    if "total load actual" not in energy_data.columns:
-<<<<<<< HEAD
-        raise ValueError(
-            "Beklenen hedef değişken 'total load actual' veri setinde bulunamadı."
-        )
-    X = energy_data.drop(
-        columns=["total load actual", "price actual", "time"], errors="ignore"
+    return load_training_data(
+        PROCESSED_DATA_DIR,
+        dataset_name,
+        target="total load actual",
+        exclude=["price actual", "time"],
     )
-=======
-        raise ValueError("Beklenen hedef değişken 'total load actual' veri setinde bulunamadı.")
-    X = energy_data.drop(columns=["total load actual", "price actual", "time"], errors="ignore")
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-    y = energy_data["total load actual"]
-    return X, y
-
-
-def custom_xgboost_grid_search(X, y, param_grid):
-    """
-    XGBoost için manuel grid search
-    """
-    best_params = None
-<<<<<<< HEAD
-    best_score = float("inf")
-
-    for n_estimators in param_grid["n_estimators"]:
-        for learning_rate in param_grid["learning_rate"]:
-            for max_depth in param_grid["max_depth"]:
-=======
-    best_score = float('inf')
-
-    for n_estimators in param_grid['n_estimators']:
-        for learning_rate in param_grid['learning_rate']:
-            for max_depth in param_grid['max_depth']:
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-                model = XGBRegressor(
-                    n_estimators=n_estimators,
-                    learning_rate=learning_rate,
-                    max_depth=max_depth,
-<<<<<<< HEAD
-                    random_state=42,
-=======
-                    random_state=42
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-                )
-
-                # Cross-validation skorunu hesapla
-                scores = []
-                for train_index, val_index in _custom_kfold(X):
-                    X_train, X_val = X.iloc[train_index], X.iloc[val_index]
-                    y_train, y_val = y.iloc[train_index], y.iloc[val_index]
-
-                    model.fit(X_train, y_train)
-                    y_pred = model.predict(X_val)
-                    score = mean_squared_error(y_val, y_pred)
-                    scores.append(score)
-
-                mse = np.mean(scores)
-
-<<<<<<< HEAD
-                print(
-                    f"Params - n_est: {n_estimators}, lr: {learning_rate}, depth: {max_depth}, MSE: {mse:.4f}"
-                )
-=======
-                print(f"Params - n_est: {n_estimators}, lr: {learning_rate}, depth: {max_depth}, MSE: {mse:.4f}")
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-
-                if mse < best_score:
-                    best_score = mse
-                    best_params = {
-<<<<<<< HEAD
-                        "n_estimators": n_estimators,
-                        "learning_rate": learning_rate,
-                        "max_depth": max_depth,
-=======
-                        'n_estimators': n_estimators,
-                        'learning_rate': learning_rate,
-                        'max_depth': max_depth
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-                    }
-
-    return best_params, best_score
-
-
-def _custom_kfold(X, n_splits=3):
-    """
-    Manuel K-Fold cross-validation için yardımcı fonksiyon
-    """
-    from sklearn.model_selection import KFold
-<<<<<<< HEAD
-
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-    kf = KFold(n_splits=n_splits, shuffle=True, random_state=42)
-    return kf.split(X)
 
 
 def hyperparameter_optimization(X, y):
     """
     Birkaç model ve parametre üzerinde hiperparametre optimizasyonu yapar.
     """
-    # Eğitim ve doğrulama setlerini ayır
-<<<<<<< HEAD
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
-=======
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+    # Eğitim ve doğrulama setlerini zaman sırasıyla ayır (gelecek veri sızmaz)
+    X_train, X_val, y_train, y_val = chronological_split(X, y, test_size=0.2)
+    cv = RollingOriginCV(n_splits=3)
 
     # Model ve parametre listesi
     from sklearn.model_selection import GridSearchCV
@@ -157,21 +57,13 @@ def hyperparameter_optimization(X, y):
     rf_param_grid = {
         "n_estimators": [50, 100, 200],
         "max_depth": [10, 20, 30],
-<<<<<<< HEAD
         "min_samples_split": [2, 5, 10],
-=======
-        "min_samples_split": [2, 5, 10]
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
     }
 
     xgb_param_grid = {
         "learning_rate": [0.01, 0.1, 0.2],
         "n_estimators": [50, 100, 200],
-<<<<<<< HEAD
         "max_depth": [3, 5, 7],
-=======
-        "max_depth": [3, 5, 7]
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
     }
 
     best_model = None
@@ -179,22 +71,23 @@ def hyperparameter_optimization(X, y):
     best_model_name = None
 
     # RandomForest Grid Search
-    grid_search = GridSearchCV(
-        estimator=rf_model,
-        param_grid=rf_param_grid,
-        scoring="neg_mean_squared_error",
-        cv=3,
-        verbose=1,
-<<<<<<< HEAD
-        n_jobs=-1,
-=======
-        n_jobs=-1
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-    )
-    grid_search.fit(X_train, y_train)
+    if RF_SEARCH_MODE == "warm_start":
+        rf_best_model, rf_best_params, _, _ = warm_start_forest_search(
+            rf_model, X_train, y_train, rf_param_grid, cv=cv
+        )
+    else:
+        grid_search = GridSearchCV(
+            estimator=rf_model,
+            param_grid=rf_param_grid,
+            scoring="neg_mean_squared_error",
+            cv=cv,
+            verbose=1,
+            n_jobs=-1,
+        )
+        grid_search.fit(X_train, y_train)
 
-    rf_best_params = grid_search.best_params_
-    rf_best_model = grid_search.best_estimator_
+        rf_best_params = grid_search.best_params_
+        rf_best_model = grid_search.best_estimator_
     rf_val_predictions = rf_best_model.predict(X_val)
     rf_val_score = mean_squared_error(y_val, rf_val_predictions)
 
@@ -205,42 +98,24 @@ def hyperparameter_optimization(X, y):
     best_model = rf_best_model
     best_model_name = "RandomForest"
 
-    # XGBoost Manuel Grid Search
+    # XGBoost: paralel ardışık yarılama + erken durdurma
     print(f"\n{'=' * 20}\nModel: XGBoost\n{'=' * 20}")
-    try:
-<<<<<<< HEAD
-        xgb_best_params, xgb_score = custom_xgboost_grid_search(
-            X_train, y_train, xgb_param_grid
-        )
+    xgb_best_params, xgb_score, _ = successive_halving_search(
+        X_train, y_train, xgb_param_grid, cv=cv
+    )
 
-        xgb_model = XGBRegressor(**xgb_best_params, random_state=42)
-=======
-        xgb_best_params, xgb_score = custom_xgboost_grid_search(X_train, y_train, xgb_param_grid)
+    xgb_model = XGBRegressor(**xgb_best_params, random_state=42)
+    xgb_model.fit(X_train, y_train)
+    xgb_val_predictions = xgb_model.predict(X_val)
+    xgb_val_score = mean_squared_error(y_val, xgb_val_predictions)
 
-        xgb_model = XGBRegressor(
-            **xgb_best_params,
-            random_state=42
-        )
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-        xgb_model.fit(X_train, y_train)
-        xgb_val_predictions = xgb_model.predict(X_val)
-        xgb_val_score = mean_squared_error(y_val, xgb_val_predictions)
-
-        print(f"XGBoost En iyi parametreler: {xgb_best_params}")
-        print(f"XGBoost Doğrulama Hatası (MSE): {xgb_val_score:.4f}")
-
-        if xgb_val_score < best_score:
-            best_score = xgb_val_score
-            best_model = xgb_model
-            best_model_name = "XGBoost"
-    except Exception as e:
-        print(f"XGBoost modeliyle ilgili bir hata oluştu: {e}")
-        import traceback
-<<<<<<< HEAD
+    print(f"XGBoost En iyi parametreler: {xgb_best_params}")
+    print(f"XGBoost Doğrulama Hatası (MSE): {xgb_val_score:.4f}")
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-        traceback.print_exc()
+    if xgb_val_score < best_score:
+        best_score = xgb_val_score
+        best_model = xgb_model
+        best_model_name = "XGBoost"
 
     print(f"\nEn iyi model: {best_model_name} (MSE: {best_score:.4f})")
     return best_model, best_model_name
@@ -248,8 +123,13 @@ def hyperparameter_optimization(X, y):
 
 def save_best_model(model, model_name):
     """
-    En iyi modeli kaydeder.
+    En iyi modeli kaydeder. API ve `test.py` girdileri modelin özellik adlarına göre
+    hizaladığından `feature_names_in_` içermeyen model kaydedilmez.
     """
+    if not hasattr(model, "feature_names_in_"):
+        raise ValueError(
+            f"'{model_name}' modeli özellik adlarını (feature_names_in_) içermiyor."
+        )
     model_path = os.path.join(BEST_MODEL_DIR, f"{model_name}_best_model.pkl")
     joblib.dump(model, model_path)
     print(f"En iyi model kaydedildi: {model_path}")
@@ -258,7 +138,7 @@ def save_best_model(model, model_name):
 def main():
     try:
         # Veriyi yükle
-        X, y = load_data(ENERGY_DATA_FILE)
+        X, y = load_data(ENERGY_DATASET)
 
         # Hiperparametre optimizasyonu
         best_model, best_model_name = hyperparameter_optimization(X, y)
@@ -268,28 +148,8 @@ def main():
 
     except Exception as e:
         print(f"Bir hata oluştu: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-
-"""
-
-RandomForest En iyi parametreler:
-
-max_depth: 30
-min_samples_split: 2
-n_estimators: 200
-Doğrulama Hatası (MSE): 0.0078
-XGBoost En iyi parametreler:
-
-n_estimators: 200
-learning_rate: 0.2
-max_depth: 7
-Doğrulama Hatası (MSE): 0.0043
-
-<<<<<<< HEAD
-"""
-=======
-"""
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import joblib
+
+# Çıkarım havuzu ayarları (ortam değişkenleriyle değiştirilebilir)
+# - thread: XGBoost gibi tahmin sırasında GIL'i bırakan modeller için
+# - process: GIL'e bağlı modeller için; her işçi süreç modeli kendi belleğine yükler
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "thread")
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", os.cpu_count() or 1))
+INFERENCE_MAX_QUEUE = int(os.environ.get("INFERENCE_MAX_QUEUE", 64))
+INFERENCE_TIMEOUT = float(os.environ.get("INFERENCE_TIMEOUT", 2.0))
+
+
+class InferenceQueueFullError(RuntimeError):
+    """
+    Çıkarım kuyruğu dolu olduğunda fırlatılır (geri basınç, HTTP 503).
+    """
+
+
+class InferenceTimeoutError(TimeoutError):
+    """
+    Tahmin istek başına zaman aşımı süresini aştığında fırlatılır (HTTP 504).
+    """
+
+
+# İşçi süreçlerde yüklenen modeller: {dosya yolu: (sürüm, model)}
+_worker_models = {}
+
+
+def _predict_in_process(path, version, matrix):
+    """
+    İşçi süreçte modeli (gerekirse) yükler ve tahmin yapar.
+    Model her süreçte sürüm başına yalnızca bir kez yüklenir.
+    """
+    cached = _worker_models.get(path)
+    if cached is None or cached[0] != version:
+        cached = (version, joblib.load(path))
+        _worker_models[path] = cached
+    return cached[1].predict(matrix)
+
+
+class InferenceExecutor:
+    """
+    CPU'ya bağlı model tahminlerini olay döngüsünü bloklamadan ayrılmış bir iş parçacığı
+    ya da süreç havuzunda çalıştırır.
+
+    Aynı anda en fazla `max_workers` tahmin çalışır, `max_queue` kadarı sırada bekler;
+    kuyruk doluysa istek hemen reddedilir. Her istek `timeout` saniye ile sınırlıdır.
+    """
+
+    def __init__(
+        self,
+        backend=INFERENCE_BACKEND,
+        max_workers=INFERENCE_WORKERS,
+        max_queue=INFERENCE_MAX_QUEUE,
+        timeout=INFERENCE_TIMEOUT,
+    ):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Geçersiz çıkarım arka ucu: {backend}")
+        self.backend = backend
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.backend == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+        return self._pool
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, loaded, matrix):
+        """
+        Tahmini havuza gönderir ve `concurrent.futures.Future` döndürür.
+        Çalışan ve bekleyen iş sayısı sınırı aşıyorsa InferenceQueueFullError fırlatır.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                raise InferenceQueueFullError("Çıkarım kuyruğu dolu.")
+            self._pending += 1
+        try:
+            pool = self._get_pool()
+            if self.backend == "process":
+                future = pool.submit(
+                    _predict_in_process, loaded.path, loaded.version, matrix
+                )
+            else:
+                future = pool.submit(loaded.model.predict, matrix)
+        except Exception:
+            self._release(None)
+            raise
+        # Sayaç, iş gerçekten bittiğinde (zaman aşımından sonra bile) azaltılır
+        future.add_done_callback(self._release)
+        return future
+
+    async def predict(self, loaded, matrix, timeout=None):
+        """
+        Tahmini havuzda çalıştırır ve sonucu olay döngüsünü bloklamadan bekler.
+        """
+        future = self.submit(loaded, matrix)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # Henüz başlamamışsa iptal edilir ve kuyruktaki yer hemen boşalır
+            future.cancel()
+            raise InferenceTimeoutError(f"Tahmin {timeout:.2f} saniyede tamamlanamadı.")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
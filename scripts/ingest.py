@@ -0,0 +1,183 @@
+import argparse
+import os
+
+import pandas as pd
+
+from scripts.feature_engineering import (
+    ENERGY_DATA_FILE,
+    PROCESSED_DATA_DIR,
+    WEATHER_DATA_FILE,
+    clip_outliers,
+    create_new_features,
+)
+from scripts.storage import (
+    dataset_columns,
+    list_partitions,
+    load_dataset,
+    load_dataset_stats,
+    partitions_dir,
+    save_partition,
+)
+from scripts.transform_pipeline import (
+    ENCODERS_DIR,
+    TRANSFORM_PIPELINE_SUFFIX,
+    load_transform_pipeline,
+)
+
+# Artımlı yüklenen veri setleri: ham dosya, işlenmiş/son veri seti adları, zaman sütunu
+DATASETS = {
+    "energy": {
+        "raw_file": ENERGY_DATA_FILE,
+        "processed": "processed_energy_data",
+        "final": "final_energy_data",
+        "time_column": "time",
+    },
+    "weather": {
+        "raw_file": WEATHER_DATA_FILE,
+        "processed": "processed_weather_data",
+        "final": "final_weather_data",
+        "time_column": "dt_iso",
+    },
+}
+
+# feature_engineering.handle_missing_values ile aynı satır eşiği
+MISSING_THRESHOLD = 0.5
+
+
+def _latest_frame(name, columns=None):
+    """
+    Veri setinin en son eklenen bölümünü (bölüm yoksa ana dosyayı) okur.
+    """
+    partitions = list_partitions(PROCESSED_DATA_DIR, name)
+    if partitions:
+        return load_dataset(
+            partitions_dir(PROCESSED_DATA_DIR, name), partitions[-1], columns=columns
+        )
+    return load_dataset(PROCESSED_DATA_DIR, name, columns=columns)
+
+
+def watermark(name, time_column):
+    """
+    İşlenmiş veri setindeki en son zaman damgası; bu andan eski satırlar yeniden
+    yüklenmez.
+    """
+    times = pd.to_datetime(_latest_frame(name, [time_column])[time_column], utc=True)
+    return times.max() if len(times) else None
+
+
+def _new_rows(raw, time_column, since):
+    if since is None:
+        return raw
+    times = pd.to_datetime(raw[time_column], utc=True)
+    return raw[(times > since).to_numpy()]
+
+
+def prepare_rows(raw, name, threshold=MISSING_THRESHOLD):
+    """
+    Yeni ham satırlara eğitimdeki özellik türetme adımlarını uygular; hiçbir
+    istatistik yeniden hesaplanmaz.
+
+    - Yalnızca işlenmiş veri setinde bulunan ham sütunlar tutulur (tamamen boş
+      sütunlar tam işlemede atılmıştır).
+    - Eksik değerler veri setinin son satırından ileri doldurulur.
+    - Aykırı değerler `feature_engineering` tarafından kaydedilen sınırlara kırpılır.
+    """
+    columns = dataset_columns(PROCESSED_DATA_DIR, name)
+    df = raw[[column for column in raw.columns if column in columns]]
+    df = df.dropna(axis=0, thresh=int(df.shape[1] * threshold))
+    if df.empty:
+        return df
+
+    missing = [column for column in df.columns if df[column].isna().any()]
+    if missing:
+        # İleri doldurma veri setinin son satırından devam eder
+        last_row = _latest_frame(name, missing).tail(1)
+        filled = pd.concat([last_row, df[missing]]).ffill().bfill().iloc[1:]
+        for column in missing:
+            df[column] = filled[column].to_numpy()
+    df = create_new_features(df.reset_index(drop=True), verbose=False)
+
+    stats = load_dataset_stats(PROCESSED_DATA_DIR, name)
+    if stats is None:
+        print(f"'{name}' için aykırı değer sınırları bulunamadı, kırpma atlandı.")
+    else:
+        df, _ = clip_outliers(df, stats["bounds"])
+    return df[columns]
+
+
+def _append_raw(raw, raw_file):
+    """
+    Yeni ham satırları ham dosyanın sonuna (başlık sırasıyla) ekler.
+    """
+    header = pd.read_csv(raw_file, nrows=0).columns
+    raw.reindex(columns=header).to_csv(raw_file, mode="a", header=False, index=False)
+
+
+def ingest_dataset(key, new_file, append_raw=True):
+    """
+    Yeni ham satırları işler ve işlenmiş/son veri setlerine yeni bir zaman bölümü
+    olarak ekler. Ölçekleyiciler, RARE kategorileri ve aykırı değer sınırları
+    yeniden öğrenilmez; kaydedilmiş dönüşümler yalnızca yeni bölüme uygulanır.
+
+    Returns:
+    - Eklenen satır sayısı
+    """
+    spec = DATASETS[key]
+    time_column = spec["time_column"]
+    print(f"\n=== {key}: {new_file} yükleniyor ===")
+
+    raw = pd.read_csv(new_file)
+    since = watermark(spec["processed"], time_column)
+    raw = _new_rows(raw, time_column, since)
+    if raw.empty:
+        print(f"Yeni satır yok (son zaman damgası: {since}).")
+        return 0
+
+    processed = prepare_rows(raw, spec["processed"])
+    if processed.empty:
+        print("Eksik değer eşiğini geçen yeni satır yok.")
+        return 0
+
+    pipeline_file = os.path.join(ENCODERS_DIR, f"{key}{TRANSFORM_PIPELINE_SUFFIX}")
+    pipeline = load_transform_pipeline(pipeline_file)
+    if pipeline is None:
+        raise FileNotFoundError(
+            f"Dönüşüm pipeline'ı bulunamadı: {pipeline_file}. Önce data_preprocessing.py çalıştırılmalıdır."
+        )
+    final = pipeline.transform_dataset(processed)
+
+    start = pd.to_datetime(processed[time_column], utc=True).min()
+    partition = f"part-{start:%Y%m%dT%H%M%S}"
+    save_partition(processed, PROCESSED_DATA_DIR, spec["processed"], partition)
+    path = save_partition(final, PROCESSED_DATA_DIR, spec["final"], partition)
+    if append_raw:
+        _append_raw(raw, spec["raw_file"])
+
+    print(f"{len(final)} satır '{partition}' bölümü olarak eklendi: {path}")
+    return len(final)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Yeni saatlik ham satırları kaydedilmiş dönüşümlerle artımlı yükle."
+    )
+    parser.add_argument("--energy", help="Yeni enerji satırlarını içeren CSV.")
+    parser.add_argument("--weather", help="Yeni hava durumu satırlarını içeren CSV.")
+    parser.add_argument(
+        "--no-raw-append",
+        action="store_true",
+        help="Yeni satırları data/raw altındaki ham dosyalara ekleme.",
+    )
+    args = parser.parse_args()
+
+    files = {"energy": args.energy, "weather": args.weather}
+    if not any(files.values()):
+        parser.error("En az bir girdi dosyası verilmelidir (--energy/--weather).")
+
+    for key, new_file in files.items():
+        if new_file:
+            ingest_dataset(key, new_file, append_raw=not args.no_raw_append)
+
+
+if __name__ == "__main__":
+    main()
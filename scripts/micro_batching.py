@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+# Mikro-toplama ayarları (ortam değişkenleriyle değiştirilebilir)
+MICRO_BATCH_ENABLED = os.environ.get("MICRO_BATCH_ENABLED", "1") == "1"
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", 64))
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get("MICRO_BATCH_MAX_WAIT_MS", 2.0))
+
+# Kuyruk bekleme yüzdelikleri için saklanan son ölçüm sayısı
+WAIT_SAMPLE_SIZE = 4096
+
+
+class _PendingBatch:
+    def __init__(self, loaded):
+        self.loaded = loaded
+        self.rows = []
+        self.futures = []
+        self.enqueued_at = []
+        self.timer = None
+
+
+class MicroBatcher:
+    """
+    Eşzamanlı tek satırlık tahmin isteklerini kısa bir pencere boyunca toplayıp
+    tek bir vektörel `predict` çağrısıyla skorlar.
+
+    Bir toplu iş `max_batch_size` satıra ulaştığında ya da ilk satır `max_wait_ms`
+    milisaniye beklediğinde çıkarım havuzuna gönderilir. Satırlar model sürümüne göre
+    gruplanır; sonuçlar her çağıranın kendi future'ına yazılır.
+    """
+
+    def __init__(
+        self,
+        executor,
+        max_batch_size=MICRO_BATCH_MAX_SIZE,
+        max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+    ):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = {}
+        # Çalışan toplu iş görevleri; olay döngüsü görevlere yalnızca zayıf referans tutar
+        self._tasks = set()
+
+        # Ayar için metrikler
+        self._batch_sizes = Counter()
+        self._n_batches = 0
+        self._n_rows = 0
+        self._n_failed_batches = 0
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    async def predict(self, loaded, row):
+        """
+        Tek satırı (1, n_özellik) bekleyen toplu işe ekler ve tahmini döndürür.
+        """
+        loop = asyncio.get_running_loop()
+        key = (loaded.name, loaded.version)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch(loaded)
+            self._pending[key] = batch
+            batch.timer = loop.call_later(self.max_wait, self._flush, key)
+
+        future = loop.create_future()
+        batch.rows.append(row)
+        batch.futures.append(future)
+        batch.enqueued_at.append(time.perf_counter())
+
+        if len(batch.rows) >= self.max_batch_size:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key):
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Toplu tahmin görevi başarısız: {task.exception()}")
+
+    async def _run_batch(self, batch):
+        started_at = time.perf_counter()
+        self._waits.extend(started_at - t for t in batch.enqueued_at)
+        self._batch_sizes[len(batch.rows)] += 1
+        self._n_batches += 1
+        self._n_rows += len(batch.rows)
+
+        try:
+            matrix = np.concatenate(batch.rows, axis=0)
+            predictions = await self.executor.predict(batch.loaded, matrix)
+        except Exception as e:
+            self._n_failed_batches += 1
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, prediction in zip(batch.futures, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def stats(self):
+        """
+        Toplu iş boyutu dağılımı ve kuyruk bekleme süreleri (ms) özetini döndürür.
+        """
+        waits_ms = np.array(self._waits, dtype=np.float64) * 1000.0
+        wait_stats = {}
+        if waits_ms.size:
+            p50, p90, p99 = np.percentile(waits_ms, [50, 90, 99])
+            wait_stats = {
+                "mean": float(waits_ms.mean()),
+                "p50": float(p50),
+                "p90": float(p90),
+                "p99": float(p99),
+                "max": float(waits_ms.max()),
+            }
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self._n_batches,
+            "rows": self._n_rows,
+            "failed_batches": self._n_failed_batches,
+            "mean_batch_size": (
+                self._n_rows / self._n_batches if self._n_batches else 0.0
+            ),
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "queue_wait_ms": wait_stats,
+        }
@@ -0,0 +1,261 @@
+import glob
+import json
+import os
+import threading
+import time
+
+import joblib
+
+from scripts.feature_alignment import FeatureAligner
+
+# Model konumları
+MODEL_DIR = "./models/"
+MLFLOW_ARTIFACTS_DIR = "./mlartifacts/"
+ALIASES_FILE = os.path.join(MODEL_DIR, "aliases.json")
+
+# Varsayılan takma ad ve hedef model
+DEFAULT_ALIAS = "default"
+DEFAULT_MODEL_NAME = "trained_model"
+
+# Regresyon modeli olmayan dosyalar (ör. SARIMA) kayıt defterine alınmaz
+EXCLUDED_MODEL_NAMES = {"sarima_model"}
+
+# Dosya değişikliklerinin en fazla hangi sıklıkla kontrol edileceği (saniye)
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+class ModelNotFoundError(KeyError):
+    """
+    İstenen model ya da takma ad kayıt defterinde bulunamadığında fırlatılır.
+    """
+
+
+class LoadedModel:
+    """
+    Belleğe yüklenmiş bir modelin değişmez anlık görüntüsü. İstekler tahmin süresince
+    bu nesneye referans tutar; yeni sürüm yüklendiğinde eski nesne kullanılmaya devam eder.
+    """
+
+    def __init__(self, name, path, version, model, aligner):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.model = model
+        self.aligner = aligner
+        self.loaded_at = time.time()
+
+
+class _ModelEntry:
+    def __init__(self, name, path, source):
+        self.name = name
+        self.path = path
+        self.source = source
+        self.loaded = None
+        self.last_error = None
+        self.last_checked = 0.0
+        self.lock = threading.Lock()
+
+
+def _file_version(path):
+    """
+    Dosyanın değişiklik zamanı ve boyutundan ucuz bir sürüm kimliği üretir.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def discover_models(model_dir=MODEL_DIR, mlflow_dir=MLFLOW_ARTIFACTS_DIR):
+    """
+    Bilinen konumlardaki model dosyalarını bulur.
+    - models/*.pkl (trained_model.pkl, train.py'nin {model}_model.pkl ve
+      hyperparameter.py'nin *_best_model.pkl çıktıları)
+    - mlartifacts/<deney>/<run_id>/artifacts/model/model.pkl (MLflow çalıştırmaları)
+
+    Returns:
+    - {model adı: (dosya yolu, kaynak)} sözlüğü
+    """
+    found = {}
+    for path in sorted(glob.glob(os.path.join(model_dir, "*.pkl"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name not in EXCLUDED_MODEL_NAMES:
+            found[name] = (path, "models")
+
+    pattern = os.path.join(mlflow_dir, "*", "*", "artifacts", "model", "model.pkl")
+    for path in sorted(glob.glob(pattern)):
+        run_id = os.path.basename(
+            os.path.dirname(os.path.dirname(os.path.dirname(path)))
+        )
+        found[f"mlflow:{run_id}"] = (path, "mlflow")
+    return found
+
+
+class ModelRegistry:
+    """
+    Süreç içi model kayıt defteri.
+
+    Modeller ilk istendiklerinde tembel olarak yüklenir. Dosya ya da takma ad
+    değiştiğinde yeni sürüm bir sonraki istekte yüklenir ve referans atomik olarak
+    değiştirilir; yükleme sürerken gelen istekler eski sürümle yanıtlanır, böylece
+    istek düşmez.
+    """
+
+    def __init__(
+        self,
+        field_names=(),
+        model_dir=MODEL_DIR,
+        mlflow_dir=MLFLOW_ARTIFACTS_DIR,
+        aliases_file=ALIASES_FILE,
+        reload_check_interval=RELOAD_CHECK_INTERVAL,
+    ):
+        self.field_names = tuple(field_names)
+        self.model_dir = model_dir
+        self.mlflow_dir = mlflow_dir
+        self.aliases_file = aliases_file
+        self.reload_check_interval = reload_check_interval
+
+        self._entries = {}
+        self._aliases = {DEFAULT_ALIAS: DEFAULT_MODEL_NAME}
+        self._aliases_version = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Model konumlarını yeniden tarar ve takma ad dosyasını yeniden okur.
+        Yeni dosyalar eklenir, silinen dosyalar listeden çıkarılır.
+        """
+        found = discover_models(self.model_dir, self.mlflow_dir)
+        with self._lock:
+            entries = {}
+            for name, (path, source) in found.items():
+                entry = self._entries.get(name)
+                if entry is None or entry.path != path:
+                    entry = _ModelEntry(name, path, source)
+                entries[name] = entry
+            self._entries = entries
+        self._reload_aliases()
+
+    def _reload_aliases(self):
+        if not os.path.exists(self.aliases_file):
+            return
+        version = _file_version(self.aliases_file)
+        if version == self._aliases_version:
+            return
+        try:
+            with open(self.aliases_file, encoding="utf-8") as f:
+                aliases = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Takma ad dosyası okunamadı ({self.aliases_file}): {e}")
+            return
+        with self._lock:
+            self._aliases = {DEFAULT_ALIAS: DEFAULT_MODEL_NAME, **aliases}
+            self._aliases_version = version
+
+    def set_alias(self, alias, name):
+        """
+        Takma adı bir modele yönlendirir ve takma ad dosyasına kalıcı olarak yazar.
+        """
+        if name not in self._entries:
+            self.refresh()
+            if name not in self._entries:
+                raise ModelNotFoundError(name)
+        with self._lock:
+            self._aliases[alias] = name
+            aliases = dict(self._aliases)
+        os.makedirs(os.path.dirname(self.aliases_file) or ".", exist_ok=True)
+        tmp_file = f"{self.aliases_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(aliases, f, indent=2)
+        os.replace(tmp_file, self.aliases_file)
+        self._aliases_version = _file_version(self.aliases_file)
+
+    def resolve(self, name=None):
+        """
+        Model adını ya da takma adı gerçek model adına çevirir.
+        """
+        name = name or DEFAULT_ALIAS
+        with self._lock:
+            return self._aliases.get(name, name)
+
+    def _load(self, entry):
+        version = _file_version(entry.path)
+        model = joblib.load(entry.path)
+        try:
+            aligner = FeatureAligner.from_model(model, self.field_names)
+        except ValueError:
+            aligner = None
+        print(f"Model yüklendi: {entry.name} ({entry.path}, sürüm {version})")
+        return LoadedModel(entry.name, entry.path, version, model, aligner)
+
+    def _maybe_reload(self, entry):
+        now = time.monotonic()
+        if (
+            entry.loaded is not None
+            and now - entry.last_checked < self.reload_check_interval
+        ):
+            return
+        entry.last_checked = now
+
+        try:
+            version = _file_version(entry.path)
+        except OSError as e:
+            entry.last_error = str(e)
+            return
+        if entry.loaded is not None and entry.loaded.version == version:
+            return
+
+        # Eski sürüm varken başka bir iş parçacığı yüklüyorsa bekleme, eskisiyle devam et
+        if not entry.lock.acquire(blocking=entry.loaded is None):
+            return
+        try:
+            if entry.loaded is not None and entry.loaded.version == version:
+                return
+            try:
+                entry.loaded = self._load(entry)
+                entry.last_error = None
+            except Exception as e:
+                # Yarım yazılmış ya da bozuk dosya: mevcut sürümü sunmaya devam et
+                entry.last_error = str(e)
+                print(f"Model yüklenemedi ({entry.path}): {e}")
+        finally:
+            entry.lock.release()
+
+    def get(self, name=None):
+        """
+        İstenen modelin (veya takma adın) yüklü anlık görüntüsünü döndürür.
+        Gerekirse modeli yükler ya da dosyası değiştiyse yeni sürüme geçer.
+        """
+        self._reload_aliases()
+        resolved = self.resolve(name)
+        entry = self._entries.get(resolved)
+        if entry is None:
+            self.refresh()
+            resolved = self.resolve(name)
+            entry = self._entries.get(resolved)
+            if entry is None:
+                raise ModelNotFoundError(name or DEFAULT_ALIAS)
+
+        self._maybe_reload(entry)
+        if entry.loaded is None:
+            raise RuntimeError(f"Model yüklenemedi: {resolved} ({entry.last_error})")
+        return entry.loaded
+
+    def list_models(self):
+        """
+        Bilinen modellerin ve takma adların özetini döndürür.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            aliases = dict(self._aliases)
+        models = [
+            {
+                "name": entry.name,
+                "path": entry.path,
+                "source": entry.source,
+                "loaded": entry.loaded is not None,
+                "version": entry.loaded.version if entry.loaded else None,
+                "last_error": entry.last_error,
+            }
+            for entry in entries
+        ]
+        return {"models": models, "aliases": aliases}
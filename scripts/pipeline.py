@@ -0,0 +1,458 @@
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+# Önbellek dizini: içerik adresli çıktı nesneleri, aşama manifestoları, dosya özetleri
+PIPELINE_CACHE_DIR = os.environ.get("PIPELINE_CACHE_DIR", "./.pipeline_cache/")
+OBJECTS_DIR = os.path.join(PIPELINE_CACHE_DIR, "objects")
+MANIFESTS_DIR = os.path.join(PIPELINE_CACHE_DIR, "stages")
+FILE_HASHES_FILE = os.path.join(PIPELINE_CACHE_DIR, "file_hashes.json")
+
+SCRIPTS_PACKAGE = "scripts"
+HASH_CHUNK_SIZE = 1 << 20
+
+# Zaman serisi doğrulamasını değiştiren ortam parametreleri (time_series_cv.py)
+CV_PARAMS = ["CV_N_SPLITS", "CV_GAP", "CV_MAX_TRAIN_SIZE", "CV_N_JOBS"]
+
+
+class Stage:
+    """
+    Pipeline'ın bir aşaması: `python -m <module> <args>` olarak çalışan betik.
+
+    Aşamanın anahtarı girdi dosyalarının içeriğinden, betiğin ve içe aktardığı
+    `scripts.*` modüllerinin kaynak kodundan, ortam parametrelerinden ve
+    argümanlardan hesaplanır. Girdi/çıktı yolları glob kalıbı olabilir.
+    """
+
+    def __init__(self, name, module, inputs, outputs, params=(), args=(), deps=()):
+        self.name = name
+        self.module = module
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = list(params)
+        self.args = list(args)
+        self.deps = list(deps)
+
+
+STAGES = {
+    stage.name: stage
+    for stage in [
+        Stage(
+            "features",
+            "scripts.feature_engineering",
+            inputs=["data/raw/energy_dataset.csv", "data/raw/weather_features.csv"],
+            outputs=[
+                "data/processed/processed_energy_data.*",
+                "data/processed/processed_weather_data.*",
+            ],
+            params=["DATA_FORMAT", "CALENDAR_TIMEZONE"],
+        ),
+        Stage(
+            "preprocess",
+            "scripts.data_preprocessing",
+            inputs=[
+                "data/processed/processed_energy_data.*",
+                "data/processed/processed_energy_data.partitions/*",
+                "data/processed/processed_weather_data.*",
+                "data/processed/processed_weather_data.partitions/*",
+            ],
+            outputs=[
+                "data/processed/final_energy_data.*",
+                "data/processed/final_weather_data.*",
+                "encoders/*_transform_pipeline.pkl",
+            ],
+            params=["DATA_FORMAT", "SPARSE_ENCODING"],
+            deps=["features"],
+        ),
+        Stage(
+            "train",
+            "scripts.train",
+            inputs=[
+                "data/processed/final_energy_data.*",
+                "data/processed/final_energy_data.partitions/*",
+            ],
+            outputs=[
+                "models/RandomForestRegressor_model.pkl",
+                "models/XGBRegressor_model.pkl",
+                "models/LinearRegression_model.pkl",
+                "models/training_summary.csv",
+            ],
+            params=["TRAIN_N_JOBS", "TRAIN_BACKTEST", *CV_PARAMS],
+            deps=["preprocess"],
+        ),
+        Stage(
+            "hyperparameter",
+            "scripts.hyperparameter",
+            inputs=[
+                "data/processed/final_energy_data.*",
+                "data/processed/final_energy_data.partitions/*",
+            ],
+            outputs=["models/*_best_model.pkl"],
+            params=[
+                "RF_SEARCH_MODE",
+                "SEARCH_ETA",
+                "SEARCH_N_JOBS",
+                "EARLY_STOPPING_ROUNDS",
+                "EARLY_STOPPING_FRACTION",
+                "XGB_MAX_BIN",
+                *CV_PARAMS,
+            ],
+            deps=["preprocess"],
+        ),
+        Stage(
+            "time_series",
+            "scripts.time_series",
+            inputs=[
+                "data/processed/final_energy_data.*",
+                "data/processed/final_energy_data.partitions/*",
+            ],
+            outputs=["models/sarima_model.pkl", "models/sarima_model_meta.json"],
+            params=["REFIT_INTERVAL_HOURS", "DRIFT_THRESHOLD"],
+            deps=["preprocess"],
+        ),
+    ]
+}
+
+# Aşama verilmezse çalıştırılan hedefler (bağımlılıklarıyla birlikte)
+DEFAULT_TARGETS = ["train"]
+
+
+def _expand(patterns):
+    """
+    Glob kalıplarını eşleşen dosyaların sıralı listesine açar.
+    """
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def _hash_file(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash_json(obj):
+    payload = json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _write_json(path, obj):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class FileHasher:
+    """
+    Dosya içerik özetlerini (mtime, boyut) ile önbellekler; değişmeyen büyük veri
+    dosyaları her çalıştırmada yeniden okunmaz.
+    """
+
+    def __init__(self, path=FILE_HASHES_FILE):
+        self.path = path
+        self._hashes = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._hashes = json.load(f)
+
+    def digest(self, path):
+        stat = os.stat(path)
+        signature = [stat.st_mtime_ns, stat.st_size]
+        key = os.path.abspath(path)
+        cached = self._hashes.get(key)
+        if cached is not None and cached[:2] == signature:
+            return cached[2]
+        digest = _hash_file(path)
+        self._hashes[key] = [*signature, digest]
+        return digest
+
+    def save(self):
+        _write_json(self.path, self._hashes)
+
+
+def _module_file(module):
+    return os.path.join(*module.split(".")) + ".py"
+
+
+def code_files(module):
+    """
+    Modülün ve (dolaylı olarak) içe aktardığı `scripts.*` modüllerinin kaynak
+    dosyalarını döndürür; aşamanın kod sürümü bu dosyalardan hesaplanır.
+    """
+    seen = set()
+    pending = [module]
+    while pending:
+        current = pending.pop()
+        path = _module_file(current)
+        if current in seen or not os.path.exists(path):
+            continue
+        seen.add(current)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                if node.module == SCRIPTS_PACKAGE:
+                    names = [f"{SCRIPTS_PACKAGE}.{alias.name}" for alias in node.names]
+                else:
+                    names = [node.module]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            pending.extend(
+                name for name in names if name.startswith(SCRIPTS_PACKAGE + ".")
+            )
+    return sorted(_module_file(name) for name in seen)
+
+
+def _object_path(digest):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest)
+
+
+def _store_object(path, digest):
+    target = _object_path(digest)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+
+
+def _restore_object(digest, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.copyfile(_object_path(digest), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _manifest_path(stage, key):
+    return os.path.join(MANIFESTS_DIR, stage.name, f"{key}.json")
+
+
+def stage_key(stage, hasher):
+    """
+    Aşamanın girdilerini (dosya özetleri, kod, parametreler) ve bunlardan türeyen
+    önbellek anahtarını döndürür.
+    """
+    input_files = _expand(stage.inputs)
+    if not input_files:
+        raise FileNotFoundError(
+            f"'{stage.name}' aşamasının girdileri bulunamadı: {', '.join(stage.inputs)}"
+        )
+    description = {
+        "stage": stage.name,
+        "command": [stage.module, *stage.args],
+        "inputs": {path: hasher.digest(path) for path in input_files},
+        "code": {path: hasher.digest(path) for path in code_files(stage.module)},
+        "params": {name: os.environ.get(name) for name in stage.params},
+    }
+    return _hash_json(description), description
+
+
+def _restore_outputs(manifest, hasher):
+    """
+    Manifestodaki çıktıları çalışma dizinine getirir. Zaten güncel olanlara
+    dokunulmaz; önbellekte nesnesi eksik bir çıktı varsa False döner.
+    """
+    restored = 0
+    for path, digest in manifest["outputs"].items():
+        if os.path.exists(path) and hasher.digest(path) == digest:
+            continue
+        if not os.path.exists(_object_path(digest)):
+            return False, restored
+        _restore_object(digest, path)
+        restored += 1
+    return True, restored
+
+
+def _output_signatures(stage):
+    signatures = {}
+    for path in _expand(stage.outputs):
+        stat = os.stat(path)
+        signatures[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    return signatures
+
+
+def _fresh_outputs(stage, run_started, before):
+    """
+    Aşamanın bu çalıştırmada yazdığı çıktıları döndürür: mtime'ı çalıştırma
+    başlangıcından yeni olan ya da (kaba zaman damgalı dosya sistemleri için)
+    çalıştırmadan önceki imzası değişen dosyalar. Önceki çalıştırmalardan kalan
+    eşleşmeler önbelleğe alınmaz; bir çıktı kalıbı için hiç yeni dosya
+    yazılmadıysa aşama başarısız sayılır.
+    """
+    after = _output_signatures(stage)
+    fresh = []
+    for pattern in stage.outputs:
+        paths = _expand([pattern])
+        written = [
+            path
+            for path in paths
+            if after[path][0] >= run_started or after[path] != before.get(path)
+        ]
+        if not written:
+            raise RuntimeError(
+                f"'{stage.name}' aşaması beklenen çıktıyı yazmadı: {pattern}"
+            )
+        for path in sorted(set(paths) - set(written)):
+            print(f"[{stage.name}] Eski çıktı önbelleğe alınmadı: {path}")
+        fresh.extend(written)
+    return sorted(set(fresh))
+
+
+def run_stage(stage, hasher, force=False):
+    """
+    Aşamayı girdileri değiştiyse çalıştırır, değişmediyse çıktılarını önbellekten
+    geri yükler. Çıktılar içerik adresli olarak saklanır; yalnızca betik sıfır
+    çıkış koduyla bitip tüm çıktıları yeniden yazdıysa önbelleğe alınır.
+
+    Returns:
+    - "skipped", "restored" ya da "ran"
+    """
+    key, description = stage_key(stage, hasher)
+    manifest_file = _manifest_path(stage, key)
+
+    if not force and os.path.exists(manifest_file):
+        with open(manifest_file, encoding="utf-8") as f:
+            manifest = json.load(f)
+        complete, restored = _restore_outputs(manifest, hasher)
+        if complete:
+            if restored:
+                print(
+                    f"[{stage.name}] Girdiler değişmedi; {restored} çıktı önbellekten geri yüklendi."
+                )
+                return "restored"
+            print(f"[{stage.name}] Girdiler değişmedi, aşama atlandı.")
+            return "skipped"
+
+    print(
+        f"[{stage.name}] Çalıştırılıyor: python -m {stage.module} {' '.join(stage.args)}"
+    )
+    before = _output_signatures(stage)
+    run_started = time.time_ns()
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", stage.module, *stage.args], check=True)
+    duration = time.perf_counter() - start
+
+    outputs = {}
+    for path in _fresh_outputs(stage, run_started, before):
+        outputs[path] = hasher.digest(path)
+        _store_object(path, outputs[path])
+
+    _write_json(
+        manifest_file,
+        {
+            "key": key,
+            **description,
+            "outputs": outputs,
+            "created_at": time.time(),
+            "duration": round(duration, 3),
+        },
+    )
+    print(
+        f"[{stage.name}] Tamamlandı ({duration:.1f} sn), {len(outputs)} çıktı önbelleğe alındı."
+    )
+    return "ran"
+
+
+def resolve_stages(targets):
+    """
+    Hedef aşamaları bağımlılıklarıyla birlikte çalıştırma sırasına dizer.
+    """
+    order = []
+
+    def visit(name):
+        if name not in STAGES:
+            raise ValueError(
+                f"Bilinmeyen aşama: {name}. Geçerli aşamalar: {', '.join(STAGES)}"
+            )
+        if name in order:
+            return
+        for dep in STAGES[name].deps:
+            visit(dep)
+        order.append(name)
+
+    for target in targets:
+        visit(target)
+    return [STAGES[name] for name in order]
+
+
+def run_pipeline(targets=DEFAULT_TARGETS, force=()):
+    """
+    Hedef aşamaları sırayla çalıştırır; yalnızca girdileri değişen aşamalar
+    yeniden hesaplanır. `force` içindeki aşamalar önbelleğe bakılmadan çalışır.
+    """
+    hasher = FileHasher()
+    results = {}
+    try:
+        for stage in resolve_stages(targets):
+            results[stage.name] = run_stage(
+                stage, hasher, force=stage.name in set(force)
+            )
+    finally:
+        hasher.save()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pipeline aşamalarını yalnızca girdileri değiştiğinde çalıştır."
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        default=DEFAULT_TARGETS,
+        help=f"Hedef aşamalar (bağımlılıklarıyla): {', '.join(STAGES)}",
+    )
+    parser.add_argument(
+        "--force",
+        nargs="*",
+        metavar="STAGE",
+        help="Verilen aşamaları (aşama verilmezse tüm hedefleri) önbelleğe bakmadan çalıştır.",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="Aşamaları ve bağımlılıklarını listele."
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        for stage in STAGES.values():
+            deps = ", ".join(stage.deps) or "-"
+            print(
+                f"{stage.name:<15} python -m {stage.module:<30} bağımlılıklar: {deps}"
+            )
+        return
+
+    force = args.force or []
+    if args.force is not None and not args.force:
+        force = [stage.name for stage in resolve_stages(args.stages)]
+
+    try:
+        results = run_pipeline(args.stages, force=force)
+    except subprocess.CalledProcessError as e:
+        print(f"Aşama başarısız oldu (çıkış kodu {e.returncode}).")
+        sys.exit(e.returncode)
+    except RuntimeError as e:
+        print(f"Aşama başarısız oldu: {e}")
+        sys.exit(1)
+
+    print("\n=== Pipeline Özeti ===")
+    for name, status in results.items():
+        print(f"{name:<15} {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+from cachetools import TTLCache
+
+# Tahmin önbelleği ayarları (ortam değişkenleriyle değiştirilebilir)
+# - PREDICTION_CACHE_SIZE: en fazla kayıt sayısı (0 önbelleği kapatır)
+# - PREDICTION_CACHE_TTL: kayıt ömrü (saniye)
+# - PREDICTION_CACHE_QUANTUM: float girdilerin yuvarlanacağı adım (0 = tam eşleşme)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 100000))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", 300))
+PREDICTION_CACHE_QUANTUM = float(os.environ.get("PREDICTION_CACHE_QUANTUM", 0))
+
+
+class PredictionCache:
+    """
+    Doğrulanmış istek alanlarının kanonik özeti ve model sürümü ile anahtarlanan
+    LRU/TTL tahmin önbelleği.
+
+    `quantum` verilirse `float_fields` içindeki girdiler bu adıma yuvarlanarak
+    anahtarlanır; böylece neredeyse aynı istekler de aynı kaydı paylaşır (sonuç
+    yaklaşık olur). Tam sayı alanları (saat, ay vb.) her zaman tam eşleşir. Bir model
+    yeni bir sürümle görüldüğünde o modelin eski kayıtları geçersiz kılınır.
+    """
+
+    def __init__(
+        self,
+        field_names,
+        float_fields=(),
+        maxsize=PREDICTION_CACHE_SIZE,
+        ttl=PREDICTION_CACHE_TTL,
+        quantum=PREDICTION_CACHE_QUANTUM,
+    ):
+        self.field_names = tuple(sorted(field_names))
+        self._float_mask = np.array(
+            [field in set(float_fields) for field in self.field_names], dtype=bool
+        )
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.quantum = quantum
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._model_versions = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def make_key(self, loaded, request):
+        """
+        İstek alanlarını sabit sırada float64 diziye çevirip model adı ve sürümüyle
+        birlikte özetler.
+        """
+        values = np.array(
+            [getattr(request, field) for field in self.field_names], dtype=np.float64
+        )
+        if self.quantum > 0:
+            values[self._float_mask] = np.round(values[self._float_mask] / self.quantum)
+        digest = hashlib.blake2b(values.tobytes(), digest_size=16).digest()
+        return loaded.name, loaded.version, digest
+
+    def _check_version(self, name, version):
+        # Model yeni bir sürümle görüldüyse eski sürümün kayıtlarını temizle
+        known = self._model_versions.get(name)
+        if known == version:
+            return
+        self._model_versions[name] = version
+        if known is None:
+            return
+        stale = [key for key in list(self._cache.keys()) if key[0] == name]
+        for key in stale:
+            self._cache.pop(key, None)
+        self.invalidations += 1
+
+    def get(self, key):
+        """
+        Önbellekteki tahmini döndürür; yoksa None.
+        """
+        with self._lock:
+            self._check_version(key[0], key[1])
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, prediction):
+        with self._lock:
+            self._check_version(key[0], key[1])
+            self._cache[key] = prediction
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            size = len(self._cache)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "quantum": self.quantum,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,697 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+
+# Varsayılan veri biçimi (ortam değişkeniyle değiştirilebilir): parquet | feather | csv
+DATA_FORMAT = os.environ.get("DATA_FORMAT", "parquet")
+
+FORMAT_EXTENSIONS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+
+# CSV yedeği için sütun tiplerinin saklandığı yan dosya uzantısı
+SCHEMA_SUFFIX = ".schema.json"
+
+# Seyrek (pandas Sparse) sütunlar ana dosyanın yanında CSC matris olarak saklanır
+SPARSE_SUFFIX = ".sparse.npz"
+SPARSE_META_SUFFIX = ".sparse.json"
+
+# Veri setinden öğrenilen istatistikler (aykırı değer sınırları vb.) için yan dosya
+STATS_SUFFIX = ".stats.json"
+
+# Artımlı yüklemede eklenen zaman bölümleri `<ad>.partitions/` klasöründe ayrı
+# veri setleri olarak saklanır; okuyucular ana dosyayla birlikte sırayla birleştirir
+PARTITIONS_SUFFIX = ".partitions"
+
+# Belleğe eşlenebilir (.npy) özellik matrislerinin veri klasörü altındaki önbelleği
+MATRIX_CACHE_DIR = ".matrix_cache"
+
+# float32'ye indirgemede izin verilen en büyük yuvarlama hatası (sütunun değer
+# aralığına oranla); tam sayı değerli sütunlar birebir korunmalıdır
+FLOAT32_RTOL = 1e-6
+
+
+def dataset_path(directory, name, fmt=None):
+    """
+    Veri setinin verilen biçimdeki dosya yolunu döndürür.
+    """
+    fmt = fmt or DATA_FORMAT
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Desteklenmeyen veri biçimi: {fmt}")
+    return os.path.join(directory, name + FORMAT_EXTENSIONS[fmt])
+
+
+def find_dataset(directory, name):
+    """
+    Veri setinin mevcut dosyasını bulur. Birden çok biçimde kayıt varsa en yenisi seçilir.
+
+    Returns:
+    - (dosya yolu, biçim) ya da bulunamazsa (None, None)
+    """
+    candidates = []
+    for fmt in FORMAT_EXTENSIONS:
+        path = dataset_path(directory, name, fmt)
+        if os.path.exists(path):
+            candidates.append((os.path.getmtime(path), fmt != DATA_FORMAT, path, fmt))
+    if not candidates:
+        return None, None
+    # En yeni dosya; eşitlikte varsayılan biçim öne alınır
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+    return candidates[0][2], candidates[0][3]
+
+
+def dataset_exists(directory, name):
+    return find_dataset(directory, name)[0] is not None
+
+
+def partitions_dir(directory, name):
+    return os.path.join(directory, name + PARTITIONS_SUFFIX)
+
+
+def list_partitions(directory, name):
+    """
+    Veri setine eklenmiş zaman bölümlerinin adlarını sıralı olarak döndürür.
+    """
+    part_dir = partitions_dir(directory, name)
+    if not os.path.isdir(part_dir):
+        return []
+    names = set()
+    for entry in os.listdir(part_dir):
+        if entry.startswith("."):
+            continue
+        for extension in FORMAT_EXTENSIONS.values():
+            if entry.endswith(extension):
+                names.add(entry[: -len(extension)])
+    return sorted(names)
+
+
+def _clear_partitions(directory, name):
+    # Ana dosyanın yeniden yazılması (tam işleme) eklenmiş bölümleri geçersiz kılar
+    part_dir = partitions_dir(directory, name)
+    if os.path.isdir(part_dir):
+        shutil.rmtree(part_dir)
+
+
+def save_partition(df, directory, name, partition, fmt=None):
+    """
+    Veri setine yeni bir zaman bölümü ekler; ana dosyaya dokunulmaz.
+
+    Bölüm önce gizli adla yazılır, ardından (seyrek yan dosyalar önce, ana dosya en
+    son) yerine taşınır; okuyucular yarım yazılmış bölüm görmez.
+
+    Returns:
+    - Kaydedilen bölüm dosyasının yolu
+    """
+    if partition in list_partitions(directory, name):
+        raise FileExistsError(f"'{name}' veri setinde '{partition}' bölümü zaten var.")
+
+    part_dir = partitions_dir(directory, name)
+    staging = f".{partition}.{os.getpid()}"
+    path = save_dataset(df, part_dir, staging, fmt=fmt)
+    main_file = os.path.basename(path)
+    for entry in sorted(os.listdir(part_dir), key=lambda entry: entry == main_file):
+        if entry.startswith(staging):
+            os.replace(
+                os.path.join(part_dir, entry),
+                os.path.join(part_dir, partition + entry[len(staging) :]),
+            )
+    return os.path.join(part_dir, partition + main_file[len(staging) :])
+
+
+def sparse_frame(matrix, columns, index=None):
+    """
+    SciPy seyrek matrisini 0 dolgulu pandas seyrek sütunlarına çevirir.
+    """
+    df = pd.DataFrame.sparse.from_spmatrix(
+        sp.csc_matrix(matrix), index=index, columns=list(columns)
+    )
+    # Bazı pandas sürümleri örtük değerleri NaN dolgusuyla işaretler; 0'a çevir
+    return df.fillna(0.0)
+
+
+def _sparse_meta(directory, name):
+    meta_file = os.path.join(directory, name + SPARSE_META_SUFFIX)
+    if not os.path.exists(meta_file):
+        return None
+    with open(meta_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def sparse_columns(directory, name):
+    """
+    Veri setinin seyrek olarak saklanan sütunlarını döndürür.
+    """
+    meta = _sparse_meta(directory, name)
+    return meta["sparse"] if meta else []
+
+
+def _save_sparse(df, directory, name):
+    """
+    Seyrek sütunları ayırıp CSC matris olarak kaydeder, kalan yoğun sütunları döndürür.
+    """
+    base = os.path.join(directory, name)
+    columns = [
+        column
+        for column, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.SparseDtype)
+    ]
+    if not columns:
+        # Önceki bir kayıttan kalmış seyrek yan dosyaları temizle
+        for suffix in (SPARSE_SUFFIX, SPARSE_META_SUFFIX):
+            if os.path.exists(base + suffix):
+                os.remove(base + suffix)
+        return df
+
+    sp.save_npz(base + SPARSE_SUFFIX, sp.csc_matrix(df[columns].sparse.to_coo()))
+    with open(base + SPARSE_META_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump(
+            {"columns": list(df.columns), "sparse": columns},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    return df.drop(columns=columns)
+
+
+def _write_schema(df, path):
+    schema = {column: str(dtype) for column, dtype in df.dtypes.items()}
+    with open(path + SCHEMA_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+
+
+def _read_csv(path, columns=None, dtypes=None, chunksize=None):
+    schema = {}
+    if os.path.exists(path + SCHEMA_SUFFIX):
+        with open(path + SCHEMA_SUFFIX, encoding="utf-8") as f:
+            schema = json.load(f)
+    schema.update({column: str(dtype) for column, dtype in (dtypes or {}).items()})
+    if columns is not None:
+        schema = {
+            column: dtype for column, dtype in schema.items() if column in columns
+        }
+
+    parse_dates = [
+        column for column, dtype in schema.items() if dtype.startswith("datetime")
+    ]
+    csv_dtypes = {
+        column: dtype
+        for column, dtype in schema.items()
+        if not dtype.startswith("datetime")
+    }
+
+    def parse(df):
+        for column in parse_dates:
+            # Saat dilimli tipler ('datetime64[ns, UTC]') UTC olarak çözülür
+            df[column] = pd.to_datetime(df[column], utc="," in schema[column])
+        return df
+
+    if chunksize is None:
+        return parse(pd.read_csv(path, usecols=columns, dtype=csv_dtypes))
+    reader = pd.read_csv(path, usecols=columns, dtype=csv_dtypes, chunksize=chunksize)
+    return (parse(chunk) for chunk in reader)
+
+
+def save_dataset(df, directory, name, fmt=None, dtypes=None):
+    """
+    Veri setini sütunlu biçimde (Parquet/Feather) ya da yedek olarak CSV'ye kaydeder.
+    Seyrek sütunlar yoğunlaştırılmadan ayrı bir CSC matris dosyasına yazılır.
+
+    Args:
+    - df: Veri çerçevesi
+    - directory: Hedef klasör
+    - name: Uzantısız veri seti adı (ör. 'final_energy_data')
+    - fmt: 'parquet', 'feather' ya da 'csv' (varsayılan: DATA_FORMAT)
+    - dtypes: Kaydetmeden önce uygulanacak açık sütun tipleri
+
+    Returns:
+    - Kaydedilen dosyanın yolu
+    """
+    fmt = fmt or DATA_FORMAT
+    os.makedirs(directory, exist_ok=True)
+    if dtypes:
+        df = df.astype(dtypes)
+    df = _save_sparse(df, directory, name)
+
+    _clear_partitions(directory, name)
+
+    path = dataset_path(directory, name, fmt)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
+        _write_schema(df, path)
+    return path
+
+
+class DatasetWriter:
+    """
+    Veri setini parça parça (ör. bellekten büyük veride) aynı dosyaya yazar.
+
+    Şema ilk parçadan alınır; sonraki parçalar bu şemaya dönüştürülür. Dosya önce
+    geçici adla yazılır ve `close` ile yerine taşınır, böylece okuyucular yarım dosya
+    görmez. Seyrek sütunlar desteklenmez.
+    """
+
+    def __init__(self, directory, name, fmt=None):
+        self.fmt = fmt or DATA_FORMAT
+        os.makedirs(directory, exist_ok=True)
+        self.path = dataset_path(directory, name, self.fmt)
+        self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._directory = directory
+        self._name = name
+        self._writer = None
+        self._sink = None
+        self.schema = None
+        self.n_rows = 0
+
+    def write(self, df):
+        if self.schema is None:
+            self.schema = pa.Schema.from_pandas(df, preserve_index=False)
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self._tmp_path, self.schema)
+            elif self.fmt == "feather":
+                self._sink = pa.OSFile(self._tmp_path, "wb")
+                self._writer = pa.ipc.new_file(self._sink, self.schema)
+            else:
+                df.iloc[:0].to_csv(self._tmp_path, index=False)
+                _write_schema(df, self.path)
+
+        if self.fmt == "csv":
+            df.to_csv(self._tmp_path, mode="a", header=False, index=False)
+        else:
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            self._writer.write_table(table)
+        self.n_rows += len(df)
+
+    def close(self):
+        if self.schema is None:
+            raise ValueError(f"'{self._name}' veri setine hiç satır yazılmadı.")
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        os.replace(self._tmp_path, self.path)
+        # Önceki bir kayıttan kalmış seyrek yan dosyaları ve bölümleri temizle
+        _save_sparse(pd.DataFrame(), self._directory, self._name)
+        _clear_partitions(self._directory, self._name)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def load_dataset(directory, name, columns=None, dtypes=None):
+    """
+    Veri setini bulunduğu biçimden okur. Sütunlu biçimlerde yalnızca istenen sütunlar
+    diskten okunur; CSV'de tipler kayıt sırasında yazılan şemadan geri yüklenir.
+    Seyrek saklanan sütunlar pandas seyrek sütunları olarak döner. Artımlı yüklemeyle
+    eklenmiş zaman bölümleri ana dosyanın ardına sırayla eklenir.
+
+    Args:
+    - directory: Veri klasörü
+    - name: Uzantısız veri seti adı
+    - columns: Okunacak sütunlar (varsayılan: tümü)
+    - dtypes: Okuma sonrası uygulanacak açık sütun tipleri
+    """
+    df = _load_file(directory, name, columns=columns, dtypes=dtypes)
+    partitions = list_partitions(directory, name)
+    if not partitions:
+        return df
+    part_dir = partitions_dir(directory, name)
+    frames = [df] + [
+        _load_file(part_dir, partition, columns=columns, dtypes=dtypes)
+        for partition in partitions
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _load_file(directory, name, columns=None, dtypes=None):
+    path, fmt = find_dataset(directory, name)
+    if path is None:
+        raise FileNotFoundError(
+            f"Veri dosyası bulunamadı: {os.path.join(directory, name)}.*"
+        )
+
+    columns = list(columns) if columns is not None else None
+    meta = _sparse_meta(directory, name)
+    dense_columns = columns
+    if meta is not None:
+        requested = columns if columns is not None else meta["columns"]
+        sparse_set = set(meta["sparse"])
+        dense_columns = [column for column in requested if column not in sparse_set]
+
+    if fmt == "parquet":
+        df = pd.read_parquet(path, columns=dense_columns)
+    elif fmt == "feather":
+        df = pd.read_feather(path, columns=dense_columns)
+    else:
+        df = _read_csv(path, columns=dense_columns, dtypes=dtypes)
+
+    if meta is not None:
+        wanted = [column for column in requested if column in sparse_set]
+        if wanted:
+            matrix = sp.load_npz(os.path.join(directory, name + SPARSE_SUFFIX))
+            positions = {column: i for i, column in enumerate(meta["sparse"])}
+            matrix = sp.csc_matrix(matrix)[:, [positions[c] for c in wanted]]
+            if not dense_columns:
+                df = pd.DataFrame(index=pd.RangeIndex(matrix.shape[0]))
+            df = pd.concat([df, sparse_frame(matrix, wanted, index=df.index)], axis=1)
+        df = df[requested]
+
+    if dtypes:
+        df = df.astype(
+            {column: dtype for column, dtype in dtypes.items() if column in df}
+        )
+    return df
+
+
+def iter_dataset(directory, name, columns=None, chunksize=100000, partitions=True):
+    """
+    Veri setini en fazla `chunksize` satırlık DataFrame parçaları halinde okur
+    (bellekten büyük veri için). Artımlı yüklemeyle eklenmiş zaman bölümleri ana
+    dosyadan sonra sırayla okunur (`partitions=False` ise atlanır). Seyrek saklanan
+    veri setleri desteklenmez.
+    """
+    files = [(directory, name)]
+    if partitions:
+        part_dir = partitions_dir(directory, name)
+        files += [
+            (part_dir, partition) for partition in list_partitions(directory, name)
+        ]
+    for file_directory, file_name in files:
+        yield from _iter_file(file_directory, file_name, columns, chunksize)
+
+
+def _iter_file(directory, name, columns, chunksize):
+    path, fmt = find_dataset(directory, name)
+    if path is None:
+        raise FileNotFoundError(
+            f"Veri dosyası bulunamadı: {os.path.join(directory, name)}.*"
+        )
+    if _sparse_meta(directory, name) is not None:
+        raise ValueError(f"Seyrek sütunlu veri seti parça parça okunamaz: {path}")
+
+    columns = list(columns) if columns is not None else None
+    if fmt == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(
+            batch_size=chunksize, columns=columns
+        )
+        for batch in batches:
+            yield pa.Table.from_batches([batch]).to_pandas()
+    elif fmt == "feather":
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                table = pa.Table.from_batches([reader.get_batch(i)])
+                if columns is not None:
+                    table = table.select(columns)
+                for offset in range(0, table.num_rows, chunksize):
+                    yield table.slice(offset, chunksize).to_pandas()
+    else:
+        yield from _read_csv(path, columns=columns, chunksize=chunksize)
+
+
+def dataset_columns(directory, name):
+    """
+    Veri setinin sütun adlarını veriyi okumadan (yalnızca şema/başlıktan) döndürür.
+    """
+    path, fmt = find_dataset(directory, name)
+    if path is None:
+        raise FileNotFoundError(
+            f"Veri dosyası bulunamadı: {os.path.join(directory, name)}.*"
+        )
+    meta = _sparse_meta(directory, name)
+    if meta is not None:
+        return list(meta["columns"])
+    if fmt == "parquet":
+        return list(pq.read_schema(path).names)
+    if fmt == "feather":
+        with pa.memory_map(path) as source:
+            return list(pa.ipc.open_file(source).schema.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def save_dataset_stats(stats, directory, name):
+    """
+    Veri setinin istatistiklerini (ör. aykırı değer sınırları) yanına JSON olarak
+    kaydeder. Dosya önce geçici olarak yazılır, sonra yerine taşınır.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + STATS_SUFFIX)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_dataset_stats(directory, name):
+    """
+    `save_dataset_stats` ile kaydedilen istatistikleri döndürür; dosya yoksa None.
+    """
+    path = os.path.join(directory, name + STATS_SUFFIX)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _float32_summary(values, summary=None):
+    """
+    (n_satır, n_sütun) dizinin float32'ye indirgeme özetini çıkarır (sonlu değerlerin
+    en küçüğü/en büyüğü, en büyük yuvarlama hatası, tam sayı değerli olup olmadığı).
+    Parça parça okunan veride önceki parçaların özetiyle birleştirilir.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    with np.errstate(over="ignore", invalid="ignore"):
+        rounded = values.astype(np.float32).astype(np.float64)
+        error = np.where(finite, np.abs(values - rounded), 0.0)
+    current = {
+        "min": np.where(finite, values, np.inf).min(axis=0, initial=np.inf),
+        "max": np.where(finite, values, -np.inf).max(axis=0, initial=-np.inf),
+        "error": error.max(axis=0, initial=0.0),
+        "integral": (~finite | (values == np.round(values))).all(axis=0),
+    }
+    if summary is None:
+        return current
+    return {
+        "min": np.minimum(summary["min"], current["min"]),
+        "max": np.maximum(summary["max"], current["max"]),
+        "error": np.maximum(summary["error"], current["error"]),
+        "integral": summary["integral"] & current["integral"],
+    }
+
+
+def _float32_safe(summary):
+    """
+    Sütun başına float32'ye indirgemenin güvenli olup olmadığını döndürür: değerler
+    float32 aralığına sığmalı, tam sayı değerli sütunlar birebir korunmalı, diğerlerinde
+    yuvarlama hatası değer aralığının `FLOAT32_RTOL` katını aşmamalıdır.
+    """
+    low, high = summary["min"], summary["max"]
+    empty = low > high
+    with np.errstate(invalid="ignore"):
+        magnitude = np.maximum(np.abs(low), np.abs(high))
+        spread = np.where(high > low, high - low, magnitude)
+        in_range = magnitude <= np.finfo(np.float32).max
+        precise = np.where(
+            summary["integral"],
+            summary["error"] == 0,
+            summary["error"] <= FLOAT32_RTOL * spread,
+        )
+    return empty | (in_range & precise)
+
+
+def downcast_frame(df):
+    """
+    float64 sütunlarını float32'ye güvenle indirgenebiliyorsa (`_float32_safe`)
+    float32'ye, tam sayı sütunlarını en küçük uygun tam sayı tipine indirger.
+    """
+    columns = df.select_dtypes(include=["float64"]).columns
+    if len(columns):
+        safe = _float32_safe(_float32_summary(df[columns].to_numpy()))
+        df = df.astype({column: np.float32 for column in columns[safe]})
+    for column in df.select_dtypes(include=["int64"]).columns:
+        df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def _source_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _dataset_version(directory, name, path):
+    # Ana dosyanın ve (varsa) eklenmiş bölümlerin sürümü
+    version = _source_version(path)
+    partitions = list_partitions(directory, name)
+    if not partitions:
+        return version
+    part_dir = partitions_dir(directory, name)
+    part_versions = [
+        _source_version(find_dataset(part_dir, partition)[0])
+        for partition in partitions
+    ]
+    digest = hashlib.blake2b(
+        json.dumps([partitions, part_versions]).encode("utf-8"), digest_size=4
+    ).hexdigest()
+    return f"{version}-{digest}"
+
+
+def _cache_file(directory, name, path, columns, kind, suffix):
+    # Sütun seçimi ve türe göre önek; sürüm kaynak dosyadan ve bölümlerden gelir
+    key = json.dumps([os.path.basename(path), list(columns), kind])
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    prefix = f"{name}-{digest}-"
+    cache_dir = os.path.join(directory, MATRIX_CACHE_DIR)
+    version = _dataset_version(directory, name, path)
+    return cache_dir, prefix, os.path.join(cache_dir, f"{prefix}{version}{suffix}")
+
+
+def _remove_stale(cache_dir, prefix, cache_file):
+    # Aynı sütun seçiminin kaynağın eski sürümlerine ait önbelleklerini temizle
+    for stale in os.listdir(cache_dir):
+        stale_file = os.path.join(cache_dir, stale)
+        if stale.startswith(prefix) and stale_file != cache_file:
+            try:
+                os.remove(stale_file)
+            except OSError:
+                pass
+
+
+def _find_source(directory, name):
+    path, _ = find_dataset(directory, name)
+    if path is None:
+        raise FileNotFoundError(
+            f"Veri dosyası bulunamadı: {os.path.join(directory, name)}.*"
+        )
+    return path
+
+
+def load_matrix(directory, name, columns, dtype=np.float32):
+    """
+    Seçilen sütunları (n_satır, n_sütun) boyutlu, salt okunur ve belleğe eşlenmiş
+    (mmap) bir NumPy dizisi olarak döndürür.
+
+    Dizi ilk çağrıda `MATRIX_CACHE_DIR` altına .npy olarak yazılır; kaynak dosya
+    değişmedikçe ve yeni bölüm eklenmedikçe sonraki çağrılar (ve GridSearchCV
+    işçileri, paralel eğitimler gibi diğer süreçler) aynı dosyayı eşleyip sayfaları
+    paylaşır.
+    """
+    columns = list(columns)
+    cache_dir, prefix, cache_file = _cache_file(
+        directory,
+        name,
+        _find_source(directory, name),
+        columns,
+        np.dtype(dtype).str,
+        ".npy",
+    )
+
+    if not os.path.exists(cache_file):
+        os.makedirs(cache_dir, exist_ok=True)
+        frame = load_dataset(directory, name, columns=columns)
+        matrix = np.ascontiguousarray(frame[columns].to_numpy(dtype=dtype))
+        # Yarım yazılmış dosyayı başka bir süreç eşlemesin diye önce geçici dosyaya yaz
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_file, cache_file)
+        _remove_stale(cache_dir, prefix, cache_file)
+
+    return np.load(cache_file, mmap_mode="r")
+
+
+def float32_unsafe_columns(directory, name, columns, chunksize=100000):
+    """
+    float32'ye güvenle indirgenemeyen sütunları döndürür (`_float32_safe`).
+
+    Veri parça parça okunur; sonuç `load_matrix` önbelleğiyle aynı yerde, kaynak
+    dosya ya da bölümleri değişene kadar saklanır.
+    """
+    columns = list(columns)
+    cache_dir, prefix, cache_file = _cache_file(
+        directory, name, _find_source(directory, name), columns, "float32", ".json"
+    )
+    if os.path.exists(cache_file):
+        with open(cache_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    summary = None
+    for chunk in iter_dataset(directory, name, columns=columns, chunksize=chunksize):
+        summary = _float32_summary(chunk[columns].to_numpy(dtype=np.float64), summary)
+    safe = _float32_safe(summary) if summary is not None else [True] * len(columns)
+    unsafe = [column for column, ok in zip(columns, safe) if not ok]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(unsafe, f, ensure_ascii=False)
+    os.replace(tmp_file, cache_file)
+    _remove_stale(cache_dir, prefix, cache_file)
+    return unsafe
+
+
+def load_training_data(directory, name, target, exclude=(), dtype=np.float32):
+    """
+    Eğitim verisini yalnızca gerekli sütunları okuyarak yükler.
+
+    Özellikler `load_matrix` ile belleğe eşlenmiş bir blok olarak okunur ve
+    kopyalanmadan DataFrame'e sarılır (sütun adları modelin `feature_names_in_`
+    değeri için korunur). float32 istenirse yalnızca güvenle indirgenebilen sütunlar
+    (`float32_unsafe_columns`) float32 blokta tutulur; diğerleri ayrı bir float64
+    bloğa alınır ve X'in sonuna eklenir. Veri seti seyrek sütunlar içeriyorsa X
+    tamamen seyrek sütunlardan oluşur. Hedef sütun da aynı kuralla indirgenir.
+
+    Returns:
+    - X: Özellik DataFrame'i, y: hedef Series
+    """
+    columns = dataset_columns(directory, name)
+    if target not in columns:
+        raise ValueError(f"Beklenen hedef değişken '{target}' veri setinde bulunamadı.")
+
+    excluded = {target, *exclude}
+    feature_columns = [column for column in columns if column not in excluded]
+    y = downcast_frame(load_dataset(directory, name, columns=[target]))[target]
+
+    if sparse_columns(directory, name):
+        # Seyrek kodlanmış veri: tüm sütunlar seyrek tutulur, böylece scikit-learn
+        # modelleri özellik adlarını koruyarak seyrek matris üzerinde eğitilir
+        X = load_dataset(directory, name, columns=feature_columns)
+        X = X.astype(pd.SparseDtype(dtype, 0.0))
+        return X, y
+
+    unsafe = []
+    if np.dtype(dtype) == np.float32:
+        unsafe = float32_unsafe_columns(directory, name, feature_columns)
+    blocks = []
+    for block_columns, block_dtype in [
+        ([column for column in feature_columns if column not in unsafe], dtype),
+        (unsafe, np.float64),
+    ]:
+        if block_columns:
+            matrix = load_matrix(directory, name, block_columns, dtype=block_dtype)
+            blocks.append(pd.DataFrame(matrix, columns=block_columns, copy=False))
+    if unsafe:
+        print(f"float32'ye güvenle indirgenemeyen sütunlar float64 tutuldu: {unsafe}")
+    X = blocks[0] if len(blocks) == 1 else pd.concat(blocks, axis=1)
+    return X, y
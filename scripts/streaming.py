@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+# Varsayılan rezervuar boyutu: bu kadar satıra kadar çeyrekler kesin hesaplanır
+RESERVOIR_SIZE = 100000
+
+
+class ReservoirQuantiles:
+    """
+    Sabit bellekle akan veriden çeyrek (quantile) tahmini yapan rezervuar örnekleyici.
+
+    Her parça tek bir vektörel adımda eklenir (Algorithm R): i. satır k/i olasılıkla
+    rezervuardaki rastgele bir satırın yerine geçer. Tüm sayısal sütunlar aynı satır
+    örneğini paylaşır. Toplam satır sayısı `size`'ı aşmazsa sonuç kesindir.
+    """
+
+    def __init__(self, n_columns, size=RESERVOIR_SIZE, random_state=42):
+        self.size = size
+        self.n_seen = 0
+        self._sample = np.empty((size, n_columns), dtype=np.float64)
+        self._rng = np.random.default_rng(random_state)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        n_rows = values.shape[0]
+
+        # Rezervuar dolana kadar satırları doğrudan kopyala
+        n_fill = min(max(self.size - self.n_seen, 0), n_rows)
+        if n_fill:
+            self._sample[self.n_seen : self.n_seen + n_fill] = values[:n_fill]
+
+        rest = values[n_fill:]
+        if len(rest):
+            # Satırın genel sırası i (1'den başlar) için [0, i) aralığında rastgele konum;
+            # konum rezervuar içindeyse satır o konuma yazılır
+            positions = np.arange(self.n_seen + n_fill + 1, self.n_seen + n_rows + 1)
+            slots = np.floor(self._rng.random(len(rest)) * positions).astype(np.int64)
+            accepted = slots < self.size
+            self._sample[slots[accepted]] = rest[accepted]
+
+        self.n_seen += n_rows
+
+    def quantile(self, q):
+        """
+        Sütun bazında çeyrekleri döndürür; `q` tek değer ya da liste olabilir.
+        """
+        if self.n_seen == 0:
+            raise ValueError("Rezervuar boş; önce veri eklenmelidir.")
+        return np.nanquantile(self._sample[: min(self.n_seen, self.size)], q, axis=0)
+
+
+class RunningMoments:
+    """
+    Parça parça gelen veriden sütun bazında sayı, ortalama ve varyansı hesaplar.
+
+    Parçaların özetleri Chan vd. paralel birleştirme formülüyle eklenir; sonuç tüm
+    veri üzerinde tek seferde hesaplanan değerle (ddof=0) sayısal olarak aynıdır.
+    """
+
+    def __init__(self, n_columns):
+        self.count = 0
+        self.mean = np.zeros(n_columns, dtype=np.float64)
+        self._m2 = np.zeros(n_columns, dtype=np.float64)
+
+    @classmethod
+    def from_stats(cls, count, mean, std):
+        """
+        Daha önce kaydedilmiş özetten (satır sayısı, ortalama, ddof=0 standart sapma)
+        başlar; yeni parçalar `update` ile eklenebilir.
+        """
+        mean = np.asarray(mean, dtype=np.float64)
+        moments = cls(len(mean))
+        moments.count = int(count)
+        moments.mean = mean.copy()
+        moments._m2 = np.asarray(std, dtype=np.float64) ** 2 * moments.count
+        return moments
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        n_b = values.shape[0]
+        if n_b == 0:
+            return
+        mean_b = values.mean(axis=0)
+        m2_b = ((values - mean_b) ** 2).sum(axis=0)
+
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self._m2 = self._m2 + m2_b + delta**2 * (n_a * n_b / n)
+        self.count = n
+
+    @property
+    def var(self):
+        if self.count == 0:
+            return np.full_like(self.mean, np.nan)
+        return self._m2 / self.count
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+
+class ValueCounts:
+    """
+    Parça parça gelen veriden sütun bazında değer sıklıklarını sayar; eksik değerler
+    ayrıca sayılır. Bellek kullanımı satır sayısına değil farklı değer sayısına
+    bağlıdır (kategorik sütunlar için).
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._counts = {column: {} for column in self.columns}
+        self.n_missing = dict.fromkeys(self.columns, 0)
+
+    def update(self, frame):
+        for column in self.columns:
+            counts = self._counts[column]
+            for value, n in frame[column].value_counts(dropna=True).items():
+                counts[value] = counts.get(value, 0) + int(n)
+            self.n_missing[column] += int(frame[column].isna().sum())
+
+    def counts(self, column):
+        """
+        Eksik olmayan değerlerin azalan sıradaki sayıları (`value_counts()` karşılığı).
+        """
+        counts = pd.Series(self._counts[column], dtype=np.int64)
+        return counts.sort_values(ascending=False, kind="stable")
+
+    def frequencies(self, column):
+        """
+        Eksik olmayan değerlerin oranları (`value_counts(normalize=True)` karşılığı).
+        """
+        counts = self.counts(column)
+        return counts / counts.sum() if len(counts) else counts.astype(np.float64)
+
+    def mode(self, column):
+        """
+        En sık değer; eşitlikte en küçük değer (`Series.mode().iloc[0]` ile aynı).
+        Sütun tamamen eksikse NaN.
+        """
+        counts = self._counts[column]
+        if not counts:
+            return np.nan
+        top = max(counts.values())
+        return min(value for value, n in counts.items() if n == top)
+
+    def distinct(self, column):
+        """
+        Görülen farklı değerler; eksik değer görüldüyse sonda NaN.
+        """
+        values = list(self._counts[column])
+        if self.n_missing[column]:
+            values.append(np.nan)
+        return values
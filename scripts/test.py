@@ -1,14 +1,13 @@
 import os
-<<<<<<< HEAD
 
-=======
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
 import joblib
-import pandas as pd
+
+from scripts.feature_alignment import FeatureAligner
+from scripts.transform_pipeline import load_transform_pipeline
 
 # Dosya yolları
 PROCESSED_DATA_DIR = "./data/processed/"
-ENERGY_DATA_FILE = PROCESSED_DATA_DIR + "final_energy_data.csv"
+ENERGY_DATASET = "final_energy_data"
 TRAINED_MODEL_FILE = "./models/trained_model.pkl"
 
 
@@ -17,13 +16,9 @@ def load_trained_model():
     Eğitilmiş modeli yükler ve eğitim sırasında kullanılan özellikleri kontrol eder.
     """
     if not os.path.exists(TRAINED_MODEL_FILE):
-<<<<<<< HEAD
         raise FileNotFoundError(
             f"Eğitilmiş model dosyası bulunamadı: {TRAINED_MODEL_FILE}"
         )
-=======
-        raise FileNotFoundError(f"Eğitilmiş model dosyası bulunamadı: {TRAINED_MODEL_FILE}")
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
     model = joblib.load(TRAINED_MODEL_FILE)
     print(f"Eğitilmiş model yüklendi: {TRAINED_MODEL_FILE}")
     return model
@@ -32,27 +27,27 @@ def load_trained_model():
 def align_features(test_data, trained_features):
     """
     Test verisini eğitilmiş modelin özellikleriyle hizalar.
+    Eksik özellikler sıfırla doldurulur, fazla özellikler yok sayılır.
     """
-    # Eksik özellikleri sıfırla doldur
-    for feature in trained_features:
-        if feature not in test_data:
-            test_data[feature] = 0
-
-    # Fazla özellikleri kaldır
-    test_data = test_data[trained_features]
-    return test_data
+    return FeatureAligner(trained_features).transform_frame(test_data)
 
 
-def predict_sample(model, sample):
+def predict_sample(model, sample, aligner=None, pipeline=None):
     """
     Yeni bir örnek girdi için tahmin yapar.
+    Dönüşüm pipeline'ı verilirse ham girdi önce eğitimdeki kodlama ve ölçeklemeden
+    geçirilir. Hizalama planı verilmezse modelin özelliklerinden bir kez oluşturulur.
     """
-    # Modelin kullandığı özellikleri al
-    trained_features = model.feature_names_in_
+    if pipeline is not None:
+        if aligner is None:
+            aligner = FeatureAligner.from_model(model, pipeline.feature_names)
+        aligned_sample = aligner.transform_array(pipeline.transform_records([sample]))
+    else:
+        if aligner is None:
+            aligner = FeatureAligner.from_model(model)
 
-    # Test verisini hizala
-    sample_df = pd.DataFrame([sample])
-    aligned_sample = align_features(sample_df, trained_features)
+        # Örneği DataFrame oluşturmadan satır tamponuna hizala
+        aligned_sample = aligner.transform_mapping(sample)
 
     # Tahmin yap
     prediction = model.predict(aligned_sample)
@@ -62,8 +57,9 @@ def predict_sample(model, sample):
 
 def main():
     try:
-        # Eğitilmiş modeli yükle
+        # Eğitilmiş modeli ve dönüşüm pipeline'ını yükle
         model = load_trained_model()
+        pipeline = load_transform_pipeline()
 
         # Yeni bir örnek girdi
         example_input = {
@@ -86,15 +82,11 @@ def main():
             "day_of_week": 2,
             "month": 12,
             "is_weekend": 0,
-<<<<<<< HEAD
             "season": 3,
-=======
-            "season": 3
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
         }
 
         # Tahmin yap
-        predict_sample(model, example_input)
+        predict_sample(model, example_input, pipeline=pipeline)
 
     except Exception as e:
         print(f"Bir hata oluştu: {e}")
@@ -102,8 +94,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-<<<<<<< HEAD
-=======
-
-
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
@@ -1,55 +1,120 @@
+import argparse
+import json
 import os
-<<<<<<< HEAD
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import joblib
 import numpy as np
 import pandas as pd
 from statsmodels.tsa.statespace.sarimax import SARIMAX
-=======
-import pandas as pd
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-import joblib
-import numpy as np
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+from threadpoolctl import threadpool_limits
+
+from scripts.storage import load_dataset
 
 # Dosya yolları
 PROCESSED_DATA_DIR = "./data/processed/"
 MODEL_DIR = "./models/"
-ENERGY_DATA_FILE = os.path.join(PROCESSED_DATA_DIR, "final_energy_data.csv")
+ENERGY_DATASET = "final_energy_data"
+WEATHER_DATASET = "processed_weather_data"
+MULTI_SERIES_DIR = os.path.join(MODEL_DIR, "sarima")
+MULTI_SERIES_SUMMARY_FILE = os.path.join(MULTI_SERIES_DIR, "summary.csv")
 SARIMA_MODEL_FILE = os.path.join(MODEL_DIR, "sarima_model.pkl")
+SARIMA_META_FILE = os.path.join(MODEL_DIR, "sarima_model_meta.json")
+
+# SARIMA model yapısı
+SARIMA_ORDER = (1, 1, 1)
+SARIMA_SEASONAL_ORDER = (1, 1, 1, 24)
+
+# Artımlı güncelleme ayarları (ortam değişkenleriyle değiştirilebilir)
+# - REFIT_INTERVAL_HOURS: son tam eğitimden bu kadar saat sonra yeniden tam eğitim yapılır
+# - DRIFT_THRESHOLD: yeni gözlemlerdeki standartlaştırılmış tek adım tahmin hatalarının
+#   RMS değeri bu eşiği aşarsa (model doğruysa ~1 beklenir) tam eğitim yapılır
+REFIT_INTERVAL_HOURS = float(os.environ.get("REFIT_INTERVAL_HOURS", 24 * 7))
+DRIFT_THRESHOLD = float(os.environ.get("DRIFT_THRESHOLD", 2.0))
+
+# Çoklu seri eğitimi: hedefler ve denenecek (order, seasonal_order) adayları
+ENERGY_TARGETS = ["total load actual", "price actual"]
+WEATHER_TARGETS = ["temp"]
+SARIMA_ORDER_CANDIDATES = [
+    ((1, 1, 1), (1, 1, 1, 24)),
+    ((2, 1, 1), (1, 1, 1, 24)),
+    ((1, 1, 2), (0, 1, 1, 24)),
+]
 
 # Klasör oluşturma
 os.makedirs(MODEL_DIR, exist_ok=True)
 
 
-def load_energy_data():
+def _to_hourly(data):
     """
-    Enerji verisini yükle ve düzenli zaman serisine dönüştür.
+    Zaman indeksli veriyi eksiksiz saatlik seriye çevirir, boşlukları zamana göre doldurur.
     """
-    if not os.path.exists(ENERGY_DATA_FILE):
-        raise FileNotFoundError(f"Veri dosyası bulunamadı: {ENERGY_DATA_FILE}")
+    full_range = pd.date_range(start=data.index.min(), end=data.index.max(), freq="h")
+    data = data.reindex(full_range)
+    data.index.name = "time"
+    return data.interpolate(method="time")
 
-    # Veriyi yükle ve yalnızca gerekli sütunları seç
-    energy_data = pd.read_csv(ENERGY_DATA_FILE, parse_dates=["time"], index_col="time")
-    energy_data = energy_data[["total load actual"]]  # Sadece gerekli sütun
 
-    # Eksik değerleri doldur ve zaman serisini yeniden oluştur
-<<<<<<< HEAD
-    full_range = pd.date_range(
-        start=energy_data.index.min(), end=energy_data.index.max(), freq="h"
+def load_energy_data(columns=("total load actual",)):
+    """
+    Enerji verisini yükle ve düzenli zaman serisine dönüştür.
+    """
+    # Yalnızca gerekli sütunları diskten oku
+    energy_data = load_dataset(
+        PROCESSED_DATA_DIR, ENERGY_DATASET, columns=["time", *columns]
     )
-    energy_data = energy_data.reindex(full_range)
-    energy_data.index.name = "time"
-    energy_data["total load actual"] = energy_data["total load actual"].interpolate(
-        method="time"
+    energy_data["time"] = pd.to_datetime(energy_data["time"], utc=True)
+    energy_data = energy_data.set_index("time")
+
+    # Eksik değerleri doldur ve zaman serisini yeniden oluştur
+    return _to_hourly(energy_data)
+
+
+def load_weather_series(columns=tuple(WEATHER_TARGETS)):
+    """
+    Hava durumu verisini şehir bazında saatlik zaman serilerine dönüştürür.
+
+    Returns:
+    - {şehir adı: DataFrame} sözlüğü
+    """
+    weather_data = load_dataset(
+        PROCESSED_DATA_DIR, WEATHER_DATASET, columns=["dt_iso", "city_name", *columns]
     )
-=======
-    full_range = pd.date_range(start=energy_data.index.min(), end=energy_data.index.max(), freq="h")
-    energy_data = energy_data.reindex(full_range)
-    energy_data.index.name = "time"
-    energy_data["total load actual"] = energy_data["total load actual"].interpolate(method="time")
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-    return energy_data
+    weather_data["dt_iso"] = pd.to_datetime(weather_data["dt_iso"], utc=True)
+
+    series_by_city = {}
+    for city, city_data in weather_data.groupby("city_name"):
+        # Aynı saate ait yinelenen kayıtların ortalamasını al
+        city_data = city_data.groupby("dt_iso")[list(columns)].mean()
+        series_by_city[city.strip()] = _to_hourly(city_data)
+    return series_by_city
+
+
+def _atomic_dump(obj, path):
+    """
+    Nesneyi önce geçici dosyaya yazar, sonra yerine taşır; okuyucular (ör. API)
+    hiçbir zaman yarım yazılmış dosya görmez.
+    """
+    tmp_path = f"{path}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_meta(meta):
+    tmp_path = f"{SARIMA_META_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, SARIMA_META_FILE)
+
+
+def _load_meta():
+    if not os.path.exists(SARIMA_META_FILE):
+        return None
+    with open(SARIMA_META_FILE, encoding="utf-8") as f:
+        return json.load(f)
 
 
 def train_and_save_sarima_model(column="total load actual", steps=24):
@@ -57,7 +122,7 @@ def train_and_save_sarima_model(column="total load actual", steps=24):
     SARIMA modelini eğit ve kaydet.
     """
     # Veriyi yükle
-    energy_data = load_energy_data()
+    energy_data = load_energy_data(columns=[column])
 
     # Eğitim verisini oluştur
     train = energy_data[column][:-steps]
@@ -65,19 +130,244 @@ def train_and_save_sarima_model(column="total load actual", steps=24):
     print("SARIMA modeli eğitiliyor, lütfen bekleyin...")
 
     # SARIMA modelini oluştur ve eğit
-    model = SARIMAX(train, order=(1, 1, 1), seasonal_order=(1, 1, 1, 24))
+    model = SARIMAX(train, order=SARIMA_ORDER, seasonal_order=SARIMA_SEASONAL_ORDER)
     model_fit = model.fit(disp=False)
 
     # Modeli kaydet
-    joblib.dump(model_fit, SARIMA_MODEL_FILE)
+    _atomic_dump(model_fit, SARIMA_MODEL_FILE)
+    _save_meta(
+        {
+            "column": column,
+            "steps": steps,
+            "order": list(SARIMA_ORDER),
+            "seasonal_order": list(SARIMA_SEASONAL_ORDER),
+            "last_full_fit": time.time(),
+            "last_observation": str(train.index[-1]),
+            "incremental_updates": 0,
+        }
+    )
     print(f"SARIMA modeli başarıyla kaydedildi: {SARIMA_MODEL_FILE}")
+    return model_fit
+
+
+def _drift_score(results):
+    """
+    Sonuçlardaki tek adım tahmin hatalarını varyanslarıyla standartlaştırıp RMS
+    değerini döndürür. Model yeni veriye uyuyorsa değer 1 civarındadır.
+    """
+    errors = np.asarray(results.forecasts_error[0], dtype=np.float64)
+    variances = np.asarray(results.forecasts_error_cov[0, 0], dtype=np.float64)
+    valid = variances > 0
+    if not valid.any():
+        return 0.0
+    standardized = errors[valid] / np.sqrt(variances[valid])
+    return float(np.sqrt(np.mean(standardized**2)))
+
+
+def update_sarima_model(
+    column="total load actual",
+    steps=24,
+    refit_interval_hours=REFIT_INTERVAL_HOURS,
+    drift_threshold=DRIFT_THRESHOLD,
+):
+    """
+    Kayıtlı SARIMA sonuçlarını yeniden eğitmeden yeni gözlemlerle günceller.
+
+    Mevcut parametrelerle `extend` çağrılır; Kalman filtresi yalnızca yeni gözlemler
+    üzerinde ilerletilir. Kayıtlı model yoksa, planlanan yeniden eğitim zamanı geldiyse
+    ya da yeni gözlemlerde sapma (drift) tespit edilirse tam eğitime düşülür.
+    """
+    meta = _load_meta()
+    if not os.path.exists(SARIMA_MODEL_FILE) or meta is None:
+        print("Kayıtlı SARIMA modeli bulunamadı, tam eğitim yapılıyor...")
+        return train_and_save_sarima_model(column=column, steps=steps)
+
+    if (
+        meta.get("column") != column
+        or tuple(meta.get("order", ())) != SARIMA_ORDER
+        or tuple(meta.get("seasonal_order", ())) != SARIMA_SEASONAL_ORDER
+    ):
+        print("Model yapısı ya da hedef sütun değişmiş, tam eğitim yapılıyor...")
+        return train_and_save_sarima_model(column=column, steps=steps)
+
+    hours_since_fit = (time.time() - meta["last_full_fit"]) / 3600
+    if hours_since_fit >= refit_interval_hours:
+        print(
+            f"Son tam eğitimden {hours_since_fit:.1f} saat geçti, planlı tam eğitim yapılıyor..."
+        )
+        return train_and_save_sarima_model(column=column, steps=steps)
+
+    # Yalnızca kayıtlı modelin son gözleminden sonraki veriyi al
+    results = joblib.load(SARIMA_MODEL_FILE)
+    series = load_energy_data(columns=[column])[column][:-steps]
+    last_observation = results.fittedvalues.index[-1]
+    new_observations = series[series.index > last_observation]
+    if new_observations.empty:
+        print("Yeni gözlem yok, SARIMA modeli güncel.")
+        return results
+
+    try:
+        updated = results.extend(new_observations)
+    except Exception as e:
+        print(f"Artımlı güncelleme yapılamadı ({e}), tam eğitim yapılıyor...")
+        return train_and_save_sarima_model(column=column, steps=steps)
+
+    drift = _drift_score(updated)
+    print(
+        f"{len(new_observations)} yeni gözlem eklendi, standartlaştırılmış hata RMS: {drift:.3f}"
+    )
+    if drift > drift_threshold:
+        print(f"Sapma tespit edildi (eşik {drift_threshold}), tam eğitim yapılıyor...")
+        return train_and_save_sarima_model(column=column, steps=steps)
+
+    _atomic_dump(updated, SARIMA_MODEL_FILE)
+    meta["last_observation"] = str(new_observations.index[-1])
+    meta["incremental_updates"] = meta.get("incremental_updates", 0) + 1
+    _save_meta(meta)
+    print(f"SARIMA modeli artımlı olarak güncellendi: {SARIMA_MODEL_FILE}")
+    return updated
+
+
+def _series_file_name(target, city, order, seasonal_order):
+    slug = re.sub(r"[^0-9a-z]+", "_", f"{target}__{city or 'all'}".lower()).strip("_")
+    order_tag = "-".join(map(str, order)) + "_" + "-".join(map(str, seasonal_order))
+    return f"{slug}__{order_tag}.pkl"
+
+
+def _fit_series_job(series, target, city, order, seasonal_order, model_file):
+    """
+    İşçi süreçte tek bir seriyi eğitir ve sonucu ayrı bir dosyaya kaydeder.
+    BLAS iş parçacıkları 1 ile sınırlanır; paralellik süreçler arasında sağlanır.
+    """
+    result = {
+        "target": target,
+        "city": city or "",
+        "order": str(order),
+        "seasonal_order": str(seasonal_order),
+        "n_obs": len(series),
+        "aic": np.nan,
+        "bic": np.nan,
+        "fit_seconds": np.nan,
+        "model_file": model_file,
+        "error": "",
+    }
+    start = time.perf_counter()
+    try:
+        with threadpool_limits(limits=1):
+            model_fit = SARIMAX(series, order=order, seasonal_order=seasonal_order).fit(
+                disp=False
+            )
+        _atomic_dump(model_fit, model_file)
+        result["aic"] = model_fit.aic
+        result["bic"] = model_fit.bic
+    except Exception as e:
+        result["error"] = str(e)
+    result["fit_seconds"] = time.perf_counter() - start
+    return result
+
+
+def build_series_specs(
+    energy_targets=ENERGY_TARGETS,
+    weather_targets=WEATHER_TARGETS,
+    order_candidates=SARIMA_ORDER_CANDIDATES,
+    steps=24,
+):
+    """
+    Eğitilecek (hedef × şehir × model yapısı) kombinasyonlarını ve serilerini hazırlar.
+    Veri ana süreçte bir kez okunur; işçilere yalnızca ilgili seri gönderilir.
+    """
+    series_list = []
+    if energy_targets:
+        energy_data = load_energy_data(columns=energy_targets)
+        for target in energy_targets:
+            series_list.append((target, None, energy_data[target][:-steps]))
+    if weather_targets:
+        for city, city_data in load_weather_series(columns=weather_targets).items():
+            for target in weather_targets:
+                series_list.append((target, city, city_data[target][:-steps]))
+
+    return [
+        (series, target, city, order, seasonal_order)
+        for target, city, series in series_list
+        for order, seasonal_order in order_candidates
+    ]
+
+
+def train_multiple_sarima_models(specs=None, n_jobs=None):
+    """
+    Birden çok SARIMA serisini süreç havuzunda paralel eğitir. Her seri ayrı dosyaya
+    kaydedilir; AIC/BIC ve eğitim süresini içeren özet tablo döndürülür ve kaydedilir.
+    """
+    os.makedirs(MULTI_SERIES_DIR, exist_ok=True)
+    specs = build_series_specs() if specs is None else specs
+    n_jobs = n_jobs or os.cpu_count() or 1
+    print(f"{len(specs)} SARIMA serisi {n_jobs} süreçle eğitiliyor...")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [
+            executor.submit(
+                _fit_series_job,
+                series,
+                target,
+                city,
+                order,
+                seasonal_order,
+                os.path.join(
+                    MULTI_SERIES_DIR,
+                    _series_file_name(target, city, order, seasonal_order),
+                ),
+            )
+            for series, target, city, order, seasonal_order in specs
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = result["error"] or f"AIC {result['aic']:.1f}"
+            print(
+                f"[{len(results)}/{len(specs)}] {result['target']} / {result['city'] or '-'} "
+                f"{result['order']}{result['seasonal_order']}: {status} "
+                f"({result['fit_seconds']:.1f} sn)"
+            )
+
+    summary = pd.DataFrame(results).sort_values(["target", "city", "aic"])
+    summary["best"] = ~summary.duplicated(["target", "city"]) & summary["error"].eq("")
+    summary.to_csv(MULTI_SERIES_SUMMARY_FILE, index=False)
+    print(f"Özet tablo kaydedildi: {MULTI_SERIES_SUMMARY_FILE}")
+    print(summary.drop(columns=["model_file"]).to_string(index=False))
+    return summary
 
 
 def main():
+    parser = argparse.ArgumentParser(description="SARIMA modelini eğit ya da güncelle.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Kayıtlı modeli yeni gözlemlerle güncelle (gerekirse tam eğitime düşer).",
+    )
+    parser.add_argument(
+        "--multi",
+        action="store_true",
+        help="Hedef × şehir × model yapısı kombinasyonlarını paralel eğit.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Paralel süreç sayısı (varsayılan: CPU sayısı).",
+    )
+    args = parser.parse_args()
+
     try:
-        train_and_save_sarima_model()
+        if args.multi:
+            train_multiple_sarima_models(n_jobs=args.jobs)
+        elif args.incremental:
+            update_sarima_model()
+        else:
+            train_and_save_sarima_model()
     except Exception as e:
         print(f"Bir hata oluştu: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
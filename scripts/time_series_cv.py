@@ -0,0 +1,162 @@
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error, r2_score
+
+# Zaman serisi doğrulama ayarları (ortam değişkenleriyle değiştirilebilir)
+# - CV_N_SPLITS: geriye dönük testteki katman (başlangıç noktası) sayısı
+# - CV_GAP: eğitim penceresinin sonu ile test penceresi arasında atlanan satır (saat)
+# - CV_MAX_TRAIN_SIZE: eğitim penceresinin üst sınırı; 0 genişleyen pencere demektir
+# - CV_N_JOBS: paralel değerlendirilen katman sayısı; -1 tüm çekirdekler
+CV_N_SPLITS = int(os.environ.get("CV_N_SPLITS", 5))
+CV_GAP = int(os.environ.get("CV_GAP", 24))
+CV_MAX_TRAIN_SIZE = int(os.environ.get("CV_MAX_TRAIN_SIZE", 0))
+CV_N_JOBS = int(os.environ.get("CV_N_JOBS", -1))
+
+
+class RollingOriginCV:
+    """
+    Kayan başlangıçlı (rolling-origin) zaman serisi çapraz doğrulaması.
+
+    Satırların zamana göre sıralı olduğu varsayılır (ham dosya sırası; `ingest.py`
+    yeni bölümleri sona ekler). Her katmanda test penceresi bir sonraki dönemdir,
+    eğitim penceresi ondan `gap` satır önce biter. `max_train_size` verilmezse
+    pencere genişler ve sonraki katmanlar öncekilerin eğitim verisini kapsar.
+
+    Pencereler `slice` olarak da alınabilir (`windows`); bitişik dilimler NumPy
+    dizilerinde kopya değil görünüm (view) döndürdüğünden katmanlar aynı bellek
+    bloğunu paylaşır. `split` scikit-learn bölücüleriyle uyumlu indeks dizileri
+    üretir (GridSearchCV vb. için).
+    """
+
+    def __init__(
+        self,
+        n_splits=CV_N_SPLITS,
+        test_size=None,
+        gap=CV_GAP,
+        max_train_size=CV_MAX_TRAIN_SIZE or None,
+    ):
+        if n_splits < 1:
+            raise ValueError("n_splits en az 1 olmalıdır.")
+        self.n_splits = n_splits
+        self.test_size = test_size
+        self.gap = gap
+        self.max_train_size = max_train_size
+
+    def windows(self, n_samples):
+        """
+        (eğitim dilimi, test dilimi) çiftlerini zaman sırasıyla döndürür.
+        """
+        test_size = self.test_size or n_samples // (self.n_splits + 1)
+        first_test = n_samples - self.n_splits * test_size
+        if test_size < 1 or first_test - self.gap < 1:
+            raise ValueError(
+                f"{n_samples} satır {self.n_splits} katman, {test_size} test ve "
+                f"{self.gap} boşluk satırı için yetersiz."
+            )
+
+        windows = []
+        for test_start in range(first_test, n_samples, test_size):
+            train_stop = test_start - self.gap
+            train_start = 0
+            if self.max_train_size:
+                train_start = max(0, train_stop - self.max_train_size)
+            windows.append(
+                (
+                    slice(train_start, train_stop),
+                    slice(test_start, test_start + test_size),
+                )
+            )
+        return windows
+
+    def split(self, X, y=None, groups=None):
+        for train, test in self.windows(len(X)):
+            yield np.arange(train.start, train.stop), np.arange(test.start, test.stop)
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        return self.n_splits
+
+
+def cv_folds(cv, X, y=None):
+    """
+    Bölücünün katmanlarını döndürür; `RollingOriginCV` için kopyasız dilimler,
+    diğer bölücüler için indeks dizileri.
+    """
+    if isinstance(cv, RollingOriginCV):
+        return cv.windows(len(X))
+    return list(cv.split(X, y))
+
+
+def chronological_split(X, y, test_size=0.2, gap=CV_GAP):
+    """
+    Karıştırmadan zaman sırasına göre eğitim/test ayırır; aradaki `gap` satır
+    atlanır. Dönen parçalar X ve y'nin görünümleridir.
+
+    Returns:
+    - X_train, X_test, y_train, y_test
+    """
+    n_test = int(np.ceil(len(X) * test_size))
+    train_stop = len(X) - n_test - gap
+    if n_test < 1 or train_stop < 1:
+        raise ValueError(f"{len(X)} satır, test ve boşluk pencereleri için yetersiz.")
+    return (
+        X.iloc[:train_stop],
+        X.iloc[-n_test:],
+        y.iloc[:train_stop],
+        y.iloc[-n_test:],
+    )
+
+
+def _evaluate_fold(model, X, y, train, test):
+    model = clone(model).fit(X.iloc[train], y.iloc[train])
+    predictions = model.predict(X.iloc[test])
+    return {
+        "mse": mean_squared_error(y.iloc[test], predictions),
+        "r2": r2_score(y.iloc[test], predictions),
+    }
+
+
+def backtest(model, X, y, cv=None, n_jobs=CV_N_JOBS, verbose=True):
+    """
+    Modeli kayan başlangıçlı katmanlarda geriye dönük test eder. Katmanlar paralel
+    eğitilir; her işçi ortak (belleğe eşlenmiş) matrisin kendi penceresini okur.
+
+    Returns:
+    - Katman sonuçları listesi: fold, train_start, train_stop, test_start,
+      test_stop, mse, r2
+    """
+    cv = cv or RollingOriginCV()
+    windows = cv.windows(len(X))
+
+    start = time.perf_counter()
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(model, X, y, train, test) for train, test in windows
+    )
+
+    results = [
+        {
+            "fold": fold,
+            "train_start": train.start,
+            "train_stop": train.stop,
+            "test_start": test.start,
+            "test_stop": test.stop,
+            **score,
+        }
+        for fold, ((train, test), score) in enumerate(zip(windows, scores))
+    ]
+
+    if verbose:
+        print(
+            f"Geriye dönük test: {len(results)} katman, "
+            f"{time.perf_counter() - start:.1f} sn"
+        )
+        for result in results:
+            print(
+                f"  Katman {result['fold']}: eğitim {result['train_start']}-"
+                f"{result['train_stop']}, test {result['test_start']}-"
+                f"{result['test_stop']} -> MSE: {result['mse']:.4f}, R2: {result['r2']:.4f}"
+            )
+    return results
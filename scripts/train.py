@@ -1,37 +1,27 @@
-<<<<<<< HEAD
 import os
+import resource
+import sys
+import threading
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import joblib
 import mlflow
 import mlflow.sklearn
+import numpy as np
 import pandas as pd
 from mlflow.models.signature import infer_signature
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.model_selection import train_test_split
 from xgboost import XGBRegressor
 
-# MLflow izleme URI'sını ayarlayın
-mlflow.set_tracking_uri("http://localhost:5000")
-=======
-import pandas as pd
-import os
-from sklearn.ensemble import RandomForestRegressor
-from xgboost import XGBRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
-import joblib
-import warnings
-import mlflow
-import mlflow.sklearn
-from mlflow.models.signature import infer_signature
+from scripts.storage import load_training_data
+from scripts.time_series_cv import backtest, chronological_split
 
 # MLflow izleme URI'sını ayarlayın
-mlflow.set_tracking_uri('http://localhost:5000')
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
+mlflow.set_tracking_uri("http://localhost:5000")
 
 # Uyarıları kapatma
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -39,104 +29,290 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 
 # Dosya yolları
 PROCESSED_DATA_DIR = "./data/processed/"
-ENERGY_DATA_FILE = PROCESSED_DATA_DIR + "final_energy_data.csv"
+ENERGY_DATASET = "final_energy_data"
 BEST_MODEL_DIR = "./models/"
+TRAINING_SUMMARY_FILE = os.path.join(BEST_MODEL_DIR, "training_summary.csv")
+
+# Eğitim ayarları (ortam değişkenleriyle değiştirilebilir)
+# - TRAIN_N_JOBS: modeller arasında paylaştırılan toplam çekirdek; -1 tüm çekirdekler
+# - TRAIN_BACKTEST: 0 ise kayan başlangıçlı geriye dönük test atlanır
+TRAIN_N_JOBS = int(os.environ.get("TRAIN_N_JOBS", -1))
+TRAIN_BACKTEST = os.environ.get("TRAIN_BACKTEST", "1") != "0"
 
 # Klasör oluşturma
 os.makedirs(BEST_MODEL_DIR, exist_ok=True)
 
 
-def load_data(file_path):
+def load_data(dataset_name):
     """
-    İşlenmiş enerji verisini yükle.
+    İşlenmiş enerji verisini yükle. Yalnızca özellik ve hedef sütunları okunur;
+    özellikler süreçler arasında paylaşılan, belleğe eşlenmiş float32 bloktur.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Veri dosyası bulunamadı: {file_path}")
-    energy_data = pd.read_csv(file_path)
-    if "total load actual" not in energy_data.columns:
-<<<<<<< HEAD
-        raise ValueError(
-            "Beklenen hedef değişken 'total load actual' veri setinde bulunamadı."
-        )
-    X = energy_data.drop(
-        columns=["total load actual", "price actual", "time"], errors="ignore"
+    return load_training_data(
+        PROCESSED_DATA_DIR,
+        dataset_name,
+        target="total load actual",
+        exclude=["price actual", "time"],
     )
-=======
-        raise ValueError("Beklenen hedef değişken 'total load actual' veri setinde bulunamadı.")
-    X = energy_data.drop(columns=["total load actual", "price actual", "time"], errors="ignore")
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-    y = energy_data["total load actual"]
-    return X, y
 
 
-def train_and_log_model(model, model_name, X, y):
+def candidate_models():
     """
-    Modeli eğit ve MLflow ile kaydet.
+    Eğitilecek modeller ve CPU ağırlıkları: {ad: (model, ağırlık)}.
+    Ağırlık 0 olan modeller tek çekirdekle eğitilir; diğerleri kalan çekirdekleri
+    ağırlıklarıyla orantılı paylaşır.
     """
-<<<<<<< HEAD
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
-=======
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-
-    # MLflow deneyi başlatma
-    with mlflow.start_run():
-        # Modeli eğit
-        model.fit(X_train, y_train)
-
-        # Tahminler ve metrikler
-        predictions = model.predict(X_test)
-        mse = mean_squared_error(y_test, predictions)
-        r2 = r2_score(y_test, predictions)
-
-        # Modeli kaydet
-        trained_model_file = os.path.join(BEST_MODEL_DIR, f"{model_name}_model.pkl")
-        joblib.dump(model, trained_model_file)
-        print(f"Eğitilen model kaydedildi: {trained_model_file}")
-
-        # MLflow ile modeli kaydet
-        signature = infer_signature(X_test, predictions)
+    return {
+        "RandomForestRegressor": (
+            RandomForestRegressor(n_estimators=100, random_state=42),
+            2,
+        ),
+        "XGBRegressor": (XGBRegressor(n_estimators=100, random_state=42), 1),
+        "LinearRegression": (LinearRegression(), 0),
+    }
+
+
+def cpu_budgets(weights, n_cpus):
+    """
+    Modellere çekirdek sayısı atar. Her model en az bir, en fazla `n_cpus` çekirdek
+    alır.
+    """
+    n_single = sum(1 for weight in weights.values() if weight == 0)
+    free = max(1, n_cpus - n_single)
+    total = sum(weight for weight in weights.values() if weight > 0) or 1
+    return {
+        name: 1 if weight == 0 else max(1, min(n_cpus, free * weight // total))
+        for name, weight in weights.items()
+    }
+
+
+class CpuPool:
+    """
+    Çekirdek bütçelerini dağıtan sayaç. Bir model bütçesi kadar çekirdek boşalana
+    kadar bekler; böylece eşzamanlı eğitimlerin toplam iş parçacığı sayısı çekirdek
+    sayısını aşmaz.
+    """
+
+    def __init__(self, n_cpus):
+        self.n_cpus = n_cpus
+        self._free = n_cpus
+        self._condition = threading.Condition()
+
+    def acquire(self, n):
+        with self._condition:
+            self._condition.wait_for(lambda: self._free >= n)
+            self._free -= n
+
+    def release(self, n):
+        with self._condition:
+            self._free += n
+            self._condition.notify_all()
+
+
+def _set_threads(model, n_jobs):
+    """
+    Modelin iş parçacığı sayısını ayarlar (scikit-learn n_jobs, XGBoost nthread).
+    """
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    return model
+
+
+def _process_peak_rss_mb():
+    # Süreç geneli tepe bellek; eşzamanlı eğitimler aynı süreçte olduğundan model
+    # başına ayrıştırılamaz. Linux'ta ru_maxrss KB cinsindendir.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def log_to_mlflow(model_name, model, X_sample, predictions, metrics, backtest_results):
+    """
+    Modeli, parametreleri ve metrikleri MLflow'a kaydeder. `AsyncMlflowLogger`
+    tarafından arka planda çağrılır.
+    """
+    with mlflow.start_run(run_name=model_name):
+        signature = infer_signature(X_sample, predictions)
         mlflow.sklearn.log_model(model, "model", signature=signature)
-        print(f"Model MLflow ile kaydedildi: {model_name}")
 
-        # Parametreleri ve metrikleri kaydet
         mlflow.log_param("model_type", model_name)
-        mlflow.log_metric("mse", mse)
-        mlflow.log_metric("r2_score", r2)
+        for name, value in metrics.items():
+            mlflow.log_metric(name, value)
+        for result in backtest_results:
+            mlflow.log_metric("backtest_mse", result["mse"], step=result["fold"])
+    print(f"Model MLflow ile kaydedildi: {model_name}")
+
+
+class AsyncMlflowLogger:
+    """
+    MLflow kayıtlarını tek bir arka plan iş parçacığında sırayla yapar; eğitimler
+    model yüklemesinin (HTTP) bitmesini beklemez. Kayıt hataları eğitimi durdurmaz,
+    `close` sırasında raporlanır.
+    """
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlflow")
+        self._futures = {}
+
+    def submit(self, model_name, *args):
+        self._futures[model_name] = self._pool.submit(log_to_mlflow, model_name, *args)
+
+    def close(self):
+        """
+        Kuyruktaki tüm kayıtların bitmesini bekler.
+
+        Returns:
+        - {model adı: hata mesajı} (başarılı kayıtlar için boş metin)
+        """
+        self._pool.shutdown(wait=True)
+        errors = {}
+        for model_name, future in self._futures.items():
+            error = future.exception()
+            errors[model_name] = f"{type(error).__name__}: {error}" if error else ""
+            if error:
+                print(f"MLflow kaydı başarısız ({model_name}): {error}")
+        return errors
+
+
+def train_model(model_name, model, n_jobs, X, y, split):
+    """
+    Tek bir modeli eğitir, test döneminde değerlendirir, kaydeder ve (açıksa)
+    geriye dönük test eder.
+
+    Returns:
+    - (özet satırı, test tahminleri, geriye dönük test sonuçları)
+    """
+    X_train, X_test, y_train, y_test = split
+    model = _set_threads(model, n_jobs)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    trained_model_file = os.path.join(BEST_MODEL_DIR, f"{model_name}_model.pkl")
+    joblib.dump(model, trained_model_file)
+    print(f"Eğitilen model kaydedildi: {trained_model_file}")
+
+    # Katmanlar sırayla, her biri modelin çekirdek bütçesiyle eğitilir
+    backtest_results = (
+        backtest(model, X, y, n_jobs=1, verbose=False) if TRAIN_BACKTEST else []
+    )
+
+    row = {
+        "model": model_name,
+        "n_jobs": n_jobs,
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "model_mb": os.path.getsize(trained_model_file) / 1024**2,
+        "mse": mean_squared_error(y_test, predictions),
+        "r2_score": r2_score(y_test, predictions),
+        "backtest_mse": (
+            float(np.mean([result["mse"] for result in backtest_results]))
+            if backtest_results
+            else np.nan
+        ),
+    }
+    return row, predictions, backtest_results
+
+
+def train_models(X, y, models=None, n_jobs=TRAIN_N_JOBS):
+    """
+    Aday modelleri çekirdek bütçeleriyle eşzamanlı eğitir. Model eğitimleri
+    (scikit-learn/XGBoost GIL'i bırakır) iş parçacıklarında çalışır ve aynı
+    belleğe eşlenmiş veriyi paylaşır; MLflow kayıtları arka plan kuyruğundadır.
+
+    Bir model eğitilemezse diğerleri tamamlanır ve özet tablo yazılır, ardından
+    RuntimeError yükseltilir. MLflow kayıt hataları eğitimi başarısız saymaz.
+
+    Returns:
+    - Eğitim/tahmin süresi, model boyutu ve metrikleri içeren özet tablo
+    """
+    models = candidate_models() if models is None else models
+    n_cpus = os.cpu_count() or 1
+    n_cpus = n_cpus if n_jobs is None or n_jobs < 0 else max(1, n_jobs)
+    budgets = cpu_budgets(
+        {name: weight for name, (_, weight) in models.items()}, n_cpus
+    )
+    print(
+        f"{len(models)} model {n_cpus} çekirdekle eğitiliyor: "
+        + ", ".join(f"{name}={budget}" for name, budget in budgets.items())
+    )
+
+    # Zaman sırasıyla ayır: model yalnızca test döneminden önceki verilerle eğitilir
+    split = chronological_split(X, y, test_size=0.2)
+    X_test = split[1]
+
+    cpu_pool = CpuPool(n_cpus)
+    logger = AsyncMlflowLogger()
+
+    def run(model_name, model):
+        cpu_pool.acquire(budgets[model_name])
+        try:
+            return train_model(model_name, model, budgets[model_name], X, y, split)
+        finally:
+            cpu_pool.release(budgets[model_name])
+
+    rows = []
+    with ThreadPoolExecutor(
+        max_workers=len(models), thread_name_prefix="train"
+    ) as executor:
+        futures = {
+            executor.submit(run, model_name, model): model_name
+            for model_name, (model, _) in models.items()
+        }
+        for future in as_completed(futures):
+            model_name = futures[future]
+            try:
+                row, predictions, backtest_results = future.result()
+            except Exception as e:
+                print(f"{model_name} eğitilemedi: {e}")
+                rows.append({"model": model_name, "mse": np.nan, "error": str(e)})
+                continue
+            metrics = {"mse": row["mse"], "r2_score": row["r2_score"]}
+            if backtest_results:
+                metrics["backtest_mse_mean"] = row["backtest_mse"]
+            logger.submit(
+                model_name,
+                models[model_name][0],
+                X_test,
+                predictions,
+                metrics,
+                backtest_results,
+            )
+            rows.append({**row, "error": ""})
+            print(
+                f"[{len(rows)}/{len(models)}] {model_name}: MSE {row['mse']:.4f} "
+                f"({row['fit_seconds']:.1f} sn eğitim)"
+            )
+
+    mlflow_errors = logger.close()
+    summary = pd.DataFrame(rows).sort_values("mse", na_position="last")
+    summary["mlflow_error"] = summary["model"].map(mlflow_errors).fillna("")
+    summary.to_csv(TRAINING_SUMMARY_FILE, index=False)
+    print(f"Özet tablo kaydedildi: {TRAINING_SUMMARY_FILE}")
+    print(summary.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    print(f"Süreç tepe belleği (process_peak_rss_mb): {_process_peak_rss_mb():.1f} MB")
+
+    failed = summary.loc[summary["error"] != "", "model"].tolist()
+    if failed:
+        raise RuntimeError(f"Eğitilemeyen modeller: {', '.join(failed)}")
+    return summary
 
 
 def main():
     try:
         # Veriyi yükle
-        X, y = load_data(ENERGY_DATA_FILE)
-
-        # Modelleri dene
-        models = {
-<<<<<<< HEAD
-            "RandomForestRegressor": RandomForestRegressor(
-                n_estimators=100, random_state=42
-            ),
-            "XGBRegressor": XGBRegressor(n_estimators=100, random_state=42),
-            "LinearRegression": LinearRegression(),
-=======
-            "RandomForestRegressor": RandomForestRegressor(n_estimators=100, random_state=42),
-            "XGBRegressor": XGBRegressor(n_estimators=100, random_state=42),
-            "LinearRegression": LinearRegression()
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
-        }
+        X, y = load_data(ENERGY_DATASET)
 
-        for model_name, model in models.items():
-            train_and_log_model(model, model_name, X, y)
+        # Modelleri eşzamanlı eğit ve özet tabloyu kaydet
+        train_models(X, y)
 
     except Exception as e:
         print(f"Bir hata oluştu: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 0a8cd4ce9a1540d36467328972bb58442e644d11
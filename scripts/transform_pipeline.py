@@ -0,0 +1,536 @@
+import hashlib
+import os
+import pickle
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from scripts.calendar_features import SEASON_LABELS
+from scripts.feature_alignment import normalize_feature_name
+from scripts.storage import sparse_frame
+
+# Dosya yolları
+ENCODERS_DIR = "./encoders/"
+TRANSFORM_PIPELINE_SUFFIX = "_transform_pipeline.pkl"
+TRANSFORM_PIPELINE_FILE = os.path.join(
+    ENCODERS_DIR, "energy" + TRANSFORM_PIPELINE_SUFFIX
+)
+
+# Dönüşüme girmeyen, veri setinde olduğu gibi bırakılan zaman sütunları
+EXCLUDED_COLUMNS = ["time", "dt_iso"]
+
+# Tam sayı kodlu kategorik girdilerin sabit kod tabloları (kod -> kategori). Kodlar
+# eğitimde görülen kategorilerden bağımsızdır; eğitimde hiç görülmemiş bir kategori
+# yeni kategori gibi (RARE/tüm sıfır) kodlanır
+CATEGORY_CODES = {"season": SEASON_LABELS}
+
+
+class RareCategoryEncoder(BaseEstimator, TransformerMixin):
+    """
+    Kategorik sütunlarda eğitimde `threshold` oranından seyrek görülen (ya da hiç
+    görülmemiş) kategorileri `replace_with` grubuna toplar.
+
+    Dönüşüm satır satır değil, kategorik tip kodları üzerinden vektörel yapılır;
+    eksik değerler olduğu gibi kalır.
+    """
+
+    def __init__(self, columns=(), threshold=0.01, replace_with="RARE"):
+        self.columns = columns
+        self.threshold = threshold
+        self.replace_with = replace_with
+
+    def fit(self, X, y=None):
+        return self.fit_frequencies(
+            {column: X[column].value_counts(normalize=True) for column in self.columns}
+        )
+
+    def fit_frequencies(self, frequencies):
+        """
+        Sütun başına normalize sıklıklardan (`value_counts(normalize=True)`) öğrenir;
+        sıklıklar veri parça parça okunarak sayılmış olabilir.
+        """
+        self.frequent_ = {}
+        for column in self.columns:
+            freq = frequencies[column]
+            self.frequent_[column] = freq.index[freq >= self.threshold].tolist()
+            print(
+                f"'{column}' sütununda {int((freq < self.threshold).sum())} kategori '{self.replace_with}' olarak yeniden adlandırıldı."
+            )
+        return self
+
+    def transform(self, X):
+        X = X.copy(deep=False)
+        for column, frequent in self.frequent_.items():
+            categories = pd.Index(frequent)
+            if self.replace_with not in categories:
+                categories = categories.append(pd.Index([self.replace_with]))
+            values = X[column]
+            codes = pd.Categorical(values, categories=categories).codes
+            # Kategori listesinde olmayan (seyrek/yeni) ama eksik olmayan değerler
+            rare = (codes < 0) & values.notna().to_numpy()
+            codes = np.where(rare, categories.get_loc(self.replace_with), codes)
+            X[column] = pd.Categorical.from_codes(codes, categories=categories)
+        return X
+
+
+class TransformPipeline:
+    """
+    Eğitimde öğrenilen tüm ön işleme adımlarını (aykırı değer kırpma -> RARE
+    encoding -> One-Hot/ikili kodlama -> ölçekleme) tek bir sürümlenmiş nesnede tutar.
+
+    `data_preprocessing.py` tarafından üretilir; API ve `test.py` tek dosyayı bir kez
+    yükleyip ham girdileri toplu olarak modelin özellik uzayına dönüştürür.
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        input_columns,
+        categorical_columns,
+        fill_values,
+        target_columns=(),
+        target_scaler=None,
+        clip_bounds=None,
+    ):
+        self.pipeline = pipeline
+        self.input_columns = list(input_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.fill_values = dict(fill_values)
+        self.target_columns = list(target_columns)
+        self.target_scaler = target_scaler
+        # feature_engineering'de kaydedilen aykırı değer sınırları (sayısal girdiler)
+        self.clip_bounds = {
+            column: (float(lower), float(upper))
+            for column, (lower, upper) in (clip_bounds or {}).items()
+            if column in self.input_columns
+        }
+
+        columns = pipeline.named_steps["columns"]
+        self.feature_names = [str(name) for name in columns.get_feature_names_out()]
+        self.output_slices = dict(columns.output_indices_)
+
+        # Kategorik sütunların eğitimdeki (sıralı) kategorileri
+        self.categories = {}
+        for name, encoder, encoder_columns in columns.transformers_:
+            if hasattr(encoder, "categories_"):
+                for column, categories in zip(encoder_columns, encoder.categories_):
+                    self.categories[column] = list(categories)
+
+        self._column_index = {}
+        for column in self.input_columns:
+            self._column_index.setdefault(normalize_feature_name(column), column)
+            self._column_index[column] = column
+        self._compile()
+
+        self.version = hashlib.blake2b(
+            pickle.dumps((pipeline, sorted(self.clip_bounds.items())), protocol=4),
+            digest_size=8,
+        ).hexdigest()
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def _compile(self):
+        """
+        Öğrenilmiş adımları satır başına pandas/sklearn yükü olmadan uygulanabilecek
+        NumPy işlemlerine derler (ölçekleme katsayıları ve kategori indeksleri).
+        """
+        columns = self.pipeline.named_steps["columns"]
+        frequent = self.pipeline.named_steps["rare"].frequent_
+        self._replace_with = self.pipeline.named_steps["rare"].replace_with
+        self._check_code_tables()
+
+        self._numeric = []
+        self._categorical = []
+        self._passthrough = []
+        for name, encoder, encoder_columns in columns.transformers_:
+            section = self.output_slices[name]
+            if section.stop == section.start:
+                continue
+            if name == "numeric":
+                scale = encoder.scale_ if encoder.scale_ is not None else 1.0
+                bounds = [
+                    self.clip_bounds.get(column, (-np.inf, np.inf))
+                    for column in encoder_columns
+                ]
+                lower, upper = np.array(bounds, dtype=np.float64).reshape(-1, 2).T
+                self._numeric.append(
+                    (
+                        list(encoder_columns),
+                        np.arange(section.start, section.stop),
+                        np.asarray(encoder.mean_, dtype=np.float64),
+                        np.asarray(scale, dtype=np.float64),
+                        lower,
+                        upper,
+                    )
+                )
+            elif name in ("binary", "onehot"):
+                offset = section.start
+                for column, categories in zip(encoder_columns, encoder.categories_):
+                    categories = list(categories)
+                    index = {value: i for i, value in enumerate(categories)}
+                    # Ham değer -> kodlayıcı indeksi; sık olmayan/yeni değerler RARE'e,
+                    # eksik değerler (eğitimde varsa) NaN kategorisine düşer
+                    lookup = {value: index.get(value, -1) for value in frequent[column]}
+                    rare_code = index.get(self._replace_with, -1)
+                    missing_code = next(
+                        (i for i, value in enumerate(categories) if pd.isna(value)), -1
+                    )
+                    self._categorical.append(
+                        (
+                            column,
+                            name == "onehot",
+                            offset,
+                            CATEGORY_CODES.get(column),
+                            lookup,
+                            rare_code,
+                            missing_code,
+                        )
+                    )
+                    offset += len(categories) if name == "onehot" else 1
+            else:
+                for i, index in enumerate(encoder_columns):
+                    column = (
+                        self.input_columns[index] if isinstance(index, int) else index
+                    )
+                    self._passthrough.append((column, section.start + i))
+
+    def _check_code_tables(self):
+        """
+        Eğitimde öğrenilen kategorilerin sabit kod tablolarında (`CATEGORY_CODES`)
+        bulunduğunu doğrular; tam sayı kodları yanlış kategoriye çözülmesin diye
+        uyuşmazlıkta pipeline yüklenmez.
+        """
+        for column, code_table in CATEGORY_CODES.items():
+            unknown = [
+                value
+                for value in self.categories.get(column, [])
+                if not pd.isna(value)
+                and value != self._replace_with
+                and value not in code_table
+            ]
+            if unknown:
+                raise ValueError(
+                    f"'{column}' kategorileri kod tablosuyla uyuşmuyor: {unknown} "
+                    f"(beklenen: {', '.join(code_table)})"
+                )
+
+    def _column_values(self, records, column, keys):
+        fill = self.fill_values.get(column, np.nan)
+        key = keys.get(column)
+        if key is None:
+            return [fill] * len(records)
+        values = [record.get(key) for record in records]
+        return [fill if value is None else value for value in values]
+
+    def _encode_categorical(self, column, values, code_table, lookup, rare, missing):
+        codes = np.empty(len(values), dtype=np.intp)
+        for i, value in enumerate(values):
+            if (
+                code_table is not None
+                and isinstance(value, (int, np.integer))
+                and not isinstance(value, bool)
+            ):
+                # Tam sayı kodlu girdiler (ör. season=3) sabit kod tablosuyla çözülür
+                if not 0 <= value < len(code_table):
+                    raise ValueError(
+                        f"'{column}' için kategori kodu 0 ile {len(code_table) - 1} arasında olmalıdır."
+                    )
+                value = code_table[value]
+            if pd.isna(value):
+                codes[i] = missing
+            else:
+                codes[i] = lookup.get(value, rare)
+        return codes
+
+    def transform_records(self, records):
+        """
+        Sözlük listesini (anahtarlar ham sütun adı ya da snake_case karşılığı) tek bir
+        vektörel dönüşümle (n_satır, n_özellik) float64 matrise çevirir.
+
+        Derlenmiş NumPy planı kullanılır; sonuç `transform` ile aynıdır. Eksik
+        girdiler eğitimdeki değerlerle (sayısal sütunlarda ortalama, yani ölçeklenince
+        0) doldurulur, One-Hot sütunlarında eksik değer tüm sıfır olarak kodlanır.
+        Sayısal girdiler ölçeklemeden önce eğitimdeki aykırı değer sınırlarına kırpılır.
+        """
+        keys = {}
+        for name in dict.fromkeys(key for record in records for key in record):
+            column = self._column_index.get(name)
+            if column is None:
+                column = self._column_index.get(normalize_feature_name(name))
+            if column is not None:
+                keys.setdefault(column, name)
+
+        n_rows = len(records)
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        for numeric_columns, positions, mean, scale, lower, upper in self._numeric:
+            values = np.array(
+                [self._column_values(records, c, keys) for c in numeric_columns],
+                dtype=np.float64,
+            ).T.reshape(n_rows, len(numeric_columns))
+            matrix[:, positions] = (np.clip(values, lower, upper) - mean) / scale
+
+        for column, onehot, offset, *encoding in self._categorical:
+            codes = self._encode_categorical(
+                column, self._column_values(records, column, keys), *encoding
+            )
+            if onehot:
+                rows = np.flatnonzero(codes >= 0)
+                matrix[rows, offset + codes[rows]] = 1.0
+            else:
+                if (codes < 0).any():
+                    raise ValueError(f"'{column}' için bilinmeyen kategori.")
+                matrix[:, offset] = codes
+
+        for column, position in self._passthrough:
+            matrix[:, position] = np.asarray(
+                self._column_values(records, column, keys), dtype=np.float64
+            )
+        return matrix
+
+    def clip(self, frame):
+        """
+        Sayısal girdileri kaydedilmiş aykırı değer sınırlarına kırpar (kopya döner).
+        """
+        frame = frame[self.input_columns].copy(deep=False)
+        columns = list(self.clip_bounds)
+        if columns:
+            lower, upper = np.array([self.clip_bounds[c] for c in columns]).T
+            frame[columns] = np.clip(
+                frame[columns].to_numpy(dtype=np.float64), lower, upper
+            )
+        return frame
+
+    def transform(self, frame):
+        """
+        Ham girdi DataFrame'ini sklearn pipeline'ı ile (n_satır, n_özellik) float64
+        matrise dönüştürür. Sütun sırası `feature_names` ile aynıdır.
+        """
+        output = self.pipeline.transform(self.clip(frame))
+        if sp.issparse(output):
+            output = output.toarray()
+        return np.asarray(output, dtype=np.float64)
+
+    def transform_dataset(self, data):
+        """
+        Eğitim veri setinin tamamını dönüştürür: özellikler pipeline'dan, hedef
+        sütunlar kendi ölçekleyicisinden geçer, zaman sütunları olduğu gibi kalır.
+        One-Hot sütunları seyrek çıktıda pandas seyrek sütunları olarak döner.
+        """
+        output = self.pipeline.transform(self.clip(data))
+        names = np.array(self.feature_names, dtype=object)
+
+        blocks = []
+        for name, section in self.output_slices.items():
+            if section.stop == section.start:
+                continue
+            block = output[:, section]
+            block_names = names[section].tolist()
+            if name == "onehot" and sp.issparse(block):
+                blocks.append(sparse_frame(block, block_names, index=data.index))
+                continue
+            if sp.issparse(block):
+                block = block.toarray()
+            if name == "remainder":
+                # Aktarılan sütunlar özgün tipleriyle kalır
+                blocks.append(data[block_names])
+                continue
+            block = pd.DataFrame(block, columns=block_names, index=data.index)
+            if name == "binary":
+                block = block.astype(np.int64)
+            blocks.append(block)
+
+        if self.target_columns:
+            blocks.append(
+                pd.DataFrame(
+                    self.target_scaler.transform(data[self.target_columns]),
+                    columns=self.target_columns,
+                    index=data.index,
+                )
+            )
+
+        kept = [
+            column
+            for column in data.columns
+            if column not in self.input_columns and column not in self.target_columns
+        ]
+        result = pd.concat([data[kept], *blocks], axis=1)
+
+        # Sütun sırası: özgün sıra (One-Hot'a açılan sütunlar hariç) + One-Hot blokları
+        onehot_columns = self._onehot_columns()
+        onehot_names = names[self.output_slices["onehot"]].tolist()
+        order = [c for c in data.columns if c not in onehot_columns] + onehot_names
+        return result[order]
+
+    def _onehot_columns(self):
+        columns = self.pipeline.named_steps["columns"]
+        for name, _, encoder_columns in columns.transformers_:
+            if name == "onehot":
+                return list(encoder_columns)
+        return []
+
+    def save(self, path):
+        """
+        Nesneyi önce geçici dosyaya yazar, sonra yerine taşır.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+        print(f"Dönüşüm pipeline'ı kaydedildi: {path} (sürüm {self.version})")
+
+    @classmethod
+    def load(cls, path):
+        pipeline = joblib.load(path)
+        if not isinstance(pipeline, cls):
+            raise TypeError(f"Geçersiz dönüşüm pipeline dosyası: {path}")
+        # Derlenmiş plan kaydedilen dosyadan değil, güncel koddan (kod tabloları vb.) gelir
+        pipeline._compile()
+        return pipeline
+
+
+def _set_scaler_moments(scaler, columns, moments):
+    """
+    Ölçekleyicinin istatistiklerini {sütun: (sayı, ortalama, standart sapma)}
+    özetinden ayarlar (StandardScaler.fit ile aynı; ddof=0, sıfır sapma 1 sayılır).
+    """
+    count, mean, std = (
+        np.array([moments[column][i] for column in columns], dtype=np.float64)
+        for i in range(3)
+    )
+    scaler.mean_ = mean
+    scaler.var_ = std**2
+    scaler.scale_ = np.where(std < 10 * np.finfo(np.float64).eps, 1.0, std)
+    scaler.n_samples_seen_ = int(count[0]) if (count == count[0]).all() else count
+    return scaler
+
+
+def fit_transform_pipeline(
+    data,
+    categorical_columns,
+    numerical_columns,
+    target_columns=(),
+    threshold=0.01,
+    replace_with="RARE",
+    sparse=False,
+    clip_bounds=None,
+    moments=None,
+    value_counts=None,
+):
+    """
+    Veri setinden RARE encoding, kodlama ve ölçekleme adımlarını tek bir pipeline
+    olarak öğrenir.
+
+    Bellekten büyük veride istatistikler parça parça hesaplanıp verilebilir:
+    `moments` ölçekleyicileri, `value_counts` RARE sıklıklarını ve dolgu değerlerini
+    belirler. Bu durumda `data` yalnızca sütun tiplerini ve her kategorik sütunun
+    farklı değerlerini içeren küçük bir çerçeve olabilir.
+
+    Args:
+    - data: Veri çerçevesi
+    - categorical_columns / numerical_columns: Kategorik ve sayısal sütunlar
+    - target_columns: Özellik olmayan, ayrı ölçeklenen hedef sütunlar
+    - threshold: RARE encoding frekans eşiği
+    - sparse: One-Hot çıktısını seyrek tut
+    - clip_bounds: {sütun: (alt, üst)} aykırı değer sınırları; uygulamada yeni
+      veriler ölçeklemeden önce bu sınırlara kırpılır
+    - moments: {sütun: (sayı, ortalama, standart sapma)}; sayısal ve hedef sütunlar
+      için kırpılmış verinin özeti
+    - value_counts: Sayısal olmayan girdi sütunlarının `streaming.ValueCounts` sayımı
+
+    Returns:
+    - TransformPipeline
+    """
+    excluded = set(EXCLUDED_COLUMNS) | set(target_columns)
+    categorical = [c for c in categorical_columns if c not in excluded]
+    numeric = [c for c in numerical_columns if c not in excluded]
+    target_columns = [c for c in target_columns if c in data.columns]
+    input_columns = [
+        c
+        for c in data.columns
+        if c not in excluded and not pd.api.types.is_datetime64_any_dtype(data[c])
+    ]
+
+    features = data[input_columns]
+    clip_bounds = {c: b for c, b in (clip_bounds or {}).items() if c in numeric}
+    if clip_bounds:
+        # Ölçekleyici, uygulamadaki gibi kırpılmış değerlerle öğrenilir
+        features = features.copy(deep=False)
+        lower, upper = np.array(list(clip_bounds.values())).T
+        features[list(clip_bounds)] = np.clip(
+            features[list(clip_bounds)].to_numpy(dtype=np.float64), lower, upper
+        )
+
+    rare = RareCategoryEncoder(categorical, threshold, replace_with)
+    if value_counts is None:
+        encoded = rare.fit_transform(features)
+    else:
+        rare.fit_frequencies({c: value_counts.frequencies(c) for c in categorical})
+        encoded = rare.transform(features)
+
+    # İkili kategoriler sıralı kodlanır (0/1), diğerleri One-Hot'a açılır
+    binary = [c for c in categorical if encoded[c].nunique() == 2]
+    multi = [c for c in categorical if c not in binary]
+    columns = ColumnTransformer(
+        [
+            ("numeric", StandardScaler(), numeric),
+            ("binary", OrdinalEncoder(), binary),
+            (
+                "onehot",
+                OneHotEncoder(sparse_output=sparse, handle_unknown="ignore"),
+                multi,
+            ),
+        ],
+        remainder="passthrough",
+        sparse_threshold=1.0 if sparse else 0.0,
+        verbose_feature_names_out=False,
+    )
+    columns.fit(encoded)
+    if moments is not None and numeric:
+        _set_scaler_moments(columns.named_transformers_["numeric"], numeric, moments)
+    pipeline = Pipeline([("rare", rare), ("columns", columns)])
+
+    # Eksik girdiler için dolgu: sayısal sütunlarda ortalama (ölçeklenince 0),
+    # ikili ve aktarılan sütunlarda en sık değer, One-Hot sütunlarında NaN (tüm sıfır)
+    fill_values = dict(zip(numeric, columns.named_transformers_["numeric"].mean_))
+    for column in input_columns:
+        if column not in fill_values and column not in multi:
+            if value_counts is not None:
+                fill_values[column] = value_counts.mode(column)
+            else:
+                fill_values[column] = data[column].mode().iloc[0]
+
+    target_scaler = None
+    if target_columns:
+        target_scaler = StandardScaler().fit(data[target_columns])
+        if moments is not None:
+            _set_scaler_moments(target_scaler, target_columns, moments)
+
+    return TransformPipeline(
+        pipeline,
+        input_columns,
+        categorical,
+        fill_values,
+        target_columns=target_columns,
+        target_scaler=target_scaler,
+        clip_bounds=clip_bounds,
+    )
+
+
+def load_transform_pipeline(path=TRANSFORM_PIPELINE_FILE):
+    """
+    Kaydedilmiş dönüşüm pipeline'ını yükler; dosya yoksa None döndürür.
+    """
+    if not os.path.exists(path):
+        print(f"Dönüşüm pipeline dosyası bulunamadı, ham girdiler kullanılacak: {path}")
+        return None
+    pipeline = TransformPipeline.load(path)
+    print(f"Dönüşüm pipeline'ı yüklendi: {path} (sürüm {pipeline.version})")
+    return pipeline
@@ -0,0 +1,380 @@
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import ParameterGrid, check_cv
+
+from scripts.time_series_cv import RollingOriginCV, cv_folds
+
+# Arama ayarları (ortam değişkenleriyle değiştirilebilir)
+# - SEARCH_N_JOBS: aynı anda eğitilen (yapılandırma, katman) sayısı (iş parçacığı);
+#   -1 tüm çekirdekler
+# - SEARCH_ETA: her turda adayların 1/eta'sı bir sonraki tura kalır, kaynak eta katına çıkar
+# - EARLY_STOPPING_ROUNDS: erken durdurma diliminde iyileşme olmadan geçen tur sınırı
+# - EARLY_STOPPING_FRACTION: eğitim katmanının erken durdurmaya ayrılan son kısmı;
+#   doğrulama katmanı yalnızca puanlamada kullanılır
+SEARCH_N_JOBS = int(os.environ.get("SEARCH_N_JOBS", -1))
+SEARCH_ETA = int(os.environ.get("SEARCH_ETA", 3))
+EARLY_STOPPING_ROUNDS = int(os.environ.get("EARLY_STOPPING_ROUNDS", 20))
+EARLY_STOPPING_FRACTION = float(os.environ.get("EARLY_STOPPING_FRACTION", 0.1))
+
+# Katman matrislerinin histogram kutu sayısı; tüm yapılandırmalar aynı kutuları paylaşır
+MAX_BIN = int(os.environ.get("XGB_MAX_BIN", 256))
+
+# XGBRegressor varsayılanlarının yerel (xgb.train) karşılıkları
+XGB_BASE_PARAMS = {
+    "objective": "reg:squarederror",
+    "tree_method": "hist",
+    "max_bin": MAX_BIN,
+    "seed": 42,
+}
+
+
+def as_matrix(X):
+    """
+    Özellikleri işçilere gönderilecek NumPy/SciPy matrisine çevirir. Belleğe eşlenmiş
+    yoğun blok kopyalanmaz; seyrek sütunlar CSR matrise dönüştürülür.
+    """
+    if isinstance(X, pd.DataFrame):
+        if any(isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes):
+            return X.sparse.to_coo().tocsr()
+        return X.to_numpy()
+    return X
+
+
+def _worker_layout(n_tasks, n_jobs):
+    """
+    Paralel işçi sayısını ve işçi başına XGBoost iş parçacığı sayısını belirler;
+    toplam iş parçacığı sayısı çekirdek sayısını aşmaz.
+    """
+    n_cpus = os.cpu_count() or 1
+    n_workers = n_cpus if n_jobs is None or n_jobs < 0 else n_jobs
+    n_workers = max(1, min(n_workers, n_tasks, n_cpus))
+    return n_workers, max(1, n_cpus // n_workers)
+
+
+def _split_tail(index, fraction):
+    """
+    Eğitim indeksini (dilim ya da dizi) zaman sırasıyla (baş, son kısım) olarak
+    ikiye ayırır; son kısım erken durdurmaya ayrılır.
+    """
+    if isinstance(index, slice):
+        n_tail = max(1, int((index.stop - index.start) * fraction))
+        return slice(index.start, index.stop - n_tail), slice(
+            index.stop - n_tail, index.stop
+        )
+    n_tail = max(1, int(len(index) * fraction))
+    return index[:-n_tail], index[-n_tail:]
+
+
+class FoldCache:
+    """
+    Her CV katmanı için eğitim `QuantileDMatrix`'ini ve aynı kutu sınırlarını
+    (`ref`) paylaşan erken durdurma ve doğrulama matrislerini bir kez oluşturur.
+    Erken durdurma matrisi eğitim penceresinin son `early_stopping_fraction`
+    kısmıdır; böylece doğrulama katmanı tur sayısı seçiminde kullanılmaz ve
+    katman puanı iyimser yanlı olmaz.
+
+    Katman verisi en fazla bir kez kopyalanır (`RollingOriginCV` dilimleri kopya
+    değil görünümdür) ve niceleme çizimi (quantile sketch) bir kez hesaplanır; ardından tüm hiperparametre kombinasyonları ve turlar aynı matrisleri
+    kullanır. Matrisler kutu indeksleri olarak tutulduğundan (değer başına 1 bayt)
+    float32 kopyalardan küçüktür. Eğitimler aynı süreçte iş parçacıklarıyla paylaşılır.
+    """
+
+    def __init__(
+        self,
+        X,
+        y,
+        folds,
+        max_bin=MAX_BIN,
+        early_stopping_fraction=EARLY_STOPPING_FRACTION,
+    ):
+        self._X = X
+        self._y = y
+        self.folds = list(folds)
+        self.max_bin = max_bin
+        self.early_stopping_fraction = early_stopping_fraction
+        self._matrices = {}
+        self._locks = [threading.Lock() for _ in self.folds]
+
+    def __len__(self):
+        return len(self.folds)
+
+    def __getitem__(self, fold):
+        """
+        (eğitim matrisi, erken durdurma matrisi, doğrulama matrisi, doğrulama
+        hedefi) dörtlüsünü döndürür.
+        """
+        with self._locks[fold]:
+            if fold not in self._matrices:
+                train_index, val_index = self.folds[fold]
+                fit_index, stop_index = _split_tail(
+                    train_index, self.early_stopping_fraction
+                )
+                dtrain = xgb.QuantileDMatrix(
+                    self._X[fit_index], self._y[fit_index], max_bin=self.max_bin
+                )
+                dstop = xgb.QuantileDMatrix(
+                    self._X[stop_index],
+                    self._y[stop_index],
+                    ref=dtrain,
+                    max_bin=self.max_bin,
+                )
+                y_val = self._y[val_index]
+                dval = xgb.QuantileDMatrix(
+                    self._X[val_index], y_val, ref=dtrain, max_bin=self.max_bin
+                )
+                self._matrices[fold] = (dtrain, dstop, dval, y_val)
+            return self._matrices[fold]
+
+
+def _fit_fold(cache, fold, params, n_estimators, n_threads):
+    """
+    Tek bir (yapılandırma, katman) çiftini önbellekteki katman matrisleriyle,
+    eğitim penceresinin son dilimine göre erken durdurarak eğitir ve ayrı
+    doğrulama katmanında puanlar.
+
+    Returns:
+    - (doğrulama MSE'si, en iyi tur sayısı)
+    """
+    dtrain, dstop, dval, y_val = cache[fold]
+    booster = xgb.train(
+        {**XGB_BASE_PARAMS, **params, "nthread": n_threads},
+        dtrain,
+        num_boost_round=n_estimators,
+        evals=[(dstop, "early_stopping")],
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        verbose_eval=False,
+    )
+    best_rounds = booster.best_iteration + 1
+    predictions = booster.predict(dval, iteration_range=(0, best_rounds))
+    return mean_squared_error(y_val, predictions), best_rounds
+
+
+def resource_schedule(min_resource, max_resource, eta=SEARCH_ETA):
+    """
+    Ardışık yarılama turlarının kaynak (ağaç sayısı) listesi: min_resource'tan
+    başlayıp eta katıyla artar, son tur her zaman max_resource'tur.
+    """
+    n_rungs = int(math.floor(math.log(max_resource / min_resource, eta) + 1e-9)) + 1
+    resources = [int(min_resource * eta**rung) for rung in range(n_rungs)]
+    resources[-1] = max_resource
+    return resources
+
+
+def successive_halving_search(
+    X,
+    y,
+    param_grid,
+    resource="n_estimators",
+    min_resource=None,
+    max_resource=None,
+    eta=SEARCH_ETA,
+    cv=None,
+    n_jobs=SEARCH_N_JOBS,
+    verbose=True,
+):
+    """
+    XGBoost için paralel ardışık yarılama (successive halving) araması.
+
+    `resource` dışındaki parametrelerin tüm kombinasyonları ilk turda az sayıda
+    ağaçla (min_resource) değerlendirilir; her turda en iyi 1/eta'lık kısım kalır ve
+    ağaç sayısı eta katına çıkar. Her (yapılandırma, katman) eğitimi ayrı bir iş
+    parçacığında (XGBoost eğitim sırasında GIL'i bırakır) `FoldCache`'teki ortak
+    katman matrisleriyle çalışır. Eğitim penceresinin son `EARLY_STOPPING_FRACTION`
+    kısmında `EARLY_STOPPING_ROUNDS` ile erken durdurulur ve doğrulama katmanında
+    puanlanır; doğrulama katmanı tur sayısı seçiminde kullanılmadığından puan
+    iyimser yanlı değildir.
+    Önceki turda kendi sınırından önce duran (yakınsamış) yapılandırmalar yeniden
+    eğitilmez. Tek aday kaldığında ara turlar atlanır; aday yakınsamadıysa
+    doğrudan max_resource ile eğitilir.
+
+    Args:
+    - X, y: Eğitim verisi
+    - param_grid: {parametre: değer listesi}; `resource` listesi varsayılan min/max
+      kaynağı belirler
+    - cv: Bölücü (varsayılan: 3 katmanlı `RollingOriginCV`)
+    - n_jobs: Paralel eğitim sayısı (-1: tüm çekirdekler)
+
+    Returns:
+    - (en iyi parametreler, en iyi ortalama MSE, tur geçmişi)
+    """
+    param_grid = dict(param_grid)
+    resource_values = param_grid.pop(resource, None) or []
+    min_resource = min_resource or min(resource_values)
+    max_resource = max_resource or max(resource_values)
+    resources = resource_schedule(min_resource, max_resource, eta)
+
+    cv = cv or RollingOriginCV(n_splits=3)
+    X = as_matrix(X)
+    y = np.asarray(y)
+    cache = FoldCache(X, y, cv_folds(cv, X, y))
+
+    candidates = [
+        {"params": params, "score": None, "best_iteration": None, "converged": False}
+        for params in ParameterGrid(param_grid)
+    ]
+    history = []
+    rung = 0
+    while rung < len(resources):
+        n_estimators = resources[rung]
+        start = time.perf_counter()
+        pending = [c for c in candidates if not c["converged"]]
+        n_workers, n_threads = _worker_layout(len(pending) * len(cache), n_jobs)
+        results = Parallel(n_jobs=n_workers, backend="threading")(
+            delayed(_fit_fold)(cache, fold, c["params"], n_estimators, n_threads)
+            for c in pending
+            for fold in range(len(cache))
+        )
+
+        for i, candidate in enumerate(pending):
+            fold_results = results[i * len(cache) : (i + 1) * len(cache)]
+            candidate["score"] = float(np.mean([score for score, _ in fold_results]))
+            best_iterations = [iteration for _, iteration in fold_results]
+            candidate["best_iteration"] = int(np.mean(best_iterations))
+            # Tüm katmanlarda sınırdan önce durduysa daha fazla ağaç sonucu değiştirmez
+            candidate["converged"] = (
+                max(best_iterations) + EARLY_STOPPING_ROUNDS <= n_estimators
+            )
+
+        candidates.sort(key=lambda c: c["score"])
+        history.append(
+            {
+                "rung": rung,
+                "n_estimators": n_estimators,
+                "n_candidates": len(candidates),
+                "n_fits": len(pending) * len(cache),
+                "best_score": candidates[0]["score"],
+                "seconds": time.perf_counter() - start,
+            }
+        )
+        if verbose:
+            print(
+                f"Tur {rung}: {len(candidates)} aday, {n_estimators} ağaç, "
+                f"{len(pending) * len(cache)} eğitim ({n_workers} işçi x {n_threads} iş parçacığı), "
+                f"en iyi MSE: {candidates[0]['score']:.4f} ({history[-1]['seconds']:.1f} sn)"
+            )
+            for candidate in candidates:
+                print(
+                    f"  {candidate['params']} -> MSE: {candidate['score']:.4f}, "
+                    f"en iyi tur: {candidate['best_iteration']}"
+                )
+
+        if rung == len(resources) - 1:
+            break
+        candidates = candidates[: max(1, math.ceil(len(candidates) / eta))]
+        if len(candidates) > 1:
+            rung += 1
+        elif candidates[0]["converged"]:
+            break
+        else:
+            # Sıralanacak başka aday yok; kalan aday doğrudan en büyük kaynakla eğitilir
+            rung = len(resources) - 1
+
+    best = candidates[0]
+    best_params = {**best["params"], resource: best["best_iteration"]}
+    return best_params, best["score"], history
+
+
+def _grow_forest(estimator, X, y, train_index, val_index, checkpoints, n_threads):
+    """
+    Tek bir (yapılandırma, katman) için ormanı `warm_start` ile kontrol noktalarına
+    kadar büyütür; her noktada yalnızca yeni ağaçlar eğitilir.
+
+    Returns:
+    - Kontrol noktası sırasıyla doğrulama MSE'leri
+    """
+    model = clone(estimator).set_params(warm_start=True, n_jobs=n_threads)
+    X_train, y_train = X[train_index], y[train_index]
+    X_val, y_val = X[val_index], y[val_index]
+    scores = []
+    for n_estimators in checkpoints:
+        model.set_params(n_estimators=n_estimators).fit(X_train, y_train)
+        scores.append(mean_squared_error(y_val, model.predict(X_val)))
+    return scores
+
+
+def warm_start_forest_search(
+    estimator,
+    X,
+    y,
+    param_grid,
+    resource="n_estimators",
+    cv=3,
+    n_jobs=SEARCH_N_JOBS,
+    verbose=True,
+):
+    """
+    Orman modelleri (RandomForest/ExtraTrees) için `warm_start` ile ızgara araması.
+
+    `resource` dışındaki her kombinasyon ve katman için tek bir orman en küçük ağaç
+    sayısından başlayıp `warm_start=True` ile büyütülür ve her kontrol noktasında
+    (`param_grid[resource]` değerleri) puanlanır. Ağaçlar sabit `random_state` ile
+    aynı sırada üretildiğinden sonuçlar her ağaç sayısını sıfırdan eğiten
+    `GridSearchCV` ile aynıdır; yalnızca tekrarlanan ağaç eğitimleri atlanır.
+    En iyi parametrelerle model tüm eğitim verisinde, verilen (DataFrame) haliyle
+    yeniden eğitilir; böylece `feature_names_in_` korunur.
+
+    Args:
+    - estimator: `warm_start` destekleyen orman modeli
+    - param_grid: {parametre: değer listesi}
+    - cv: Katman sayısı ya da bölücü (`GridSearchCV` ile aynı varsayılan bölme)
+    - n_jobs: Paralel (yapılandırma, katman) sayısı (-1: tüm çekirdekler)
+
+    Returns:
+    - (yeniden eğitilmiş en iyi model, en iyi parametreler, en iyi ortalama MSE,
+      tüm sonuçlar)
+    """
+    param_grid = dict(param_grid)
+    checkpoints = sorted(param_grid.pop(resource))
+    configs = list(ParameterGrid(param_grid))
+
+    X_matrix = as_matrix(X)
+    y_array = np.asarray(y)
+    folds = cv_folds(check_cv(cv), X_matrix, y_array)
+
+    start = time.perf_counter()
+    n_workers, n_threads = _worker_layout(len(configs) * len(folds), n_jobs)
+    fold_scores = Parallel(n_jobs=n_workers)(
+        delayed(_grow_forest)(
+            clone(estimator).set_params(**params),
+            X_matrix,
+            y_array,
+            train_index,
+            val_index,
+            checkpoints,
+            n_threads,
+        )
+        for params in configs
+        for train_index, val_index in folds
+    )
+
+    results = []
+    for i, params in enumerate(configs):
+        scores = np.mean(fold_scores[i * len(folds) : (i + 1) * len(folds)], axis=0)
+        for n_estimators, score in zip(checkpoints, scores):
+            results.append(
+                {"params": {**params, resource: n_estimators}, "score": float(score)}
+            )
+    results.sort(key=lambda result: result["score"])
+    best = results[0]
+
+    if verbose:
+        print(
+            f"{len(configs)} yapılandırma x {len(folds)} katman, {len(checkpoints)} kontrol "
+            f"noktası ({n_workers} işçi x {n_threads} iş parçacığı): "
+            f"{time.perf_counter() - start:.1f} sn"
+        )
+        for result in results:
+            print(f"  {result['params']} -> MSE: {result['score']:.4f}")
+
+    # Özellik adları (feature_names_in_) API'de girdileri hizalamak için gerekir
+    best_model = clone(estimator).set_params(**best["params"]).fit(X, y)
+    return best_model, best["params"], best["score"], results